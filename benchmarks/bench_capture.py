@@ -0,0 +1,78 @@
+"""
+Cost of capturing a 4K screen into a NumPy array through shared memory,
+against copying each frame out of it. Needs an X server with MIT-SHM and
+numpy, e.g. under Xvfb:
+
+    Xvfb :99 -screen 0 3840x2160x24 &
+    DISPLAY=:99 python -m benchmarks.bench_capture [frames]
+
+Without an X server, only the NumPy side is measured, over a buffer laid
+out like the shared image.
+"""
+
+import ctypes
+import sys
+import time
+
+from benchmarks import fake_platform
+
+# Only the screen geometry comes from the (fake) platform, pixels come from X
+fake_platform.install(3840, 2160)
+
+from warpy import lib  # noqa: E402
+from warpy.capture import CaptureError, ShmCapture  # noqa: E402
+
+
+def time_ms(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) * 1000 / n
+
+
+def without_x(w, h, frames, reason):
+    import numpy as np
+
+    buffer = (ctypes.c_ubyte * (w * h * 4))()
+
+    def view():
+        return np.ndarray((h, w, 4), np.uint8, buffer=buffer, strides=(w * 4, 4, 1))
+
+    view_ms = time_ms(view, frames)
+    copy_ms = time_ms(lambda: view().copy(), frames)
+
+    print(f"{w}x{h} frame ({w * h * 4 / 1e6:.1f} MB), no capture: {reason}")
+    print(f"numpy view of the frame  {view_ms * 1000:7.2f} us/frame")
+    print(f"copy the frame out       {copy_ms:7.2f} ms/frame (avoided)")
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    scr = lib.get_screen(0)
+    w, h = scr.contents.w, scr.contents.h
+
+    start = time.perf_counter()
+    try:
+        cap = ShmCapture(scr)
+    except CaptureError as e:
+        without_x(w, h, frames, e)
+        return
+    setup_ms = (time.perf_counter() - start) * 1000
+
+    frame = cap.capture()
+    mb = frame.shape[0] * frame.shape[1] * 4 / 1e6
+    assert frame.base is not None, "frame is not a view of the shared image"
+
+    grab_ms = time_ms(cap.grab, frames)
+    view_ms = time_ms(cap.frame, frames)
+    copy_ms = time_ms(lambda: cap.frame().copy(), frames)
+    cap.close()
+
+    print(f"{w}x{h} frame ({mb:.1f} MB), setup {setup_ms:.1f} ms")
+    print(f"grab into shared memory  {grab_ms:7.2f} ms/frame ({mb / grab_ms:.0f} GB/s)")
+    print(f"numpy view of the frame  {view_ms * 1000:7.2f} us/frame")
+    print(f"copy the frame out       {copy_ms:7.2f} ms/frame (avoided)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Key-binding match throughput: legacy per-entry scan vs. the compiled table,
+and per-event dispatch cost of a chain of matches vs. a single classify().
+
+    python -m benchmarks.bench_config_match
+"""
+
+import time
+
+from benchmarks import fake_platform
+
+fake = fake_platform.install()
+
+from warpy.config import (  # noqa: E402
+    config_input_classify,
+    config_input_match,
+    OptionType,
+    config_input_whitelist_profile,
+    config_manager,
+    parse_config,
+)
+from warpy.input import (  # noqa: E402
+    input_eq,
+    input_keymap_invalidate,
+    input_parse_string,
+)
+from warpy.schemas import InputEvent  # noqa: E402
+
+# The bindings normal_mode checks for a keystroke that reaches its last branch
+NORMAL_KEYS = [
+    "scroll_down", "scroll_up", "accelerator", "decelerator", "top", "bottom",
+    "middle", "start", "end", "hist_back", "hist_forward", "drag",
+    "copy_and_exit", "exit", "grid", "screen", "history", "hint2", "hint",
+    "print", "buttons", "oneshot_buttons",
+]
+KEY_TYPES = (OptionType.OPT_KEY, OptionType.OPT_BUTTON)
+KEYSTROKES = ["h", "j", "k", "l", "m", "x", "X", "esc", "C-o", "e", "q"]
+
+
+def legacy_match(ev, config_key):
+    """config_input_match as it was before bindings were compiled."""
+    # Nor was there a keymap cache to resolve the key names from
+    input_keymap_invalidate()
+
+    for entry in config_manager.entries.values():
+        if entry.key == config_key and entry.value == "unbind":
+            return 0
+        if entry.key not in NORMAL_KEYS or entry.type not in KEY_TYPES:
+            continue
+
+        # Every whitelisted entry re-parsed its tokens, whatever its key
+        for idx, tok in enumerate(entry.value.split(), 1):
+            if ret := input_eq(ev, tok):
+                exact = ret == 2
+                if entry.key == config_key and (
+                    exact or entry.type == OptionType.OPT_BUTTON
+                ):
+                    return idx
+                break
+    return 0
+
+
+def events():
+    evs = []
+    for s in KEYSTROKES:
+        ev = InputEvent()
+        input_parse_string(ev, s)
+        evs.append(ev)
+    return evs
+
+
+def run(match, evs, rounds):
+    n = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for ev in evs:
+            for key in NORMAL_KEYS:
+                match(ev, key)
+                n += 1
+    return n / (time.perf_counter() - start)
+
+
+def run_events(dispatch, evs, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for ev in evs:
+            dispatch(ev)
+    return rounds * len(evs) / (time.perf_counter() - start)
+
+
+def match_chain(ev):
+    for key in NORMAL_KEYS:
+        if config_input_match(ev, key):
+            return key
+
+
+def native_lookups():
+    return fake.calls.get("input_lookup_code", 0) + fake.calls.get("input_lookup_name", 0)
+
+
+def main():
+    parse_config("")
+    config_input_whitelist_profile("normal")
+    evs = events()
+
+    for ev in evs:
+        matched = config_input_classify(ev)
+        for key in NORMAL_KEYS:
+            assert legacy_match(ev, key) == config_input_match(ev, key), key
+            assert matched.get(key, 0) == config_input_match(ev, key), key
+
+    fake.reset_counts()
+    before = run(legacy_match, evs, 20)
+    ffi = native_lookups()
+    fake.reset_counts()
+    after = run(config_input_match, evs, 2000)
+
+    print(f"legacy scan:    {before:12,.0f} matches/s  ({ffi} keysym lookups)")
+    print(f"compiled table: {after:12,.0f} matches/s  ({native_lookups()} keysym lookups)")
+    print(f"speedup:        {after / before:12.1f}x")
+
+    chain = run_events(match_chain, evs, 2000)
+    classify = run_events(config_input_classify, evs, 2000)
+    print(f"match chain:    {chain:12,.0f} events/s")
+    print(f"classify:       {classify:12,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Round-trip latency of the daemon control socket, through the daemon's main
+loop: each request wakes it from input_wait() via the wake file.
+
+    python -m benchmarks.bench_control
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks import fake_platform
+
+fake = fake_platform.install()
+
+from warpy.control import get_socket_path, send_commands  # noqa: E402
+from warpy.daemon import daemon_loop  # noqa: E402
+from warpy.platform import platform  # noqa: E402
+
+
+def median_ms(fn, rounds):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2] * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["XDG_RUNTIME_DIR"] = tmp
+        path = get_socket_path()
+
+        # The daemon's main thread, here a background one as it never returns
+        threading.Thread(target=daemon_loop, args=(platform,), daemon=True).start()
+        while not os.path.exists(path):
+            time.sleep(0.001)
+
+        assert send_commands([{"cmd": "move", "x": 10, "y": 20}], path)[0]["ok"]
+        assert send_commands([{"cmd": "position"}], path)[0]["x"] == 10
+
+        position = median_ms(lambda: send_commands([{"cmd": "position"}], path), 500)
+        move_click = median_ms(
+            lambda: send_commands(
+                [{"cmd": "move", "x": 5, "y": 5}, {"cmd": "click", "button": 1}], path
+            ),
+            500,
+        )
+
+    print(f"position:     {position:7.3f} ms per connection (median)")
+    print(f"move + click: {move_click:7.3f} ms per connection (median)")
+
+
+if __name__ == "__main__":
+    main()
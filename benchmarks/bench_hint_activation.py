@@ -0,0 +1,58 @@
+"""
+Latency of entering fullscreen hint mode, with and without the daemon's
+prerendered hint overlays. Each session is exited with the first key.
+
+    python -m benchmarks.bench_hint_activation
+"""
+
+import time
+
+from benchmarks import fake_platform
+
+fake = fake_platform.install()
+
+from warpy import lib  # noqa: E402
+from warpy.config import parse_config  # noqa: E402
+from warpy.hint import (  # noqa: E402
+    _hint_manager,
+    full_hint_mode,
+    fullscreen_layout,
+    prerender_hints,
+)
+from warpy.input import input_parse_string  # noqa: E402
+from warpy.schemas import InputEvent  # noqa: E402
+
+
+def activate(scr):
+    ev = InputEvent()
+    input_parse_string(ev, "esc")
+    ev.pressed = 1
+    fake.events.append(ev)
+
+    start = time.perf_counter()
+    full_hint_mode(scr, 0)
+    return time.perf_counter() - start
+
+
+def cold(scr):
+    _hint_manager.overlays.clear()
+    fullscreen_layout.cache_clear()
+    return activate(scr)
+
+
+def median_ms(fn, scr, rounds=200):
+    times = sorted(fn(scr) for _ in range(rounds))
+    return times[len(times) // 2] * 1000
+
+
+def main():
+    parse_config("")
+    prerender_hints()
+    scr = lib.get_screen(0)
+
+    print(f"cold activation:        {median_ms(cold, scr):.3f} ms")
+    print(f"prerendered activation: {median_ms(activate, scr):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
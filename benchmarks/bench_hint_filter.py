@@ -0,0 +1,62 @@
+"""
+Per-keystroke cost of narrowing a large hint session.
+
+    python -m benchmarks.bench_hint_filter [nr_hints]
+"""
+
+import string
+import sys
+import time
+
+from benchmarks import fake_platform
+
+fake = fake_platform.install()
+
+from warpy import lib  # noqa: E402
+from warpy.hint import HintLabels, HintManager, HintModel  # noqa: E402
+
+KEYSTROKES = ["", "a", "ab", "abc", "ab", "a", ""]
+
+
+def make_hints(n):
+    hints = []
+    for i, label in enumerate(HintLabels(string.ascii_lowercase, n)):
+        hints.append(HintModel((i * 37) % 3840, (i * 91) % 2160, 20, 20, label))
+    return hints
+
+
+def legacy_filter(hints, s, cap=2048):
+    """The full rescan HintManager.filter used to do on every keystroke."""
+    matched = []
+    for hint in hints:
+        if hint.label.startswith(s) and len(matched) < cap:
+            matched.append(hint)
+    return matched
+
+
+def time_ms(fn, rounds=20):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    scr = lib.get_screen(0)
+    hints = make_hints(n)
+
+    manager = HintManager()
+    manager.set_hints(hints)
+
+    print(f"{n} hints")
+    print(f"{'buffer':>8} {'matched':>8} {'legacy scan':>12} {'filter':>10}")
+    for s in KEYSTROKES:
+        legacy = time_ms(lambda: legacy_filter(hints, s))
+        indexed = time_ms(lambda: (manager.display.invalidate(), manager.filter(scr, s)))
+        assert manager.matched == legacy_filter(manager.hints, s, cap=n)
+        print(f"{s!r:>8} {manager.nr_matched:>8} {legacy:>9.3f} ms {indexed:>7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
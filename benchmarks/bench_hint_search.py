@@ -0,0 +1,81 @@
+"""
+Incremental hint search over element names, per keystroke of a query,
+against a frame budget.
+
+    python -m benchmarks.bench_hint_search [nr_elements]
+"""
+
+import random
+import string
+import sys
+import time
+
+from benchmarks import fake_platform
+
+fake_platform.install()
+
+from warpy.hint import HintIndex, HintModel, place_hints  # noqa: E402
+from warpy.search import HintSearch  # noqa: E402
+
+FRAME_BUDGET_MS = 16.7
+QUERIES = ["save as", "settngs", "open recent file", "zq"]
+
+WORDS = (
+    "file edit view history bookmarks tools help new open save close print undo "
+    "redo cut copy paste delete select find replace zoom reload back forward home "
+    "settings preferences recent tab window account search share export import"
+).split()
+
+
+def make_names(n, seed=1):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).capitalize()
+        for _ in range(n)
+    ]
+
+
+def keystrokes(search, query):
+    """ms to narrow and relabel for each prefix of query, as hint_selection does."""
+    times = []
+    for end in range(1, len(query) + 1):
+        start = time.perf_counter()
+        found = search.search(query[:end], len(string.ascii_lowercase) ** 2)
+        HintIndex(place_hints(found, string.ascii_lowercase))
+        times.append((time.perf_counter() - start) * 1000)
+    return times, len(found)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    hints = [
+        HintModel(i % 3840, i % 2160, 38, 21, "", name)
+        for i, name in enumerate(make_names(n))
+    ]
+
+    start = time.perf_counter()
+    search = HintSearch(hints)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"{n} names, search set up in {build_ms:.1f} ms")
+
+    worst = 0.0
+    for query in QUERIES:
+        times, nr_found = keystrokes(search, query)
+        worst = max(worst, max(times))
+        print(
+            f"{query!r:20} {nr_found:6} matches, "
+            f"per keystroke max {max(times):6.2f} ms, "
+            f"mean {sum(times) / len(times):6.2f} ms"
+        )
+
+        # The linear scan a search replaces
+        start = time.perf_counter()
+        [h for h in hints if query in h.name.lower()]
+        print(f"{'':20} linear scan {(time.perf_counter() - start) * 1000:6.2f} ms")
+
+    verdict = "within" if worst <= FRAME_BUDGET_MS else "OVER"
+    print(f"worst keystroke {worst:.2f} ms, {verdict} the {FRAME_BUDGET_MS} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Average keystrokes per fullscreen hint selection, replaying a synthetic
+user with plain and usage-weighted (hint_weighting) labels.
+
+The user clicks a few favourite spots most of the time, often returns near
+the previous click, and otherwise picks cells at random. Selections are fed
+back into a histfile-like list the way histfile_add records them.
+
+    python -m benchmarks.bench_hint_weighting [strength ...]
+"""
+
+import random
+import string
+import sys
+
+from benchmarks import fake_platform
+
+fake_platform.install()
+
+from warpy.hint import (  # noqa: E402
+    fullscreen_layout,
+    usage_weights,
+    weighted_labels,
+)
+from warpy.histfile import MAX_HIST_ENTS  # noqa: E402
+
+CHARS = string.ascii_lowercase
+SELECTIONS = 2000
+FAVOURITES = 8
+
+
+def record(points, x, y):
+    """histfile_add: drop entries within 30px of the new one, keep the last 100."""
+    points[:] = [p for p in points if abs(p[0] - x) >= 30 or abs(p[1] - y) >= 30]
+    points.append((x, y))
+    del points[:-MAX_HIST_ENTS]
+
+
+def replay(strength, seed=1):
+    rng = random.Random(seed)
+    n = len(CHARS)
+    layout = fullscreen_layout(1920, 1080, CHARS, 38, 21)
+    favourites = rng.sample(range(n * n), FAVOURITES)
+
+    points = []
+    pointer = (960, 540)
+    keystrokes = 0
+    last = favourites[0]
+
+    for _ in range(SELECTIONS):
+        r = rng.random()
+        if r < 0.6:
+            target = favourites[min(int(rng.expovariate(0.5)), FAVOURITES - 1)]
+        elif r < 0.8:
+            i, j = divmod(last, n)
+            i = min(max(i + rng.randint(-1, 1), 0), n - 1)
+            j = min(max(j + rng.randint(-1, 1), 0), n - 1)
+            target = i * n + j
+        else:
+            target = rng.randrange(n * n)
+
+        if strength:
+            weights = usage_weights(layout, n, points, pointer, strength)
+            labels = weighted_labels(CHARS, weights)
+        else:
+            labels = [h.label for h in layout]
+        keystrokes += len(labels[target])
+
+        h = layout[target]
+        pointer = (h.x + h.w // 2, h.y + h.h // 2)
+        record(points, *pointer)
+        last = target
+
+    return keystrokes / SELECTIONS
+
+
+def main():
+    strengths = [int(s) for s in sys.argv[1:]] or [0, 10, 25, 50, 100]
+    for strength in strengths:
+        print(f"hint_weighting {strength:>4}: {replay(strength):.3f} keystrokes/selection")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Time to first paint of a --query session fed by a producer that emits
+targets in batches, compared with the end of input (when the session used
+to start drawing).
+
+    python -m benchmarks.bench_hintspec_stream [nr_targets] [format]
+"""
+
+import json
+import os
+import string
+import struct
+import sys
+import threading
+import time
+
+from benchmarks import fake_platform
+
+fake = fake_platform.install()
+
+from warpy import lib  # noqa: E402
+from warpy.config import parse_config  # noqa: E402
+from warpy.hint import HintLabels, hintspec_mode  # noqa: E402
+from warpy.hintspec import BINARY_MAGIC, RECORD  # noqa: E402
+from warpy.input import input_parse_string  # noqa: E402
+from warpy.schemas import InputEvent  # noqa: E402
+
+BATCH = 2000
+BATCH_INTERVAL = 0.005
+
+
+def encode(fmt, targets):
+    if fmt == "ndjson":
+        return b"".join(
+            json.dumps({"label": label, "x": x, "y": y}).encode() + b"\n"
+            for label, x, y in targets
+        )
+    if fmt == "binary":
+        return b"".join(
+            RECORD.pack(x, y, len(label)) + label.encode() for label, x, y in targets
+        )
+    return b"".join(f"{label} {x} {y}\n".encode() for label, x, y in targets)
+
+
+def produce(fd, fmt, targets, stamps):
+    if fmt == "binary":
+        os.write(fd, BINARY_MAGIC)
+
+    for i in range(0, len(targets), BATCH):
+        os.write(fd, encode(fmt, targets[i : i + BATCH]))
+        time.sleep(BATCH_INTERVAL)
+
+    stamps["eof"] = time.perf_counter()
+    os.close(fd)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    fmt = sys.argv[2] if len(sys.argv) > 2 else "text"
+
+    parse_config("")
+    scr = lib.get_screen(0)
+    labels = HintLabels(string.ascii_lowercase, n)
+    targets = [(labels[i], (i * 37) % 1920, (i * 91) % 1080) for i in range(n)]
+    stamps = {}
+
+    def on_hint_draw(count):
+        stamps.setdefault("first", time.perf_counter())
+        if count == n:
+            stamps["all"] = time.perf_counter()
+            ev = InputEvent()
+            input_parse_string(ev, "esc")
+            ev.pressed = 1
+            fake.events.append(ev)
+
+    fake.on_hint_draw = on_hint_draw
+
+    r, w = os.pipe()
+    os.dup2(r, sys.stdin.fileno())
+    os.close(r)
+
+    producer = threading.Thread(target=produce, args=(w, fmt, targets, stamps))
+    start = time.perf_counter()
+    producer.start()
+    hintspec_mode(scr)
+    producer.join()
+
+    print(f"{n} targets ({fmt}), {BATCH} per {BATCH_INTERVAL * 1000:.0f} ms")
+    print(f"first paint:     {(stamps['first'] - start) * 1000:8.1f} ms")
+    print(f"end of input:    {(stamps['eof'] - start) * 1000:8.1f} ms")
+    print(f"all targets:     {(stamps['all'] - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Wall-clock from exec to the pointer being moved for `main.py --move`.
+
+Runs fresh interpreters against the fake platform and compares the
+--move fast path with the full oneshot initialisation (every subsystem
+imported, config parsed, mouse/hint/scroll set up) it replaced.
+
+    python -m benchmarks.bench_pointer_startup
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import os, sys, time
+sys.path.insert(0, {root!r})
+sys.argv = ["main.py", "--move", "100 200"]
+
+from benchmarks import fake_platform
+
+fake = fake_platform.install()
+
+def moved(x, y):
+    print(time.time_ns(), flush=True)
+    os._exit(0)
+
+fake.on_mouse_move = moved
+
+if {full!r}:
+    import warpy.daemon, warpy.grid, warpy.hint, warpy.mode_loop  # noqa
+    import warpy.mouse, warpy.normal, warpy.scroll, warpy.history  # noqa
+    import main
+    main.x_flag, main.y_flag = 100, 200
+    main.platform_run(main.oneshot_main)
+else:
+    import main
+    main.main()
+"""
+
+
+def once(full, env):
+    code = CHILD.format(root=ROOT, full=full)
+    start = time.time_ns()
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    return (int(out.stdout.split()[-1]) - start) / 1e6
+
+
+def median(full, env, rounds):
+    times = sorted(once(full, env) for _ in range(rounds))
+    return times[len(times) // 2]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, PYTHONDONTWRITEBYTECODE="")
+        env.pop("XDG_CONFIG_HOME", None)
+        env.pop("XDG_DATA_DIR", None)
+
+        # Warm the bytecode and config caches
+        once(True, env)
+        once(False, env)
+
+        full = median(True, env, 15)
+        fast = median(False, env, 15)
+
+    print(f"full oneshot init: {full:8.1f} ms exec -> pointer moved (median)")
+    print(f"--move fast path:  {fast:8.1f} ms exec -> pointer moved (median)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Spatial queries and overlap culling over dense, overlapping element
+rectangles, against linear scans.
+
+    python -m benchmarks.bench_spatial [nr_rects]
+"""
+
+import random
+import string
+import sys
+import time
+
+from benchmarks import fake_platform
+
+fake_platform.install()
+
+from warpy.hint import element_hints  # noqa: E402
+from warpy.spatial import SpatialIndex, distance2, intersection  # noqa: E402
+
+QUERIES = 200
+
+
+def make_rects(n, seed=1):
+    """Clusters of small, heavily overlapping boxes like a busy toolbar or list."""
+    rng = random.Random(seed)
+    centres = [(rng.randrange(3840), rng.randrange(2160)) for _ in range(n // 50 + 1)]
+    rects = []
+    for _ in range(n):
+        cx, cy = rng.choice(centres)
+        x = max(cx + int(rng.gauss(0, 120)), 0)
+        y = max(cy + int(rng.gauss(0, 60)), 0)
+        rects.append((x, y, rng.randint(16, 200), rng.randint(12, 40)))
+    return rects
+
+
+def time_ms(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rects = make_rects(n)
+    rng = random.Random(2)
+    points = [(rng.randrange(3840), rng.randrange(2160)) for _ in range(QUERIES)]
+    regions = [(x, y, 200, 100) for x, y in points]
+
+    build_ms, index = time_ms(lambda: _build(rects))
+
+    def scan_nearest(x, y):
+        return min(range(n), key=lambda i: (distance2(rects[i], x, y), i))
+
+    scan_ms, scan = time_ms(lambda: [scan_nearest(x, y) for x, y in points])
+    nearest_ms, nearest = time_ms(lambda: [index.nearest(x, y) for x, y in points])
+    assert [distance2(rects[i], *p) for i, p in zip(scan, points)] == [
+        distance2(rects[i], *p) for i, p in zip(nearest, points)
+    ]
+
+    region_scan_ms, region_scan = time_ms(
+        lambda: [[i for i in range(n) if intersection(rects[i], r)] for r in regions]
+    )
+    region_ms, region = time_ms(lambda: [index.region(*r) for r in regions])
+    assert region == region_scan
+
+    cull_ms, hints = time_ms(
+        lambda: element_hints(rects, string.ascii_lowercase, 38, 21, (1920, 1080))
+    )
+
+    print(f"{n} rects, index built in {build_ms:.1f} ms")
+    print(f"{QUERIES} nearest queries: scan {scan_ms:7.1f} ms, index {nearest_ms:5.1f} ms")
+    print(f"{QUERIES} region queries: scan {region_scan_ms:7.1f} ms, index {region_ms:5.1f} ms")
+    print(f"culled to {len(hints)} readable hints in {cull_ms:.1f} ms")
+
+
+def _build(rects):
+    index = SpatialIndex(64)
+    for rect in rects:
+        index.insert(rect)
+    return index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Config load time of a oneshot invocation, with and without the compiled
+config cache.
+
+Each run uses a fresh ConfigManager and a cold keymap, like a new process.
+
+    python -m benchmarks.bench_startup
+"""
+
+import os
+import tempfile
+import time
+
+from benchmarks import fake_platform
+
+fake = fake_platform.install()
+
+from warpy.config import ConfigManager  # noqa: E402
+from warpy.input import input_keymap_invalidate  # noqa: E402
+
+CONFIG = """\
+hint_chars: asdfghjkl
+buttons: m , . n
+grid_keys: u i o j k l
+exit: esc q
+speed: 300
+"""
+
+
+def run(load, rounds):
+    times = []
+    for _ in range(rounds):
+        input_keymap_invalidate()
+        start = time.perf_counter()
+        load(ConfigManager())
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2] * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "config")
+        cache_path = os.path.join(tmp, "config.cache")
+        with open(config_path, "w") as fh:
+            fh.write(CONFIG)
+
+        uncached = run(lambda cm: cm.parse_config_file(config_path), 200)
+
+        ConfigManager().parse_config_file_cached(config_path, cache_path)
+        cached = run(lambda cm: cm.parse_config_file_cached(config_path, cache_path), 200)
+
+        cm = ConfigManager()
+        cm.parse_config_file_cached(config_path, cache_path)
+        ref = ConfigManager()
+        ref.parse_config_file(config_path)
+        assert cm.bindings == ref.bindings
+        assert vars(cm.snapshot) == vars(ref.snapshot)
+
+    print(f"parse + validate: {uncached:8.3f} ms (median)")
+    print(f"compiled cache:   {cached:8.3f} ms (median)")
+
+
+if __name__ == "__main__":
+    main()
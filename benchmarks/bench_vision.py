@@ -0,0 +1,152 @@
+"""
+Speed and recall of clickable-region detection on synthetic 1080p
+screenshots with known targets: bordered buttons, bare text links and
+icons, drawn over gradients, panels and separators.
+
+    python -m benchmarks.bench_vision [nr_screens]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import fake_platform
+
+fake_platform.install()
+
+from warpy.vision import detect_boxes  # noqa: E402
+
+W, H = 1920, 1080
+BUDGET_MS = 50
+MIN_IOU = 0.5
+
+
+def glyphs(img, rng, x, y, w, h, color):
+    """Text-like marks: 1-2 px strokes in letter-sized cells."""
+    cx = x
+    while cx + 6 <= x + w:
+        gw = int(rng.integers(4, 8))
+        if rng.random() < 0.15:
+            cx += 4  # word gap
+            continue
+        img[y : y + h, cx : cx + 2] = color
+        img[y + int(rng.integers(0, h - 1)), cx : cx + gw - 1] = color
+        cx += gw + 1
+
+
+def make_screen(seed):
+    """A screenshot (BGRX) and the (x, y, w, h) of its targets."""
+    rng = np.random.default_rng(seed)
+    img = np.empty((H, W, 4), dtype=np.uint8)
+
+    # A soft vertical gradient background
+    ramp = np.linspace(200, 235, H).astype(np.uint8)
+    img[..., :3] = ramp[:, None, None]
+    img[..., 3] = 0
+
+    targets = []
+    occupied = np.zeros((H, W), dtype=bool)
+
+    def place(w, h, margin=12):
+        for _ in range(50):
+            x = int(rng.integers(margin, W - w - margin))
+            y = int(rng.integers(margin, H - h - margin))
+            area = occupied[y - margin : y + h + margin, x - margin : x + w + margin]
+            if not area.any():
+                occupied[y - 4 : y + h + 4, x - 4 : x + w + 4] = True
+                return x, y
+        return None
+
+    # Panels: large framed areas, and separators, which targets stay clear of
+    lines = []
+    for _ in range(3):
+        x, y = int(rng.integers(0, W // 2)), int(rng.integers(0, H // 2))
+        w, h = int(rng.integers(500, 900)), int(rng.integers(300, 500))
+        lines += [
+            (slice(y, y + 1), slice(x, x + w)),
+            (slice(y + h - 1, y + h), slice(x, x + w)),
+            (slice(y, y + h), slice(x, x + 1)),
+            (slice(y, y + h), slice(x + w - 1, x + w)),
+        ]
+    for _ in range(6):
+        y = int(rng.integers(0, H))
+        lines.append((slice(y, y + 1), slice(0, W)))
+
+    for rows, cols in lines:
+        img[rows, cols, :3] = 120
+        occupied[rows, cols] = True
+
+    for _ in range(60):  # buttons
+        w, h = int(rng.integers(60, 160)), int(rng.integers(22, 36))
+        pos = place(w, h)
+        if pos is None:
+            continue
+        x, y = pos
+        img[y : y + h, x : x + w, :3] = rng.integers(150, 255, 3)
+        img[y, x : x + w, :3] = img[y + h - 1, x : x + w, :3] = 90
+        img[y : y + h, x, :3] = img[y : y + h, x + w - 1, :3] = 90
+        glyphs(img, rng, x + 8, y + h // 2 - 5, w - 16, 10, 20)
+        targets.append((x, y, w, h))
+
+    for _ in range(40):  # text links
+        w, h = int(rng.integers(40, 140)), 12
+        pos = place(w, h)
+        if pos is None:
+            continue
+        x, y = pos
+        glyphs(img, rng, x, y, w, h, 40)
+        targets.append((x, y, w, h))
+
+    for _ in range(30):  # icons
+        s = int(rng.integers(16, 32))
+        pos = place(s, s)
+        if pos is None:
+            continue
+        x, y = pos
+        img[y : y + s, x : x + s, :3] = rng.integers(0, 120, 3)
+        targets.append((x, y, s, s))
+
+    return img, targets
+
+
+def iou(a, b):
+    w = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    h = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    return inter / (a[2] * a[3] + b[2] * b[3] - inter)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    screens = [make_screen(seed) for seed in range(n)]
+
+    times = []
+    found = total = detected = matched = 0
+    for img, targets in screens:
+        start = time.perf_counter()
+        boxes = detect_boxes(img)
+        times.append((time.perf_counter() - start) * 1000)
+
+        hits = [max((iou(t, b) for b in boxes), default=0) >= MIN_IOU for t in targets]
+        found += sum(hits)
+        total += len(targets)
+        detected += len(boxes)
+        matched += sum(
+            max((iou(b, t) for t in targets), default=0) >= MIN_IOU for b in boxes
+        )
+
+    times.sort()
+    verdict = "within" if times[len(times) // 2] <= BUDGET_MS else "OVER"
+    print(f"{n} screens {W}x{H}, {total} targets, {detected} boxes detected")
+    print(
+        f"detection median {times[len(times) // 2]:.1f} ms, max {times[-1]:.1f} ms "
+        f"({verdict} the {BUDGET_MS} ms budget)"
+    )
+    print(f"recall {found / total:.1%}, precision {matched / max(detected, 1):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+In-process stand-in for the native X platform layer.
+
+The real ``warpy.lib`` loads the compiled warpd shared object at import time,
+which makes the package impossible to import on a machine without an X
+server. Calling ``install()`` before anything imports ``warpy`` puts a fake
+``warpy.lib`` in place and fills the ``Platform`` struct with Python callbacks
+backed by a US-style keymap, so benchmarks can drive the real config, input
+and hint code paths headlessly.
+
+    from benchmarks import fake_platform
+    fake = fake_platform.install()
+"""
+
+import ctypes
+import os
+import select
+import sys
+import time
+import types
+
+# X keycodes of a US keyboard: code -> (unshifted name, shifted name)
+KEYMAP = {
+    9: ("esc", None),
+    10: ("1", "!"),
+    11: ("2", "@"),
+    12: ("3", "#"),
+    13: ("4", "$"),
+    14: ("5", "%"),
+    15: ("6", "^"),
+    16: ("7", "&"),
+    17: ("8", "*"),
+    18: ("9", "("),
+    19: ("0", ")"),
+    20: ("-", "_"),
+    21: ("=", "+"),
+    22: ("backspace", None),
+    23: ("tab", None),
+    34: ("[", "{"),
+    35: ("]", "}"),
+    36: ("enter", None),
+    37: ("leftcontrol", None),
+    47: (";", ":"),
+    48: ("'", '"'),
+    49: ("`", "~"),
+    50: ("leftshift", None),
+    51: ("\\", "|"),
+    59: (",", "<"),
+    60: (".", ">"),
+    61: ("/", "?"),
+    64: ("leftalt", None),
+    65: ("space", None),
+    133: ("leftmeta", None),
+}
+
+for _code, _c in zip(
+    (24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 38, 39, 40, 41, 42, 43, 44, 45,
+     46, 52, 53, 54, 55, 56, 57, 58),
+    "qwertyuiopasdfghjklzxcvbnm",
+):
+    KEYMAP[_code] = (_c, _c.upper())
+
+
+# inotify, which the X platform's monitor_file uses too
+IN_MODIFY = 0x2
+IN_CLOSE_WRITE = 0x8
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+
+class _FakeFunc:
+    """Callable that tolerates ``argtypes``/``restype`` assignment like a CDLL symbol."""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __call__(self, *args):
+        return self.fn(*args)
+
+
+class FakePlatform:
+    """Records calls made through the ``Platform`` struct and serves a fixed keymap."""
+
+    def __init__(self, screen_w: int = 1920, screen_h: int = 1080):
+        self.screen_w = screen_w
+        self.screen_h = screen_h
+        self.mouse_x = screen_w // 2
+        self.mouse_y = screen_h // 2
+        self.events: list = []
+        self.calls: dict = {}
+        self.drawn_hints: list = []
+        self.callbacks: list = []
+        self.on_mouse_move = None
+        self.on_hint_draw = None
+        self._names = {}
+        self._codes = {}
+        self._inotify = None
+
+        for code, (lower, upper) in KEYMAP.items():
+            self._codes.setdefault(lower, (code, 0))
+            self._names[(code, 0)] = ctypes.create_string_buffer(lower.encode())
+            if upper:
+                self._codes.setdefault(upper, (code, 1))
+                self._names[(code, 1)] = ctypes.create_string_buffer(upper.encode())
+
+    def count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def reset_counts(self) -> None:
+        self.calls.clear()
+
+    # Callbacks wired into the Platform struct.
+
+    def input_lookup_code(self, name, shifted):
+        self.count("input_lookup_code")
+        code, level = self._codes.get(name.decode(), (0, 0))
+        if shifted:
+            shifted[0] = level
+        return code
+
+    def input_lookup_name(self, code, shifted):
+        self.count("input_lookup_name")
+        buf = self._names.get((code, 1 if shifted else 0))
+        return ctypes.addressof(buf) if buf is not None else None
+
+    def input_next_event(self, timeout):
+        self.count("input_next_event")
+        if not self.events:
+            return None
+        self._current = self.events.pop(0)
+        return ctypes.addressof(self._current)
+
+    def screen_get_dimensions(self, scr, w, h):
+        if w:
+            ctypes.cast(w, ctypes.POINTER(ctypes.c_int))[0] = self.screen_w
+        if h:
+            ctypes.cast(h, ctypes.POINTER(ctypes.c_int))[0] = self.screen_h
+
+    def mouse_get_position(self, scr, x, y):
+        if x:
+            ctypes.cast(x, ctypes.POINTER(ctypes.c_int))[0] = self.mouse_x
+        if y:
+            ctypes.cast(y, ctypes.POINTER(ctypes.c_int))[0] = self.mouse_y
+
+    def mouse_move(self, scr, x, y):
+        self.count("mouse_move")
+        self.mouse_x, self.mouse_y = x, y
+        if self.on_mouse_move:
+            self.on_mouse_move(x, y)
+
+    def hint_draw(self, scr, hints, n):
+        self.count("hint_draw")
+        self.drawn_hints.append(n)
+        if self.on_hint_draw:
+            self.on_hint_draw(n)
+
+    def monitor_file(self, path):
+        self.count("monitor_file")
+        if not path:
+            return
+
+        if self._inotify is None:
+            self._inotify = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        _libc.inotify_add_watch(self._inotify, path, IN_MODIFY | IN_CLOSE_WRITE)
+
+    def input_wait(self, events, n):
+        """Sleep until a monitored file changes and return NULL, as X does."""
+        self.count("input_wait")
+        select.select([self._inotify], [], [])
+        try:
+            while os.read(self._inotify, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return None
+
+    def noop(self, name):
+        def fn(*args):
+            self.count(name)
+
+        return fn
+
+
+_installed = None
+
+
+def _fake_lib(fake: FakePlatform) -> types.ModuleType:
+    screens = []
+
+    def get_screen(i):
+        # warpy.schemas cannot be imported until warpy.lib is in place
+        if not screens:
+            from warpy.schemas import Screen
+
+            screens.append(Screen(0, 0, fake.screen_w, fake.screen_h))
+        return ctypes.pointer(screens[i])
+
+    lib = types.SimpleNamespace(
+        get_time_us=_FakeFunc(lambda: int(time.monotonic() * 1_000_000)),
+        get_nr_screens=_FakeFunc(lambda: 1),
+        get_screen=_FakeFunc(get_screen),
+        input_eq=_FakeFunc(lambda ev, s: 0),
+        x_init=_FakeFunc(lambda p: None),
+    )
+
+    mod = types.ModuleType("warpy.lib")
+    mod.lib = lib
+    mod.get_time_us = lib.get_time_us
+    return mod
+
+
+def install(screen_w: int = 1920, screen_h: int = 1080) -> FakePlatform:
+    """Install the fake platform; must run before anything imports ``warpy``."""
+    global _installed
+
+    if _installed is not None:
+        return _installed
+
+    if "warpy.platform" in sys.modules:
+        raise RuntimeError("fake_platform.install() must run before importing warpy")
+
+    fake = FakePlatform(screen_w, screen_h)
+    sys.modules["warpy.lib"] = _fake_lib(fake)
+
+    from warpy.platform import platform
+    from warpy.schemas import Platform
+
+    for name, proto in Platform._fields_:
+        fn = getattr(fake, name, None) or fake.noop(name)
+        if isinstance(proto._restype_, type) and issubclass(
+            proto._restype_, ctypes._Pointer
+        ):
+            # Python callbacks can only return simple types; return an address
+            # and let the struct's own prototype turn it into a pointer.
+            cb = ctypes.CFUNCTYPE(ctypes.c_void_p, *proto._argtypes_)(fn)
+            fake.callbacks.append(cb)
+            setattr(platform, name, ctypes.cast(cb, proto))
+        else:
+            cb = proto(fn)
+            fake.callbacks.append(cb)
+            setattr(platform, name, cb)
+
+    _installed = fake
+    return fake
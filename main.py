@@ -12,21 +12,24 @@ src/platform/linux/X/mouse.c src/platform/linux/X/screen.c \
 """
 
 import argparse
+import ctypes
 import fcntl
-import logging
 import os
 import sys
 
 from warpy import lib, schemas
-from warpy.config import config_get_int, config_print_options, parse_config
-from warpy.daemon import daemon_loop
-from warpy.hint import init_hints
-from warpy.histfile import get_config_path
-from warpy.mode_loop import mode_loop
-from warpy.mouse import init_mouse
-from warpy.platform import platform_run
+from warpy.histfile import get_config_path, histfile_add
+from warpy.platform import get_pointer_screen, platform_run
 
-logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
+# The config, logging and the subsystem modules (daemon, hint, mode_loop,
+# mouse, scroll, ...) are imported by the entry points that need them, so
+# --move/--click never load them.
+
+
+def setup_logging():
+    import logging
+
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
 
 
 def lock():
@@ -73,12 +76,15 @@ def print_usage():
         "  --hint2                     Start warpd in two pass hint mode and exit after the end of the session.\n"
         "  --normal                    Start warpd in normal mode and exit after the end of the session.\n"
         "  --grid                      Start warpd in hint grid and exit after the end of the session.\n"
+        "  --smart-hint                Start warpd in smart hint mode (hints on the clickable elements of the active window) and exit after the end of the session.\n"
         "  --screen                    Start warpd in screen selection mode and exit after the end of the session.\n"
         "  --oneshot                   When paired with one of the mode flags, exit warpd as soon as the mode is complete (i.e don't drop into normal mode). Principally useful for scripting.\n"
         "  --move '<x> <y>'            Move the pointer to the specified coordinates.\n"
         "  --click <button>            Send a mouse click corresponding to the supplied button and exit. May be paired with --move.\n"
         "  -q, --query                 Consumes a list of hints from stdin and presents a one off hint selection.\n"
-        "  --record                    When used with --click, records the event in warpd's hint history.\n\n"
+        "  --record                    When used with --click, records the event in warpd's hint history.\n"
+        "  --batch <file>              Execute move/click/down/up/scroll/sleep commands, one per line, from <file> (- for stdin) and report per-command timing on stderr.\n"
+        "  --rate <n>                  When used with --batch, run at most <n> commands per second.\n\n"
     )
 
 
@@ -97,9 +103,17 @@ def print_keys_main(platform):
 
 
 def daemon_main(platform: schemas.Platform):
+    from warpy.config import parse_config
+    from warpy.daemon import daemon_loop
+    from warpy.hint import init_hints, prerender_hints
+    from warpy.mouse import init_mouse
+    from warpy.scroll import init_scroll
+
     parse_config(CONFIG_PATH)
     init_mouse()
     init_hints()
+    prerender_hints()
+    init_scroll()
 
     daemon_loop(platform, CONFIG_PATH)
 
@@ -111,17 +125,107 @@ x_flag = -1
 y_flag = -1
 record_flag = 0
 mode = 0
+batch_path = None
+batch_rate = 0.0
 
 CONFIG_PATH = get_config_path()
 
 
+def pointer_main(platform: schemas.Platform):
+    """
+    --move/--click without a mode. Only the pointer is touched, so the config
+    is never parsed and no hint/mouse/scroll subsystem is imported or set up.
+    """
+    scr = get_pointer_screen()
+
+    if x_flag != -1 or y_flag != -1:
+        platform.mouse_move(scr, x_flag, y_flag)
+    else:
+        # As in mode_loop: report (and with --record, remember) where the
+        # click lands
+        x = ctypes.c_int()
+        y = ctypes.c_int()
+        platform.mouse_get_position(None, ctypes.byref(x), ctypes.byref(y))
+
+        if record_flag:
+            histfile_add(x.value, y.value)
+
+        print(x.value, y.value)
+
+    if click_flag:
+        platform.mouse_click(click_flag)
+
+    return 0
+
+
+def batch_main(platform: schemas.Platform):
+    from warpy.batch import batch_run
+
+    if batch_path == "-":
+        return batch_run(platform, sys.stdin, batch_rate, sys.stderr)
+
+    with open(batch_path) as fh:
+        return batch_run(platform, fh, batch_rate, sys.stderr)
+
+
+def forward_to_daemon():
+    """
+    Run the requested action in an already running daemon over its control
+    socket. Returns the exit code, or None if no daemon is listening.
+    """
+    from warpy.control import send_commands
+
+    requests = []
+    if mode == schemas.MODE_HINTSPEC:
+        # stdin follows, streamed as it is read and parsed by the daemon
+        requests.append({"cmd": "hintspec"})
+    elif mode:
+        requests.append(
+            {"cmd": "mode", "mode": mode, "oneshot": oneshot_flag, "record": record_flag}
+        )
+    elif x_flag != -1 or y_flag != -1:
+        requests.append({"cmd": "move", "x": x_flag, "y": y_flag})
+
+    if click_flag:
+        requests.append({"cmd": "click", "button": click_flag, "record": record_flag})
+
+    try:
+        responses = send_commands(requests, input_fd=sys.stdin.buffer.fileno())
+    except OSError as e:
+        print(f"ERROR: the daemon stopped responding: {e}", file=sys.stderr)
+        return -1
+
+    if responses is None:
+        return None
+
+    for response in responses:
+        if not response["ok"]:
+            print(f"ERROR: {response['error']}", file=sys.stderr)
+            return -1
+
+    if mode and mode != schemas.MODE_HINTSPEC and oneshot_flag:
+        print(responses[0]["x"], responses[0]["y"])
+    elif click_flag and not mode and x_flag == -1 and y_flag == -1:
+        # A bare --click, see pointer_main
+        print(responses[-1]["x"], responses[-1]["y"])
+
+    return responses[0].get("rc", 0) if responses else 0
+
+
 def oneshot_main(platform: schemas.Platform):
+    from warpy.config import config_get_int, parse_config_cached
+    from warpy.hint import init_hints
+    from warpy.mode_loop import mode_loop
+    from warpy.mouse import init_mouse
+    from warpy.scroll import init_scroll
+
     ret = 0
 
     scr = lib.get_screen(0)  # TODO
-    parse_config(CONFIG_PATH)
+    parse_config_cached(CONFIG_PATH)
     init_mouse()
     init_hints()
+    init_scroll()
 
     platform.mouse_get_position(scr, None, None)
     if x_flag == -1 and y_flag == -1:
@@ -146,6 +250,7 @@ def main():
     config_path = get_config_path("config")
 
     global drag_flag, oneshot_flag, click_flag, x_flag, y_flag, record_flag, mode
+    global batch_path, batch_rate
     parser = argparse.ArgumentParser(
         description="Command-line options parser", add_help=False
     )
@@ -165,6 +270,7 @@ def main():
     parser.add_argument("--grid", action="store_true", help="Enable grid mode")
     parser.add_argument("--normal", action="store_true", help="Enable normal mode")
     parser.add_argument("--hint2", action="store_true", help="Enable hint2 mode")
+    parser.add_argument("--smart-hint", action="store_true", help="Enable smart hint mode")
     parser.add_argument("--history", action="store_true", help="Enable history mode")
     parser.add_argument("--list-options", action="store_true", help="List options")
     parser.add_argument("--oneshot", action="store_true", help="Enable oneshot mode")
@@ -173,6 +279,8 @@ def main():
     parser.add_argument("--record", action="store_true", help="Record mode")
     parser.add_argument("--drag", action="store_true", help="Drag mode")
     parser.add_argument("--screen", action="store_true", help="Screen mode")
+    parser.add_argument("--batch", type=str, help="Batch command file")
+    parser.add_argument("--rate", type=float, default=0.0, help="Batch rate limit")
 
     args = parser.parse_args()
     # Handle arguments
@@ -211,6 +319,9 @@ def main():
     if args.hint2:
         mode = schemas.MODE_HINT2
 
+    if args.smart_hint:
+        mode = schemas.MODE_SMART_HINT
+
     if args.history:
         mode = schemas.MODE_HISTORY
 
@@ -223,11 +334,11 @@ def main():
         oneshot_flag = True
 
     if args.click is not None:
-        click_flag = args.click
+        click_flag = int(args.click)
         oneshot_flag = True
 
     if args.move:
-        x_flag, y_flag = args.move
+        x_flag, y_flag = map(int, args.move.split())
         oneshot_flag = True
 
     if args.record:
@@ -237,18 +348,35 @@ def main():
         drag_flag = True
 
     if args.list_options:
+        from warpy.config import config_print_options
+
         config_print_options()
         exit(0)
 
-    if mode or oneshot_flag:
-        platform_run(oneshot_main)
+    if args.batch:
+        batch_path = args.batch
+        batch_rate = args.rate
+
+    if (mode or oneshot_flag) and not drag_flag and not args.config:
+        rc = forward_to_daemon()
+        if rc is not None:
+            exit(rc)
+
+    if batch_path:
+        platform_run(batch_main)
+    elif not mode and not drag_flag and (x_flag != -1 or click_flag):
+        platform_run(pointer_main)
+    elif mode or oneshot_flag:
+        setup_logging()
+        platform_run(oneshot_main, threads=mode == schemas.MODE_SMART_HINT)
     else:
+        setup_logging()
         lock()
 
         if not foreground:
             daemonize()
         # setvbuf(stdout, NULL, _IOLBF, 0);
-        platform_run(daemon_main)
+        platform_run(daemon_main, threads=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+# The native warpd library needs an X server; run against the in-process
+# fake platform instead. It must be in place before anything imports warpy.
+from benchmarks import fake_platform
+
+fake_platform.install()
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from warpy.capture import CaptureError, ShmCapture
+from warpy.schemas import Screen
+
+W, H = 64, 32
+
+
+@pytest.fixture
+def capture():
+    pytest.importorskip("numpy")
+    if not os.getenv("DISPLAY"):
+        pytest.skip("no X display")
+
+    try:
+        cap = ShmCapture(Screen(0, 0, W, H))
+    except CaptureError as e:
+        pytest.skip(str(e))
+
+    yield cap
+    cap.close()
+
+
+def test_frame_is_a_view_of_the_shared_image(capture):
+    import numpy as np
+
+    frame = capture.capture()
+    assert frame.shape == (H, W, 4)
+    assert frame.dtype == np.uint8
+    assert np.shares_memory(frame, np.frombuffer(capture.buffer, dtype=np.uint8))
+
+    # Later captures land in the same memory
+    assert capture.capture() is frame
+
+
+def test_area_outside_the_screen_is_an_error(capture):
+    with pytest.raises(CaptureError):
+        ShmCapture(Screen(-1, 0, W, H))
+
+
+def test_missing_display_is_an_error():
+    with pytest.raises(CaptureError):
+        ShmCapture(Screen(0, 0, W, H), display=":4242")
@@ -0,0 +1,74 @@
+import pytest
+
+from benchmarks import fake_platform
+from warpy.config import ConfigManager
+from warpy.default_config import DEFAULT_CONFIG
+from warpy.input import input_keymap_invalidate, input_lookup_code
+
+
+@pytest.fixture
+def paths(tmp_path):
+    path = tmp_path / "config"
+    path.write_text("hint_size: 30\nhint_activation_key: A-M-x\n")
+    return str(path), str(tmp_path / "config.cache")
+
+
+@pytest.fixture
+def swap_keys():
+    """Swaps the keys x and y when called, as a change of keyboard layout would."""
+    fake = fake_platform.install()
+    names, codes = dict(fake._names), dict(fake._codes)
+
+    def swap():
+        for a, b in (("x", "y"), ("X", "Y")):
+            fake._codes[a], fake._codes[b] = codes[b], codes[a]
+            fake._names[codes[a]] = names[codes[b]]
+            fake._names[codes[b]] = names[codes[a]]
+        input_keymap_invalidate()
+
+    yield swap
+
+    fake._names.update(names)
+    fake._codes.update(codes)
+    input_keymap_invalidate()
+
+
+def parse_cached(paths) -> ConfigManager:
+    manager = ConfigManager()
+    manager.parse_config_file_cached(*paths)
+    return manager
+
+
+def test_unchanged_config_is_loaded_from_the_cache(paths, monkeypatch):
+    parse_cached(paths)
+
+    def parse_config_file(self, path):
+        pytest.fail("the cache was discarded")
+
+    monkeypatch.setattr(ConfigManager, "parse_config_file", parse_config_file)
+    assert parse_cached(paths).snapshot.hint_size == 30
+
+
+def test_changed_config_file_discards_the_cache(paths):
+    parse_cached(paths)
+    with open(paths[0], "a") as fh:
+        fh.write("hint_size: 40\n")
+
+    assert parse_cached(paths).snapshot.hint_size == 40
+
+
+def test_changed_defaults_discard_the_cache(paths, monkeypatch):
+    parse_cached(paths)
+    monkeypatch.setitem(DEFAULT_CONFIG["hint_border_radius"], "val", "7")
+
+    assert parse_cached(paths).snapshot.hint_border_radius == 7
+
+
+def test_remapped_key_name_discards_the_cache(paths, swap_keys):
+    before = parse_cached(paths).entries["hint_activation_key"].events
+    swap_keys()
+
+    code, _ = input_lookup_code("x")
+    after = parse_cached(paths).entries["hint_activation_key"].events
+    assert after != before
+    assert after[0][0] == code
@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+import pytest
+
+from benchmarks import fake_platform
+from warpy.config import WHITELIST_PROFILES
+from warpy.control import get_socket_path, send_commands
+from warpy.daemon import ConfigReloader, daemon_loop
+from warpy.hintspec import BINARY_MAGIC, RECORD
+from warpy.input import input_lookup_code, input_parse_string
+from warpy.platform import PLATFORM_MOD_ALT, PLATFORM_MOD_META, platform
+from warpy.schemas import InputEvent
+
+
+@pytest.fixture(scope="module")
+def daemon(tmp_path_factory):
+    """The control socket of a daemon_loop, which never returns."""
+    with pytest.MonkeyPatch.context() as m:
+        m.setenv("XDG_RUNTIME_DIR", str(tmp_path_factory.mktemp("run")))
+        path = get_socket_path()
+
+        # Sits in input_wait() until a request wakes it
+        threading.Thread(target=daemon_loop, args=(platform,), daemon=True).start()
+        deadline = time.monotonic() + 5
+        while not os.path.exists(path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    return path
+
+
+def press(key: str) -> None:
+    ev = InputEvent()
+    input_parse_string(ev, key)
+    fake_platform.install().events.append(ev)
+
+
+def test_activation_keys_are_parsed_on_reload():
+    reloader = ConfigReloader(None)
+    reloader.reload()
+
+    i = WHITELIST_PROFILES["daemon"].index("hint_activation_key")
+    ev = reloader.activation_events[i]
+    assert ev.code == input_lookup_code("x")[0]
+    assert ev.mods == PLATFORM_MOD_ALT | PLATFORM_MOD_META
+
+
+def test_control_requests_run_on_the_daemon_loop(daemon):
+    responses = send_commands(
+        [{"cmd": "move", "x": 10, "y": 20}, {"cmd": "position"}], daemon
+    )
+    assert responses == [{"ok": True}, {"ok": True, "x": 10, "y": 20}]
+
+
+def test_hintspec_input_is_streamed_as_raw_bytes(daemon):
+    r, w = os.pipe()
+    result = {}
+
+    def query():
+        requests = [{"cmd": "hintspec"}, {"cmd": "position"}]
+        result["responses"] = send_commands(requests, daemon, input_fd=r)
+
+    client = threading.Thread(target=query)
+    client.start()
+
+    # Coordinates that are not valid utf-8 or look like a line ending
+    os.write(w, BINARY_MAGIC + RECORD.pack(200, 50, 1) + b"a")
+    os.write(w, RECORD.pack(13, 13, 1) + b"b")
+    os.close(w)
+    press("b")
+
+    client.join(5)
+    os.close(r)
+    hintspec, position = result["responses"]
+    assert hintspec["ok"] and (hintspec["x"], hintspec["y"]) == (13, 13)
+    assert position == {"ok": True, "x": 13, "y": 13}
+
+
+def test_hintspec_session_can_end_before_its_input(daemon):
+    r, w = os.pipe()
+    os.write(w, b"a 100 100\n")
+    press("esc")
+
+    try:
+        requests = [{"cmd": "hintspec"}, {"cmd": "position"}]
+        hintspec, position = send_commands(requests, daemon, input_fd=r)
+    finally:
+        os.close(w)
+
+    assert hintspec["ok"] and hintspec["rc"] == -1
+    assert position["ok"]
@@ -0,0 +1,114 @@
+import pytest
+
+from benchmarks import fake_platform
+from warpy.config import parse_config
+from warpy.hint import (
+    MAX_LABEL,
+    HintIndex,
+    HintLabels,
+    HintModel,
+    _hint_manager,
+    element_targets,
+    place_hints,
+    weighted_labels,
+)
+from warpy.input import input_parse_string
+from warpy.lib import lib
+from warpy.schemas import InputEvent
+
+CHARS = "asdfghjkl"
+
+
+def assert_prefix_free(labels):
+    assert len(set(labels)) == len(labels)
+
+    # A label prefixing another sorts right before one it prefixes
+    ordered = sorted(labels)
+    for a, b in zip(ordered, ordered[1:]):
+        assert not b.startswith(a), (a, b)
+
+
+@pytest.mark.parametrize("n", [0, 1, 9, 10, 80, 81, 82, 700, 5000])
+def test_labels_are_prefix_free_and_shortest_first(n):
+    labels = HintLabels(CHARS, n)
+    assert len(labels) == n
+    assert_prefix_free(list(labels))
+    assert [len(label) for label in labels] == sorted(len(label) for label in labels)
+
+
+@pytest.mark.parametrize("n", [1, 9, 10, 82, 5000])
+def test_iteration_matches_indexing(n):
+    labels = HintLabels(CHARS, n)
+    assert list(labels) == [labels[i] for i in range(n)]
+    assert labels[-1] == labels[n - 1]
+    assert labels[2:5] == list(labels)[2:5]
+
+
+def test_full_grid_is_every_pair_of_chars():
+    n = len(CHARS)
+    expected = [CHARS[i] + CHARS[j] for i in range(n) for j in range(n)]
+
+    assert list(HintLabels(CHARS, n * n)) == expected
+    assert weighted_labels(CHARS, [1.0] * n * n) == expected
+
+
+def test_label_length_limits():
+    with pytest.raises(ValueError):
+        HintLabels("a", 2)
+    with pytest.raises(ValueError):
+        HintLabels("ab", 2 ** (MAX_LABEL + 1))
+    with pytest.raises(ValueError):
+        weighted_labels("a", [1.0, 1.0])
+
+
+def test_heavier_targets_get_shorter_labels():
+    weights = [1.0] * 100
+    weights[42] = 50.0
+    labels = weighted_labels(CHARS, weights)
+
+    assert_prefix_free(labels)
+    assert labels[42] == CHARS[0]
+    assert len(labels[42]) <= min(map(len, labels))
+
+
+def test_few_targets_get_one_char_each():
+    assert weighted_labels(CHARS, [1.0, 3.0, 2.0]) == ["d", "a", "s"]
+
+
+def test_merged_index_matches_a_fresh_one():
+    labels = list(HintLabels(CHARS, 500))
+    hints = [HintModel(i, 2 * i, 10, 10, label) for i, label in enumerate(labels)]
+    old, new = hints[::3], [h for i, h in enumerate(hints) if i % 3]
+
+    merged = HintIndex(old).merged(new)
+    fresh = HintIndex(hints)
+    assert merged.labels == fresh.labels
+    assert bytes(merged.buffer) == bytes(fresh.buffer)
+    assert merged.subsets == fresh.subsets
+
+
+def test_search_reaches_culled_elements():
+    fake = fake_platform.install()
+    parse_config(None)
+
+    # The second element's hint would mostly cover the first one's
+    rects = [(100, 100, 40, 20), (110, 100, 40, 20)]
+    targets = element_targets(rects, 40, 20, (0, 0), ["Save", "Open"])
+    hints = place_hints(targets, "asdf")
+    assert [h.name for h in hints] == ["Save"]
+
+    # Search for the culled one, then escape should the search not select it
+    for key in ["/", "o", "p", "e", "n", "esc"]:
+        ev = InputEvent()
+        input_parse_string(ev, key)
+        fake.events.append(ev)
+
+    try:
+        rc = _hint_manager.hint_selection(
+            lib.get_screen(0), hints, len(hints), targets=targets
+        )
+    finally:
+        fake.events.clear()
+
+    assert rc == 0
+    assert (fake.mouse_x, fake.mouse_y) == (130, 110)
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from warpy.hintspec import (
+    BINARY_MAGIC,
+    FORMAT_BINARY,
+    FORMAT_NDJSON,
+    FORMAT_TEXT,
+    RECORD,
+    HintSpecParser,
+    parse_hintspec,
+)
+
+TARGETS = [("a", 10, 20), ("sé", 300, 13), ("dd", 200, 0)]
+
+
+def encode(fmt, targets):
+    if fmt == FORMAT_NDJSON:
+        return b"".join(
+            json.dumps({"label": label, "x": x, "y": y}).encode() + b"\n"
+            for label, x, y in targets
+        )
+    if fmt == FORMAT_BINARY:
+        return BINARY_MAGIC + b"".join(
+            RECORD.pack(x, y, len(label.encode())) + label.encode()
+            for label, x, y in targets
+        )
+    return b"".join(f"{label} {x} {y}\n".encode() for label, x, y in targets)
+
+
+def feed_bytewise(data: bytes) -> tuple[HintSpecParser, list]:
+    parser = HintSpecParser()
+    specs = []
+    for i in range(len(data)):
+        specs += parser.feed(data[i : i + 1])
+    return parser, specs
+
+
+@pytest.mark.parametrize("fmt", [FORMAT_TEXT, FORMAT_NDJSON, FORMAT_BINARY])
+def test_targets_arrive_as_soon_as_they_are_complete(fmt):
+    parser, specs = feed_bytewise(encode(fmt, TARGETS))
+
+    assert parser.format == fmt
+    assert specs == TARGETS
+    assert parser.close() == []
+
+
+@pytest.mark.parametrize("fmt", [FORMAT_TEXT, FORMAT_NDJSON])
+def test_last_line_may_lack_a_newline(fmt):
+    parser, specs = feed_bytewise(encode(fmt, TARGETS).rstrip(b"\n"))
+
+    assert specs == TARGETS[:-1]
+    assert parser.close() == TARGETS[-1:]
+
+
+def test_truncated_binary_record_is_an_error():
+    parser, specs = feed_bytewise(encode(FORMAT_BINARY, TARGETS)[:-1])
+
+    assert specs == TARGETS[:-1]
+    with pytest.raises(ValueError, match="truncated"):
+        parser.close()
+
+
+def test_bad_ndjson_line_is_an_error():
+    parser = HintSpecParser()
+    assert parser.feed(encode(FORMAT_NDJSON, TARGETS[:1])) == TARGETS[:1]
+
+    with pytest.raises(ValueError, match="invalid ndjson"):
+        parser.feed(b'{"label": "b", "x": 1}\n')
+
+
+def test_short_text_line_ends_the_input():
+    data = encode(FORMAT_TEXT, TARGETS[:1]) + b"\n" + encode(FORMAT_TEXT, TARGETS[1:])
+    parser, specs = feed_bytewise(data)
+
+    assert specs == TARGETS[:1]
+    assert parser.finished
+    assert parser.close() == []
+
+
+def test_empty_input_has_no_targets():
+    assert parse_hintspec(b"") == []
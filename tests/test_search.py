@@ -0,0 +1,33 @@
+from warpy.hint import HintModel
+from warpy.search import HintSearch
+
+NAMES = ["Save", "Save as", "Autosave", "Open recent file", "Settings", "Close", "Ignore"]
+
+
+def names(hints):
+    return [h.name for h in hints]
+
+
+def search():
+    return HintSearch([HintModel(0, 0, 1, 1, "", name) for name in NAMES])
+
+
+def test_prefix_then_word_then_infix():
+    assert names(search().search("sav")) == ["Save", "Save as", "Autosave"]
+    assert names(search().search("re")) == ["Open recent file", "Ignore"]
+
+
+def test_narrowing_matches_a_fresh_search():
+    s = search()
+    for query in ["s", "se", "set", "sett"]:
+        assert names(s.search(query)) == names(search().search(query))
+
+
+def test_limit():
+    assert names(search().search("s", 2)) == ["Save", "Save as"]
+
+
+def test_fuzzy_fallback():
+    assert names(search().search("settngs")) == ["Settings"]
+    assert names(search().search("open recnt file")) == ["Open recent file"]
+    assert search().search("xyz") == []
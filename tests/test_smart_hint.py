@@ -0,0 +1,296 @@
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import wait
+from typing import Dict, List, Optional
+
+import pytest
+
+from warpy import smart_hint
+from warpy.config import config_manager, parse_config
+from warpy.element_cache import ElementCache
+from warpy.smart_hint import Element, ElementProvider, Geometry, SmartHintPipeline
+
+WINDOW = 7
+GEOMETRY = (100, 50, 800, 600)
+BUDGET = 0.05
+# Longer than anything here takes, however loaded the machine
+TIMEOUT = 5.0
+
+
+class FakeProvider(ElementProvider):
+    """
+    Serves fixed elements. With a gate, scans wait for it to be opened, and
+    so does looking up a window class, like a provider with one connection.
+    """
+
+    def __init__(
+        self,
+        elements: Dict[Optional[int], Optional[List[Element]]],
+        name: str = "fake",
+        gate: Optional[threading.Event] = None,
+    ):
+        self.name = name
+        self.fixed = elements
+        self.gate = gate
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def active_window(self) -> Optional[int]:
+        return WINDOW
+
+    def window_geometry(self, window: Optional[int]) -> Optional[Geometry]:
+        return GEOMETRY if window == WINDOW else None
+
+    def window_class(self, window: Optional[int]) -> Optional[str]:
+        with self.lock:
+            return "Editor" if window == WINDOW else None
+
+    def elements(self, window: Optional[int]) -> Optional[List[Element]]:
+        with self.lock:
+            self.calls += 1
+            if self.gate:
+                self.gate.wait(TIMEOUT)
+            return self.fixed.get(window)
+
+
+def element(x: int, name: str = "") -> Element:
+    return Element(x, 100, 40, 20, name)
+
+
+def wait_until(predicate) -> None:
+    deadline = time.monotonic() + TIMEOUT
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def gate():
+    gate = threading.Event()
+    yield gate
+    gate.set()
+
+
+@pytest.fixture
+def restore_globals():
+    """Put back the config and the pipeline a test replaces."""
+    config = dict(config_manager.__dict__)
+    pipeline = (smart_hint._pipeline, smart_hint._pipeline_names)
+
+    yield
+
+    watcher = smart_hint._watcher
+    if watcher:
+        watcher.stop()
+        watcher.join(TIMEOUT)
+    if smart_hint._pipeline and smart_hint._pipeline is not pipeline[0]:
+        smart_hint._pipeline.close()
+
+    config_manager.__dict__.update(config)
+    smart_hint._pipeline, smart_hint._pipeline_names = pipeline
+
+
+class FakeDisplay:
+    """An X connection on which no event ever arrives."""
+
+    def __init__(self):
+        self.read_fd, self.write_fd = os.pipe()
+        self.closed = False
+
+    def fileno(self) -> int:
+        return self.read_fd
+
+    def screen(self):
+        root = types.SimpleNamespace(change_attributes=lambda **kw: None)
+        return types.SimpleNamespace(root=root)
+
+    def intern_atom(self, name: str) -> int:
+        return 1
+
+    def create_resource_object(self, kind: str, id: int):
+        return types.SimpleNamespace(change_attributes=lambda **kw: None)
+
+    def flush(self) -> None:
+        pass
+
+    def pending_events(self) -> int:
+        return 0
+
+    def next_event(self):
+        # Blocks like python-xlib's until an event arrives, that is forever
+        threading.Event().wait()
+
+    def close(self) -> None:
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+        self.closed = True
+
+
+@pytest.fixture
+def fake_xlib(monkeypatch):
+    """Stands in for python-xlib, returning the displays it opens."""
+    displays = []
+
+    def open_display():
+        displays.append(FakeDisplay())
+        return displays[-1]
+
+    error = types.SimpleNamespace(CatchError=lambda *a: None, BadWindow=None)
+    modules = {
+        "Xlib": types.SimpleNamespace(),
+        "Xlib.X": types.SimpleNamespace(
+            PropertyChangeMask=1,
+            StructureNotifyMask=2,
+            PropertyNotify=3,
+            ConfigureNotify=4,
+        ),
+        "Xlib.display": types.SimpleNamespace(Display=open_display),
+        "Xlib.error": error,
+    }
+    modules["Xlib"].X = modules["Xlib.X"]
+    modules["Xlib"].display = modules["Xlib.display"]
+    modules["Xlib"].error = error
+    for name, module in modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
+
+    return displays
+
+
+def test_fast_provider_answers():
+    pipeline = SmartHintPipeline([FakeProvider({WINDOW: [element(1)]})])
+
+    assert pipeline.collect(WINDOW, GEOMETRY, TIMEOUT) == [element(1)]
+
+
+def test_slow_provider_falls_back_then_serves_its_results(gate):
+    slow = FakeProvider({WINDOW: [element(2)]}, gate=gate)
+    pipeline = SmartHintPipeline([slow])
+
+    # Nothing known within the budget: smart hint mode shows fullscreen hints
+    assert pipeline.collect(WINDOW, GEOMETRY, BUDGET) is None
+
+    # The scan kept running, and its results land in the cache
+    gate.set()
+    wait_until(lambda: pipeline.cache)
+
+    # The next activation gets them without waiting for its own scan
+    gate.clear()
+    start = time.monotonic()
+    assert pipeline.collect(WINDOW, GEOMETRY, TIMEOUT) == [element(2)]
+    assert time.monotonic() - start < TIMEOUT / 2
+
+
+def test_slow_provider_does_not_hold_up_a_fast_one(gate):
+    fast = FakeProvider({WINDOW: [element(1)]}, name="fast")
+    slow = FakeProvider({WINDOW: [element(2)]}, name="slow", gate=gate)
+    pipeline = SmartHintPipeline([fast, slow])
+
+    assert pipeline.collect(WINDOW, GEOMETRY, 10 * BUDGET) == [element(1)]
+
+    gate.set()
+    wait_until(lambda: len(pipeline.cache) == 2)
+    assert sorted(pipeline.collect(WINDOW, GEOMETRY, BUDGET)) == [element(1), element(2)]
+
+
+def test_scans_of_a_window_are_shared(gate):
+    slow = FakeProvider({WINDOW: [element(1)]}, gate=gate)
+    pipeline = SmartHintPipeline([slow])
+
+    pipeline.prefetch()
+    prefetched = list(pipeline.pending.values())
+    assert pipeline.submit(WINDOW, GEOMETRY) == prefetched
+
+    gate.set()
+    wait(prefetched)
+    assert slow.calls == 1
+
+
+def test_stored_layout_is_served_while_a_scan_runs(tmp_path, gate):
+    slow = FakeProvider({WINDOW: [element(1)]}, gate=gate)
+    store = ElementCache(os.path.join(tmp_path, "elements"))
+    store.put(("fake", "Editor", 800, 600), [(10, 20, 40, 20, "Save")])
+    pipeline = SmartHintPipeline([slow], store)
+
+    pipeline.prefetch()
+    wait_until(lambda: slow.calls)
+
+    # The scan holds the provider up, but the layout is known without it
+    start = time.monotonic()
+    elements = pipeline.collect(WINDOW, GEOMETRY, BUDGET)
+    assert elements == [Element(110, 70, 40, 20, "Save")]
+    assert time.monotonic() - start < TIMEOUT / 2
+
+
+def test_unsupported_window_is_not_cached():
+    pipeline = SmartHintPipeline([FakeProvider({WINDOW: None})])
+
+    assert pipeline.collect(WINDOW, GEOMETRY, TIMEOUT) is None
+    assert not pipeline.cache
+
+
+def test_no_window_skips_the_cache():
+    provider = FakeProvider({None: [element(3)]})
+    pipeline = SmartHintPipeline([provider])
+
+    assert pipeline.collect(None, None, TIMEOUT) == [element(3)]
+    assert pipeline.collect(None, None, TIMEOUT) == [element(3)]
+    assert provider.calls == 2
+    assert not pipeline.cache
+
+
+def test_unknown_provider_is_a_config_error(tmp_path):
+    path = os.path.join(tmp_path, "config")
+    with open(path, "w") as fh:
+        fh.write("smart_hint_providers: xtree nonsense\n")
+
+    with pytest.raises(SystemExit):
+        parse_config(path)
+
+
+def test_focus_watcher_prefetches_until_turned_off(tmp_path, restore_globals):
+    path = os.path.join(tmp_path, "config")
+    with open(path, "w") as fh:
+        fh.write("smart_hint_prefetch: 10\n")
+    parse_config(path)
+
+    provider = FakeProvider({WINDOW: [element(1)]})
+    smart_hint.use_providers([provider])
+
+    watcher = smart_hint.start_focus_watcher()
+    assert smart_hint.start_focus_watcher() is watcher
+    wait_until(lambda: provider.calls)
+
+    # The window did not change
+    time.sleep(5 * BUDGET)
+    assert provider.calls == 1
+
+    with open(path, "w") as fh:
+        fh.write("smart_hint_prefetch: 0\n")
+    parse_config(path)
+    watcher.join(TIMEOUT)
+    assert not watcher.is_alive()
+    assert smart_hint.start_focus_watcher() is None
+
+
+def test_focus_watcher_stops_without_waiting_for_an_event(
+    tmp_path, restore_globals, fake_xlib
+):
+    path = os.path.join(tmp_path, "config")
+    with open(path, "w") as fh:
+        fh.write("smart_hint_prefetch: 10\n")
+    parse_config(path)
+
+    provider = FakeProvider({WINDOW: [element(1)]})
+    smart_hint.use_providers([provider])
+
+    watcher = smart_hint.start_focus_watcher()
+    wait_until(lambda: provider.calls)
+
+    # Listening on the display, where nothing happens
+    watcher.stop()
+    watcher.join(TIMEOUT)
+    assert not watcher.is_alive()
+    assert [d.closed for d in fake_xlib] == [True]
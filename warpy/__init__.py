@@ -1,4 +1,22 @@
-from .config import *  # noqa: F401, F403
 from .platform import *  # noqa: F403
 from .lib import *  # noqa: F403
-from .default_config import *  # noqa: F403
+
+
+def __getattr__(name):
+    # The config names are re-exported lazily: warpy.config pulls in logging,
+    # re and enum, which pointer-only invocations (--move/--click) never need.
+    # import_module rather than "from . import", which would come back here
+    # when name is itself one of these submodules.
+    from importlib import import_module
+
+    config = import_module(".config", __name__)
+    default_config = import_module(".default_config", __name__)
+
+    if name in globals():
+        return globals()[name]
+
+    for module in (config, default_config):
+        if hasattr(module, name):
+            return getattr(module, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
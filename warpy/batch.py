@@ -0,0 +1,135 @@
+import sys
+import time
+from typing import Iterable, Optional, TextIO
+
+from warpy.platform import get_pointer_screen
+from warpy.scroll import SCROLL_DOWN, SCROLL_LEFT, SCROLL_RIGHT, SCROLL_UP
+
+SCROLL_DIRECTIONS = {
+    "down": SCROLL_DOWN,
+    "right": SCROLL_RIGHT,
+    "left": SCROLL_LEFT,
+    "up": SCROLL_UP,
+}
+
+USAGE = {
+    "move": "move <x> <y>",
+    "click": "click [button]",
+    "down": "down [button]",
+    "up": "up [button]",
+    "scroll": "scroll up|down|left|right [units]",
+    "sleep": "sleep <ms>",
+}
+
+# Converters of each command's arguments, and how many of them are required
+SIGNATURES = {
+    "move": ((int, int), 2),
+    "click": ((int,), 0),
+    "down": ((int,), 0),
+    "up": ((int,), 0),
+    "scroll": ((SCROLL_DIRECTIONS.__getitem__, int), 1),
+    "sleep": ((int,), 1),
+}
+
+
+class BatchError(Exception):
+    pass
+
+
+class BatchRunner:
+    """
+    Executes a stream of pointer commands within a single platform session,
+    one command per line:
+
+        move 100 200
+        click 1
+        scroll down 3
+        sleep 50
+
+    Blank lines and lines starting with # are ignored.
+    """
+
+    def __init__(self, platform, rate: float = 0, report: Optional[TextIO] = None):
+        self.platform = platform
+        # Like --move, coordinates are relative to the screen under the
+        # pointer, taken once so they mean the same for the whole stream
+        self.scr = get_pointer_screen()
+        # Minimum seconds between the start of two commands, 0 for no limit
+        self.interval = 1 / rate if rate > 0 else 0
+        self.report = report
+
+    def run(self, lines: Iterable[str]) -> int:
+        n = 0
+        total = 0.0
+        next_start = time.perf_counter()
+
+        for lineno, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            if self.interval:
+                delay = next_start - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            start = time.perf_counter()
+            try:
+                self.execute(line.split())
+            except BatchError as e:
+                print(f"ERROR: line {lineno}: {e}", file=sys.stderr)
+                return -1
+            elapsed = time.perf_counter() - start
+
+            next_start = start + self.interval
+            n += 1
+            total += elapsed
+
+            if self.report:
+                print(f"{lineno}\t{line}\t{elapsed * 1000:.3f} ms", file=self.report)
+
+        if self.report and n:
+            print(
+                f"{n} commands in {total * 1000:.3f} ms "
+                f"({total * 1000 / n:.3f} ms avg)",
+                file=self.report,
+            )
+        return 0
+
+    def execute(self, argv: list) -> None:
+        cmd, args = argv[0], argv[1:]
+        if cmd not in SIGNATURES:
+            raise BatchError(f"unknown command: {cmd}")
+
+        converters, required = SIGNATURES[cmd]
+        if not required <= len(args) <= len(converters):
+            raise BatchError(f"usage: {USAGE[cmd]}")
+
+        try:
+            values = [convert(arg) for convert, arg in zip(converters, args)]
+        except (ValueError, KeyError):
+            raise BatchError(f"usage: {USAGE[cmd]}")
+
+        getattr(self, f"cmd_{cmd}")(*values)
+
+    def cmd_move(self, x: int, y: int) -> None:
+        self.platform.mouse_move(self.scr, x, y)
+
+    def cmd_click(self, button: int = 1) -> None:
+        self.platform.mouse_click(button)
+
+    def cmd_down(self, button: int = 1) -> None:
+        self.platform.mouse_down(button)
+
+    def cmd_up(self, button: int = 1) -> None:
+        self.platform.mouse_up(button)
+
+    def cmd_scroll(self, direction: int, units: int = 1) -> None:
+        for _ in range(units):
+            self.platform.scroll(direction)
+
+    def cmd_sleep(self, ms: int) -> None:
+        time.sleep(ms / 1000)
+
+def batch_run(platform, lines: Iterable[str], rate: float = 0, report=None) -> int:
+    return BatchRunner(platform, rate, report).run(lines)
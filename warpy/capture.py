@@ -0,0 +1,262 @@
+import ctypes
+import ctypes.util
+import os
+from typing import Optional
+
+from warpy.schemas import Screen
+
+# Screen capture through a MIT-SHM XImage. The X server writes the pixels
+# straight into a shared memory segment, which NumPy (an optional
+# dependency, imported on first use) then views without copying.
+
+ZPIXMAP = 2
+ALL_PLANES = ctypes.c_ulong(-1).value
+
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+
+
+class CaptureError(Exception):
+    pass
+
+
+class XImage(ctypes.Structure):
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+        ("obdata", ctypes.c_void_p),
+        ("f", ctypes.c_void_p * 6),  # Image manipulation routines
+    ]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+_libs = None
+
+
+def _load():
+    """libX11, libXext and libc, loaded on first use."""
+    global _libs
+
+    if _libs is not None:
+        return _libs
+
+    paths = [ctypes.util.find_library(name) for name in ("X11", "Xext", "c")]
+    if not all(paths):
+        raise CaptureError("screen capture needs libX11 and libXext")
+    x11, xext = ctypes.CDLL(paths[0]), ctypes.CDLL(paths[1])
+    libc = ctypes.CDLL(paths[2], use_errno=True)
+
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XOpenDisplay.restype = ctypes.c_void_p
+    x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+    x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+    x11.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XRootWindow.restype = ctypes.c_ulong
+    x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDefaultVisual.restype = ctypes.c_void_p
+    x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDestroyImage.argtypes = [ctypes.POINTER(XImage)]
+
+    shminfo_p = ctypes.POINTER(XShmSegmentInfo)
+    xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+    xext.XShmCreateImage.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_void_p,
+        ctypes.c_uint,
+        ctypes.c_int,
+        ctypes.c_void_p,
+        shminfo_p,
+        ctypes.c_uint,
+        ctypes.c_uint,
+    ]
+    xext.XShmCreateImage.restype = ctypes.POINTER(XImage)
+    xext.XShmAttach.argtypes = [ctypes.c_void_p, shminfo_p]
+    xext.XShmDetach.argtypes = [ctypes.c_void_p, shminfo_p]
+    xext.XShmGetImage.argtypes = [
+        ctypes.c_void_p,
+        ctypes.c_ulong,
+        ctypes.POINTER(XImage),
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_ulong,
+    ]
+
+    libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+    libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+    libc.shmat.restype = ctypes.c_void_p
+    libc.shmdt.argtypes = [ctypes.c_void_p]
+    libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+    _libs = x11, xext, libc
+    return _libs
+
+
+class ShmCapture:
+    """
+    Captures the area of a Screen (see lib.get_screen) into a shared memory
+    XImage. frame() is a (h, w, 4) uint8 NumPy view of that memory, in the
+    byte order of the visual (BGRX on the usual little-endian 24 bit
+    visuals). Every capture overwrites the same memory, so copy frames that
+    must outlive the next capture, and drop them before close().
+    """
+
+    def __init__(self, scr, display: Optional[str] = None):
+        screen: Screen = scr.contents if isinstance(scr, ctypes._Pointer) else scr
+        self.x, self.y, self.w, self.h = screen.x, screen.y, screen.w, screen.h
+
+        x11, xext, _ = _load()
+        self.dpy = x11.XOpenDisplay(display.encode() if display else None)
+        if not self.dpy:
+            raise CaptureError(f"cannot open display {display or os.getenv('DISPLAY')}")
+
+        self.image = None
+        self.shminfo = XShmSegmentInfo(shmid=-1)
+        self.attached = False
+        self.buffer = None
+        self._frame = None
+
+        try:
+            self._attach()
+        except CaptureError:
+            self.close()
+            raise
+
+    def _attach(self) -> None:
+        x11, xext, libc = _load()
+        dpy = self.dpy
+
+        if not xext.XShmQueryExtension(dpy):
+            raise CaptureError("the X server does not support MIT-SHM")
+
+        n = x11.XDefaultScreen(dpy)
+        self.root = x11.XRootWindow(dpy, n)
+
+        # Xlib's default error handler would exit on an out of bounds grab
+        rw, rh = x11.XDisplayWidth(dpy, n), x11.XDisplayHeight(dpy, n)
+        if self.x < 0 or self.y < 0 or self.x + self.w > rw or self.y + self.h > rh:
+            raise CaptureError(
+                f"screen {self.w}x{self.h}+{self.x}+{self.y} is outside the "
+                f"{rw}x{rh} root window"
+            )
+        self.image = xext.XShmCreateImage(
+            dpy,
+            x11.XDefaultVisual(dpy, n),
+            x11.XDefaultDepth(dpy, n),
+            ZPIXMAP,
+            None,
+            ctypes.byref(self.shminfo),
+            self.w,
+            self.h,
+        )
+        if not self.image:
+            raise CaptureError("XShmCreateImage failed")
+
+        img = self.image.contents
+        if img.bits_per_pixel != 32:
+            raise CaptureError(f"unsupported {img.bits_per_pixel} bit pixels")
+
+        size = img.bytes_per_line * img.height
+        shmid = libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if shmid < 0:
+            raise CaptureError(f"shmget: {os.strerror(ctypes.get_errno())}")
+        self.shminfo.shmid = shmid
+
+        addr = libc.shmat(shmid, None, 0)
+        if addr in (None, ctypes.c_void_p(-1).value):
+            libc.shmctl(shmid, IPC_RMID, None)
+            raise CaptureError(f"shmat: {os.strerror(ctypes.get_errno())}")
+        self.shminfo.shmaddr = img.data = addr
+
+        attached = xext.XShmAttach(dpy, ctypes.byref(self.shminfo))
+        x11.XSync(dpy, 0)
+
+        # Marked for removal right away, so the segment is freed with its last
+        # attachment even if this process dies without close()
+        libc.shmctl(shmid, IPC_RMID, None)
+        if not attached:
+            raise CaptureError("XShmAttach failed")
+        self.attached = True
+
+        self.buffer = (ctypes.c_ubyte * size).from_address(addr)
+
+    def grab(self) -> None:
+        """Copy the screen's current pixels into the shared image."""
+        _, xext, _ = _load()
+        if not xext.XShmGetImage(
+            self.dpy, self.root, self.image, self.x, self.y, ALL_PLANES
+        ):
+            raise CaptureError("XShmGetImage failed")
+
+    def frame(self):
+        """The shared image as a NumPy array, without copying it."""
+        if self._frame is None:
+            import numpy as np
+
+            bpl = self.image.contents.bytes_per_line
+            self._frame = np.ndarray(
+                (self.h, self.w, 4),
+                dtype=np.uint8,
+                buffer=self.buffer,
+                strides=(bpl, 4, 1),
+            )
+        return self._frame
+
+    def capture(self):
+        """Grab the screen and return frame()."""
+        self.grab()
+        return self.frame()
+
+    def close(self) -> None:
+        x11, xext, libc = _load()
+
+        self._frame = None
+        self.buffer = None
+        if self.attached:
+            xext.XShmDetach(self.dpy, ctypes.byref(self.shminfo))
+            x11.XSync(self.dpy, 0)
+            self.attached = False
+
+        if self.shminfo.shmaddr:
+            libc.shmdt(self.shminfo.shmaddr)
+            self.shminfo.shmaddr = None
+
+        if self.image:
+            # The data is the (now detached) segment, not Xlib's to free
+            self.image.contents.data = None
+            x11.XDestroyImage(self.image)
+            self.image = None
+
+        if self.dpy:
+            x11.XCloseDisplay(self.dpy)
+            self.dpy = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,14 +1,111 @@
+import hashlib
 import logging
+import marshal
 import re
 import sys
 from enum import Enum
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
 
 from warpy.default_config import DEFAULT_CONFIG
-from warpy.input import input_eq, input_parse_string
+from warpy.histfile import get_data_path, write_cache_file
+from warpy.input import (
+    input_event_mods,
+    input_keymap_check,
+    input_lookup_code,
+    input_parse_string,
+)
 from warpy.schemas import InputEvent
 
 
+# Key options each mode listens for, compiled into frozensets on every config load
+WHITELIST_PROFILES: Dict[str, Tuple[str, ...]] = {
+    "normal": (
+        "accelerator",
+        "bottom",
+        "buttons",
+        "copy_and_exit",
+        "decelerator",
+        "down",
+        "drag",
+        "end",
+        "exit",
+        "grid",
+        "hint",
+        "hint2",
+        "hist_back",
+        "hist_forward",
+        "history",
+        "left",
+        "middle",
+        "oneshot_buttons",
+        "print",
+        "right",
+        "screen",
+        "scroll_down",
+        "scroll_up",
+        "start",
+        "top",
+        "up",
+    ),
+    "grid": (
+        "grid_up",
+        "grid_down",
+        "grid_right",
+        "grid_left",
+        "grid_cut_up",
+        "grid_cut_down",
+        "grid_cut_right",
+        "grid_cut_left",
+        "grid_keys",
+        "buttons",
+        "oneshot_buttons",
+        "grid",
+        "hint",
+        "exit",
+        "drag",
+        "grid_exit",
+    ),
+    "hint": ("hint_exit", "hint_undo_all", "hint_undo", "hint_search"),
+    "daemon": (
+        "activation_key",
+        "hint_activation_key",
+        "grid_activation_key",
+        "hint_oneshot_key",
+        "screen_activation_key",
+        "hint2_activation_key",
+        "hint2_oneshot_key",
+        "history_activation_key",
+    ),
+}
+
+
+def _check_hint_chars(value: str) -> Optional[str]:
+    if len(value) < 2 or len(set(value)) != len(value):
+        return "hint_chars must be at least 2 distinct characters"
+    return None
+
+
+def _check_smart_hint_providers(value: str) -> Optional[str]:
+    # Imported here: smart_hint depends on this module
+    from warpy.smart_hint import PROVIDERS
+
+    for name in value.split():
+        if name not in PROVIDERS:
+            return f"{name} is not a valid smart hint provider"
+    return None
+
+
+# Checks of option values beyond their type, returning an error message
+OPTION_CHECKS: Dict[str, Callable[[str], Optional[str]]] = {
+    "hint_chars": _check_hint_chars,
+    "smart_hint_providers": _check_smart_hint_providers,
+}
+
+
+# Bump when the layout of the compiled config cache changes
+CONFIG_CACHE_VERSION = 2
+
+
 class OptionType(Enum):
     OPT_STRING = 1
     OPT_INT = 2
@@ -21,7 +118,8 @@ class ConfigEntry:
         self.key = key
         self.value = value
         self.type = option_type
-        self.whitelisted = False
+        # Parsed (code, mods) of each token in value, filled in by validate()
+        self.events: List[Tuple[int, int]] = []
 
     def validate(self) -> bool:
         """Validate the config entry based on its type."""
@@ -33,10 +131,16 @@ class ConfigEntry:
         elif self.type in (OptionType.OPT_BUTTON, OptionType.OPT_KEY):
             return self._validate_key_option()
 
+        check = OPTION_CHECKS.get(self.key)
+        if check and (error := check(self.value)):
+            print(f"ERROR: {error}", file=sys.stderr)
+            return False
+
         return True
 
     def _validate_key_option(self) -> bool:
         """Validate a key option string."""
+        self.events = []
         if self.value == "unbind":
             return True
 
@@ -45,43 +149,80 @@ class ConfigEntry:
             if input_parse_string(ev, tok) is None:
                 print(f"ERROR: {tok} is not a valid key name", file=sys.stderr)
                 return False
+            self.events.append((ev.code, ev.mods))
         return True
 
-    def matches_input(self, ev: InputEvent | None, config_key: str) -> Tuple[bool, int]:
-        """Check if this entry matches the given input event."""
-        if self.key == config_key and self.value == "unbind":
-            return False, 0
+    def key_names(self) -> List[str]:
+        """Key names of a key option's tokens, with modifier prefixes removed."""
+        if self.type not in (OptionType.OPT_BUTTON, OptionType.OPT_KEY):
+            return []
+        if self.value == "unbind":
+            return []
 
-        if not self.whitelisted or self.type not in (
-            OptionType.OPT_KEY,
-            OptionType.OPT_BUTTON,
-        ):
-            return False, 0
+        names = []
+        for tok in self.value.split():
+            while len(tok) > 1 and tok[1] == "-":
+                tok = tok[2:]
+            names.append(tok)
+        return names
 
-        idx, exact = self._key_index(ev)
-        if idx > 0:
-            if (
-                self.type == OptionType.OPT_KEY and exact
-            ) or self.type == OptionType.OPT_BUTTON:
-                if self.key == config_key:
-                    return True, idx
+    def as_int(self) -> int:
+        """Get the value as an integer."""
+        return int(self.value)
 
-        return False, 0
 
-    def _key_index(self, ev: InputEvent | None) -> Tuple[int, bool]:
-        """Find the index of a key in the list."""
-        idx = 1
+class KeyBinding(NamedTuple):
+    """A single token of a key option, compiled for lookup by keycode."""
 
-        for tok in self.value.split():
-            if ret:= input_eq(ev, tok):
-                return idx, (ret == 2)
-            idx += 1
+    key: str
+    index: int  # 1-based position of the token within the option value
+    mods: int
+    type: OptionType
 
-        return 0, False
 
-    def as_int(self) -> int:
-        """Get the value as an integer."""
-        return int(self.value)
+class ConfigSnapshot:
+    """
+    Immutable, typed view of a parsed config for reads on hot paths.
+
+    Every option is an attribute: OPT_INT options are ints, color and font
+    options are bytes ready to hand to the platform, normal_blink_interval is
+    an (on, off) tuple of ints and everything else is the raw string.
+    """
+
+    def __init__(self, entries: Dict[str, ConfigEntry]):
+        values = {}
+
+        for key, entry in entries.items():
+            if entry.type == OptionType.OPT_INT:
+                values[key] = entry.as_int()
+            elif key.endswith("color") or key == "hint_font":
+                values[key] = entry.value.encode("utf-8")
+            else:
+                values[key] = entry.value
+
+        values["normal_blink_interval"] = self._parse_blink_interval(
+            values["normal_blink_interval"]
+        )
+        self.__dict__.update(values)
+
+    @staticmethod
+    def _parse_blink_interval(value: str) -> Tuple[int, int]:
+        try:
+            times = [int(t) for t in value.split()]
+        except ValueError:
+            times = []
+
+        if len(times) not in (1, 2):
+            print(f"ERROR: {value} is not a valid blink interval", file=sys.stderr)
+            sys.exit(-1)
+
+        return (times[0], times[0]) if len(times) == 1 else (times[0], times[1])
+
+    def __setattr__(self, key, value):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError("ConfigSnapshot is immutable")
 
 
 class OptionDefinition:
@@ -95,6 +236,13 @@ class OptionDefinition:
 class ConfigManager:
     def __init__(self):
         self.entries: Dict[str, ConfigEntry] = {}
+        # keycode -> config key -> binding, see compile_bindings()
+        self.bindings: Dict[int, Dict[str, KeyBinding]] = {}
+        # Compiled WHITELIST_PROFILES and the set currently matched against
+        # (None whitelists every key option)
+        self.whitelists: Dict[str, FrozenSet[str]] = {}
+        self.whitelist: Optional[FrozenSet[str]] = None
+        self.snapshot: Optional[ConfigSnapshot] = None
         self.option_definitions: Dict[str, OptionDefinition] = {}
         self._load_default_options()
 
@@ -131,6 +279,11 @@ class ConfigManager:
 
     def add(self, key: str, value: str) -> bool:
         """Add a config entry."""
+        return self._add_entry(self.entries, key, value)
+
+    def _add_entry(
+        self, entries: Dict[str, ConfigEntry], key: str, value: str
+    ) -> bool:
         option_type = self.get_option_type(key)
         if not option_type:
             return False
@@ -139,22 +292,133 @@ class ConfigManager:
         if not entry.validate():
             sys.exit(-1)
 
-        self.entries[key] = entry
+        entries[key] = entry
         return True
 
-    def parse_config_file(self, path: str) -> None:
-        """Parse a config file."""
-        # Clear existing entries
-        self.entries.clear()
+    def parse_config_file(self, path: str) -> Set[str]:
+        """Parse a config file, returning the keys that changed."""
+        entries: Dict[str, ConfigEntry] = {}
 
         # Set defaults from option definitions
         for key, option in reversed(self.option_definitions.items()):
-            self.add(key, option.val)
+            self._add_entry(entries, key, option.val)
 
         # Open and parse user config file
-        if not path:
-            return
+        if path:
+            self._parse_user_config(entries, path)
+
+        return self.load_entries(entries)
+
+    def parse_config_file_cached(self, path: str, cache_path: str) -> Set[str]:
+        """
+        Like parse_config_file, but reuse the validated entries stored in
+        cache_path when neither the config file nor the default options
+        changed since the cache was written, and every key name it uses still
+        resolves to the same code.
+        """
+        key = self._cache_key(path)
+        entries = self._read_cache(cache_path, key) if key else None
+
+        if entries is not None:
+            return self.load_entries(entries)
+
+        changed = self.parse_config_file(path)
+        if key:
+            self._write_cache(cache_path, key)
+        return changed
+
+    def _cache_key(self, path: str) -> Optional[Tuple]:
+        """Identify everything the compiled entries depend on."""
+        if path == "-":
+            return None
 
+        try:
+            with open(path, "rb") as fh:
+                config_digest = hashlib.blake2b(fh.read(), digest_size=16).hexdigest()
+        except FileNotFoundError:
+            config_digest = ""
+        except OSError:
+            return None
+
+        defaults = marshal.dumps(DEFAULT_CONFIG)
+        return (
+            CONFIG_CACHE_VERSION,
+            hashlib.blake2b(defaults, digest_size=16).hexdigest(),
+            config_digest,
+        )
+
+    def _read_cache(
+        self, cache_path: str, key: Tuple
+    ) -> Optional[Dict[str, ConfigEntry]]:
+        try:
+            with open(cache_path, "rb") as fh:
+                cached_key, probes, rows = marshal.loads(fh.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if cached_key != key or not input_keymap_check(probes):
+            return None
+
+        entries: Dict[str, ConfigEntry] = {}
+        for name, value, option_type, events in rows:
+            entry = ConfigEntry(name, value, OptionType(option_type))
+            entry.events = events
+            entries[name] = entry
+        return entries
+
+    def _write_cache(self, cache_path: str, key: Tuple) -> None:
+        rows = [
+            (entry.key, entry.value, entry.type.value, entry.events)
+            for entry in self.entries.values()
+        ]
+        names = {name for entry in self.entries.values() for name in entry.key_names()}
+        probes = [(name, *input_lookup_code(name)) for name in sorted(names)]
+        write_cache_file(cache_path, marshal.dumps((key, probes, rows)), "config")
+
+    def load_entries(self, entries: Dict[str, ConfigEntry]) -> Set[str]:
+        """
+        Compile a complete set of entries and swap it in. Nothing is replaced
+        until everything derived from the new entries has been built, so a
+        running mode never observes a half-parsed config.
+
+        Returns the keys whose value (or parsed key events) changed; tables
+        that only depend on unchanged entries are carried over.
+        """
+        changed = self.changed_keys(entries)
+        if not changed:
+            return changed
+
+        bindings = self.bindings
+        if not bindings or any(
+            entries[key].events != self._events(key) for key in changed
+        ):
+            bindings = self.compile_bindings(entries)
+
+        whitelists = self.whitelists or self.compile_whitelists(entries)
+        snapshot = ConfigSnapshot(entries)
+
+        self.entries = entries
+        self.bindings = bindings
+        self.whitelists = whitelists
+        self.snapshot = snapshot
+        return changed
+
+    def changed_keys(self, entries: Dict[str, ConfigEntry]) -> Set[str]:
+        """Keys of entries that differ from the currently loaded ones."""
+        return {
+            key
+            for key, entry in entries.items()
+            if key not in self.entries
+            or self.entries[key].value != entry.value
+            or self.entries[key].events != entry.events
+        }
+
+    def _events(self, key: str) -> List[Tuple[int, int]]:
+        entry = self.entries.get(key)
+        return entry.events if entry else []
+
+    def _parse_user_config(self, entries: Dict[str, ConfigEntry], path: str) -> None:
+        """Apply the entries of a user config file over the defaults."""
         try:
             with open(path, "r") if path != "-" else sys.stdin as fh:
                 for line in fh:
@@ -171,33 +435,83 @@ class ConfigManager:
                     key = parts[0].strip()
                     value = parts[1].strip()
 
-                    self.add(key, value)
+                    self._add_entry(entries, key, value)
         except FileNotFoundError:
             print(f"WARNING: Config file not found: {path}", file=sys.stderr)
             # Continue with defaults
 
+    def compile_bindings(
+        self, entries: Dict[str, ConfigEntry]
+    ) -> Dict[int, Dict[str, KeyBinding]]:
+        """Index the parsed tokens of every key option by keycode."""
+        bindings: Dict[int, Dict[str, KeyBinding]] = {}
+
+        for entry in entries.values():
+            for idx, (code, mods) in enumerate(entry.events, 1):
+                if not code:
+                    continue
+
+                # Only the first token with a given code counts
+                bindings.setdefault(code, {}).setdefault(
+                    entry.key, KeyBinding(entry.key, idx, mods, entry.type)
+                )
+
+        return bindings
+
+    def compile_whitelists(
+        self, entries: Dict[str, ConfigEntry]
+    ) -> Dict[str, FrozenSet[str]]:
+        """Build the frozen key sets of every whitelist profile."""
+        return {
+            name: frozenset(key for key in keys if key in entries)
+            for name, keys in WHITELIST_PROFILES.items()
+        }
+
+    def use_whitelist(self, profile: Optional[str]) -> None:
+        """Switch to a compiled whitelist profile, or to every key with None."""
+        self.whitelist = self.whitelists[profile] if profile else None
+
     def whitelist_inputs(self, names: Optional[List[str]] = None) -> None:
         """Set whitelisted config entries."""
-        for entry in self.entries.values():
-            entry.whitelisted = False
-
-            if entry.type not in (OptionType.OPT_KEY, OptionType.OPT_BUTTON):
-                continue
-
-            if names is None:
-                entry.whitelisted = True
-            elif entry.key in names:
-                entry.whitelisted = True
+        self.whitelist = None if names is None else frozenset(names)
 
     def match_input(self, ev: InputEvent | None, config_key: str) -> int:
         """Match input event against config keys."""
-        for entry in self.entries.values():
-            matches, idx = entry.matches_input(ev, config_key)
-            if matches:
-                logging.debug("\x1b[36m🔍 Matched key: \x1b[32m%s\x1b[0m" % config_key)
-                return idx
+        if not ev:
+            return 0
+
+        mods = input_event_mods(ev)
+        binding = self.bindings.get(ev.code, {}).get(config_key)
+
+        if binding is None or not self._accepts(binding, mods):
+            return 0
+
+        logging.debug("\x1b[36m🔍 Matched key: \x1b[32m%s\x1b[0m" % config_key)
+        return binding.index
+
+    def classify(self, ev: InputEvent | None) -> Dict[str, int]:
+        """Map every config key the event matches to its matched index."""
+        if not ev:
+            return {}
 
-        return 0
+        mods = input_event_mods(ev)
+        matched = {
+            key: binding.index
+            for key, binding in self.bindings.get(ev.code, {}).items()
+            if self._accepts(binding, mods)
+        }
+
+        if matched:
+            logging.debug("\x1b[36m🔍 Matched keys: \x1b[32m%s\x1b[0m" % list(matched))
+        return matched
+
+    def _accepts(self, binding: KeyBinding, mods: int) -> bool:
+        """Whether a binding on the event's keycode matches under these mods."""
+        if self.whitelist is not None and binding.key not in self.whitelist:
+            return False
+
+        # Button options match regardless of the modifiers held
+        return binding.type == OptionType.OPT_BUTTON or binding.mods == mods
 
     def config_print_options(self):
         for key, option in self.option_definitions.items():
@@ -215,8 +529,18 @@ def config_get_int(key: str) -> int:
     return config_manager.get_int(key)
 
 
-def parse_config(path: str) -> None:
-    config_manager.parse_config_file(path)
+def config_snapshot() -> ConfigSnapshot:
+    return config_manager.snapshot
+
+
+def parse_config(path: str) -> Set[str]:
+    return config_manager.parse_config_file(path)
+
+
+def parse_config_cached(path: str, cache_path: Optional[str] = None) -> Set[str]:
+    if cache_path is None:
+        cache_path = get_data_path("config.cache")
+    return config_manager.parse_config_file_cached(path, cache_path)
 
 
 def config_input_whitelist(names: Optional[List[str]] = None, n: int = 0) -> None:
@@ -226,9 +550,17 @@ def config_input_whitelist(names: Optional[List[str]] = None, n: int = 0) -> Non
         config_manager.whitelist_inputs(names[:n])
 
 
+def config_input_whitelist_profile(profile: Optional[str]) -> None:
+    config_manager.use_whitelist(profile)
+
+
 def config_input_match(ev: InputEvent | None, config_key: str) -> int:
     return config_manager.match_input(ev, config_key)
 
 
+def config_input_classify(ev: InputEvent | None) -> Dict[str, int]:
+    return config_manager.classify(ev)
+
+
 def config_print_options():
     return config_manager.config_print_options()
@@ -0,0 +1,325 @@
+import ctypes
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+from typing import Iterable, List, Optional
+
+# Seconds a client waits to connect, and for the reply to a command that
+# doesn't wait on the user (see INTERACTIVE_COMMANDS)
+CONNECT_TIMEOUT = 1.0
+REPLY_TIMEOUT = 5.0
+
+# Commands that run a mode, whose replies come whenever the user is done
+INTERACTIVE_COMMANDS = {"mode", "hintspec"}
+
+# Commands whose request line is followed by raw input, up to the end of the
+# client's side of the connection, which they end
+STREAMED_COMMANDS = {"hintspec"}
+
+CHUNK_SIZE = 1 << 16
+
+
+def get_runtime_path(name: str) -> str:
+    """
+    Path of a per-user runtime file of the daemon: in $XDG_RUNTIME_DIR, or
+    next to its lock file in /tmp.
+    """
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, f"warpd.{name}")
+    return f"/tmp/warpd_{os.getuid()}.{name}"
+
+
+def get_socket_path() -> str:
+    return get_runtime_path("sock")
+
+
+def get_wake_path() -> str:
+    """File written to wake the daemon's main loop (see Controller)."""
+    return get_runtime_path("wake")
+
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            streamed = False
+            try:
+                request = json.loads(line)
+                if request.get("cmd") in STREAMED_COMMANDS:
+                    # The session reads its input off the connection
+                    request["read"] = self.rfile.read1
+                    streamed = True
+                response = self.server.controller.dispatch(request)
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+            if streamed:
+                # Whatever is left of the input is not read, and unblocks the
+                # reader still waiting for it
+                self.connection.shutdown(socket.SHUT_RD)
+                return
+
+
+class ControlServer(socketserver.UnixStreamServer):
+    """
+    Local control socket of the running daemon.
+
+    Clients send newline-delimited JSON requests and read one JSON response
+    line per request, e.g.
+
+        {"cmd": "move", "x": 100, "y": 200}  ->  {"ok": true}
+        {"cmd": "position"}                  ->  {"ok": true, "x": 100, "y": 200}
+
+A hintspec request is followed by the raw hintspec input (any format, see
+warpy.hintspec), which the session reads as it arrives until the client
+shuts down its side of the connection. The connection ends with its reply.
+
+    Commands run inside the warm daemon, so a scripted action costs a socket
+    round trip instead of interpreter startup, x_init and config parsing.
+    Connections are handled one at a time, so commands never interleave.
+    """
+
+    def __init__(self, path: str, controller: "Controller"):
+        if os.path.exists(path):
+            # Only one daemon holds the lock, so an existing socket is stale
+            os.unlink(path)
+
+        self.controller = controller
+
+        # Created private rather than chmod-ed after bind, which would leave
+        # it open to other users in between
+        umask = os.umask(0o077)
+        try:
+            super().__init__(path, ControlHandler)
+        finally:
+            os.umask(umask)
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.serve_forever, name="warpd-control", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+class ControlJob:
+    def __init__(self, request: dict):
+        self.request = request
+        self.response: Optional[dict] = None
+        self.done = threading.Event()
+
+
+class Controller:
+    """
+    Executes control requests against the platform.
+
+    The platform is only ever driven from the daemon's main loop, which
+    otherwise sits in input_wait(): dispatch() queues a request, wakes that
+    loop by writing to a file it monitors and waits for it to call
+    run_pending().
+    """
+
+    def __init__(self, platform, wake_path: Optional[str] = None):
+        self.platform = platform
+        self.wake_path = wake_path
+        self.pending: queue.SimpleQueue = queue.SimpleQueue()
+
+    def dispatch(self, request: dict) -> dict:
+        job = ControlJob(request)
+        self.pending.put(job)
+        self.wake()
+        job.done.wait()
+        return job.response
+
+    def wake(self) -> None:
+        if not self.wake_path:
+            return
+
+        fd = os.open(
+            self.wake_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o600
+        )
+        try:
+            os.write(fd, b"1")
+        finally:
+            os.close(fd)
+
+    def run_pending(self, block: bool = False) -> int:
+        """
+        Execute the queued requests (waiting for one if block is set) and
+        return how many ran. Must be called from the thread that owns the
+        platform.
+        """
+        n = 0
+        while True:
+            try:
+                job = self.pending.get(block=block and not n)
+            except queue.Empty:
+                return n
+
+            try:
+                job.response = self.execute(job.request)
+            except Exception as e:
+                job.response = {"ok": False, "error": str(e)}
+            job.done.set()
+            n += 1
+
+    def execute(self, request: dict) -> dict:
+        cmd = request.get("cmd")
+        handler = getattr(self, f"cmd_{cmd}", None)
+        if handler is None:
+            return {"ok": False, "error": f"unknown command: {cmd}"}
+
+        result = handler(request) or {}
+        result["ok"] = True
+        return result
+
+    def _screen(self):
+        from warpy.platform import get_pointer_screen
+
+        return get_pointer_screen()
+
+    def _position(self) -> dict:
+        x = ctypes.c_int()
+        y = ctypes.c_int()
+        self.platform.mouse_get_position(None, ctypes.byref(x), ctypes.byref(y))
+        return {"x": x.value, "y": y.value}
+
+    def cmd_position(self, request: dict) -> dict:
+        return self._position()
+
+    def cmd_move(self, request: dict) -> None:
+        x, y = int(request["x"]), int(request["y"])
+        self.platform.mouse_move(self._screen(), x, y)
+        self.platform.commit()
+
+    def cmd_click(self, request: dict) -> dict:
+        # The position is where the click lands, as with "warpd --click"
+        position = self._position()
+        if request.get("record"):
+            from warpy.histfile import histfile_add
+
+            histfile_add(position["x"], position["y"])
+
+        self.platform.mouse_click(int(request["button"]))
+        return position
+
+    def cmd_mode(self, request: dict) -> dict:
+        from warpy.mode_loop import mode_loop
+
+        try:
+            rc = mode_loop(
+                self._screen(),
+                self.platform,
+                int(request["mode"]),
+                int(request.get("oneshot", 1)),
+                int(request.get("record", 0)),
+            )
+        except SystemExit as e:
+            # normal_mode exits the process on a oneshot click
+            rc = e.code
+
+        return {"rc": rc or 0, **self._position()}
+
+    def cmd_hintspec(self, request: dict) -> dict:
+        from warpy.hint import hintspec_mode
+
+        rc = hintspec_mode(self._screen(), request["read"])
+        return {"rc": rc or 0, **self._position()}
+
+
+def start_control_server(
+    platform, path: Optional[str] = None, wake_path: Optional[str] = None
+) -> ControlServer:
+    server = ControlServer(path or get_socket_path(), Controller(platform, wake_path))
+    server.start()
+    return server
+
+
+def _connect(path: str) -> Optional[socket.socket]:
+    try:
+        # Only talk to a socket of our own daemon
+        if os.stat(path).st_uid != os.getuid():
+            return None
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+    except OSError:
+        return None
+    return sock
+
+
+def _send_input(sock: socket.socket, fd: int) -> None:
+    """Send what is read from fd on sock in the background, then shut it down."""
+
+    def pump():
+        try:
+            while data := os.read(fd, CHUNK_SIZE):
+                sock.sendall(data)
+            sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            # The session ended before its input did
+            pass
+
+    threading.Thread(target=pump, name="warpd-input", daemon=True).start()
+
+
+def send_commands(
+    requests: Iterable[dict], path: Optional[str] = None, input_fd: int = 0
+) -> Optional[List[dict]]:
+    """
+    Send requests to a running daemon and return its responses, or None if
+    no daemon is listening. Raises OSError (TimeoutError if it hangs) when
+    the daemon stops answering.
+
+    The input of a hintspec request is streamed from input_fd as it is read.
+    It ends the connection, so later requests are sent over a new one.
+    """
+    path = path or get_socket_path()
+    requests = list(requests)
+    responses: List[dict] = []
+
+    sock = _connect(path)
+    if sock is None:
+        return None
+
+    while True:
+        with sock, sock.makefile("rwb") as fh:
+            for request in requests[len(responses) :]:
+                interactive = request.get("cmd") in INTERACTIVE_COMMANDS
+                sock.settimeout(None if interactive else REPLY_TIMEOUT)
+
+                fh.write(json.dumps(request).encode() + b"\n")
+                fh.flush()
+
+                streamed = request.get("cmd") in STREAMED_COMMANDS
+                if streamed:
+                    _send_input(sock, input_fd)
+
+                line = fh.readline()
+                if not line:
+                    raise ConnectionError("the daemon closed the connection")
+                responses.append(json.loads(line))
+
+                if streamed:
+                    break
+
+        if len(responses) == len(requests):
+            return responses
+
+        sock = _connect(path)
+        if sock is None:
+            raise ConnectionError("the daemon went away")
@@ -1,45 +1,199 @@
-from warpy.config import config_input_whitelist, parse_config
-from warpy.hint import init_hints
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from warpy import schemas
+from warpy.config import (
+    WHITELIST_PROFILES,
+    config_get,
+    config_input_classify,
+    config_input_whitelist_profile,
+    parse_config,
+)
+from warpy.control import get_wake_path, start_control_server
+from warpy.hint import init_hints, prerender_hints
+from warpy.input import input_keymap_invalidate, input_parse_string
 from warpy.mode_loop import mode_loop
 from warpy.mouse import init_mouse
-from warpy.schemas import Platform
-
-activation_keys = {
-    "activation_key",
-    "hint_activation_key",
-    "grid_activation_key",
-    "hint_oneshot_key",
-    "screen_activation_key",
-    "hint2_activation_key",
-    "hint2_oneshot_key",
-    "history_activation_key",
+from warpy.platform import get_pointer_screen
+from warpy.schemas import InputEvent, Platform
+from warpy.scroll import init_scroll
+from warpy.smart_hint import enable_prefetch
+
+activation_keys = WHITELIST_PROFILES["daemon"]
+
+# The mode each activation key enters, and whether it is a oneshot one
+ACTIVATION_MODES = {
+    "activation_key": (schemas.MODE_NORMAL, 0),
+    "grid_activation_key": (schemas.MODE_GRID, 0),
+    "hint_activation_key": (schemas.MODE_HINT, 0),
+    "hint2_activation_key": (schemas.MODE_HINT2, 0),
+    "hint_oneshot_key": (schemas.MODE_HINT, 1),
+    "hint2_oneshot_key": (schemas.MODE_HINT2, 1),
+    "history_activation_key": (schemas.MODE_HISTORY, 0),
+    "screen_activation_key": (schemas.MODE_SCREEN_SELECTION, 0),
 }
 
+# Options each subsystem is initialised from. On reload, a subsystem is only
+# reinitialised when one of its options changed.
+SUBSYSTEM_OPTIONS = {
+    init_hints: {"hint_bgcolor", "hint_fgcolor", "hint_border_radius", "hint_font"},
+    prerender_hints: {"hint_chars", "hint_size", "hint_weighting"},
+    init_mouse: {
+        "cursor_size",
+        "speed",
+        "max_speed",
+        "decelerator_speed",
+        "acceleration",
+        "accelerator_acceleration",
+    },
+    init_scroll: {
+        "scroll_speed",
+        "scroll_max_speed",
+        "scroll_acceleration",
+        "scroll_deceleration",
+    },
+}
+
+# Editors often write a file several times per save. A change is loaded once
+# the file has stayed unchanged for RELOAD_SETTLE, or RELOAD_SETTLE_MAX after
+# the first change if it keeps changing.
+RELOAD_SETTLE = 0.1
+RELOAD_SETTLE_MAX = 1.0
+
+
+def config_stat(config_path):
+    try:
+        st = os.stat(config_path)
+    except (OSError, TypeError):
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class ConfigReloader:
+    """
+    Debounced config reloading for the daemon's main loop, which calls
+    changed() when the file may have changed and poll() on every iteration.
+    Neither blocks: the reload waits for a deadline, and wake is called (from
+    a timer thread) when it passes, so that a loop waiting for input gets to
+    poll() again.
+    """
+
+    def __init__(self, config_path, wake: Optional[Callable[[], None]] = None):
+        self.config_path = config_path
+        self.wake = wake
+        self.loaded = None  # stat of the loaded file
+        self.seen = None  # stat at the last change
+        self.first_change = 0.0
+        self.deadline: Optional[float] = None
+        self.timer: Optional[threading.Timer] = None
+        # What input_wait() wakes for, parsed from the activation keys
+        self.activation_events = (InputEvent * len(activation_keys))()
+
+    def changed(self) -> None:
+        """Defer a reload until the file settles."""
+        stat = config_stat(self.config_path)
+        if self.deadline is None:
+            if stat == self.loaded:
+                return
+            self.first_change = time.monotonic()
+        elif stat == self.seen:
+            return
+
+        self.seen = stat
+        self._schedule()
+
+    def poll(self) -> None:
+        """Reload the config if it has settled."""
+        if self.deadline is None or time.monotonic() < self.deadline:
+            return
 
-def reload_config(config_path):
-    parse_config(config_path)
-    init_hints()
-    init_mouse()
-    # TODO
-    #  	for (i = 0; i < sizeof activation_keys / sizeof activation_keys[0]; i++)
-    # input_parse_string(&activation_events[i], config_get(activation_keys[i]));
+        # Changed again, and the event for it is yet to arrive
+        stat = config_stat(self.config_path)
+        settling = time.monotonic() < self.first_change + RELOAD_SETTLE_MAX
+        if stat != self.seen and settling:
+            self.seen = stat
+            self._schedule()
+            return
+
+        self.deadline = None
+        self.reload()
+
+    def _schedule(self) -> None:
+        now = time.monotonic()
+        self.deadline = min(now + RELOAD_SETTLE, self.first_change + RELOAD_SETTLE_MAX)
+
+        if self.timer:
+            self.timer.cancel()
+        if self.wake:
+            self.timer = threading.Timer(self.deadline - now, self.wake)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def reload(self) -> None:
+        """Re-parse the config and reinitialise the subsystems it affects."""
+        stat = config_stat(self.config_path)
+        if self.loaded is not None and stat == self.loaded:
+            return
+        self.loaded = stat
+
+        # Rebuild the keymap tables too, so a changed layout is picked up
+        # before the key options are validated against it
+        input_keymap_invalidate()
+        changed = parse_config(self.config_path)
+
+        for init, options in SUBSYSTEM_OPTIONS.items():
+            if changed & options:
+                init()
+
+        if changed:
+            logging.debug("Reloaded config, changed: %s" % ", ".join(sorted(changed)))
+
+        events = (InputEvent * len(activation_keys))()
+        for ev, key in zip(events, activation_keys):
+            input_parse_string(ev, config_get(key))
+        self.activation_events = events
 
 
 def daemon_loop(platform: Platform, config_path=None):
-    platform.monitor_file(config_path)
+    # The platform keeps the paths it monitors, so they must stay referenced
+    # for as long as the daemon runs (which this loop does)
+    monitored = []
+
+    def monitor(path: str) -> None:
+        monitored.append(os.fsencode(path))
+        platform.monitor_file(monitored[-1])
+
+    if config_path:
+        monitor(config_path)
 
-    reload_config(config_path)
+    # Control requests are run here, between input_wait() calls, which the
+    # control server interrupts by writing to the wake file
+    wake_path = get_wake_path()
+    controller = start_control_server(platform, wake_path=wake_path).controller
+    controller.wake()  # creates the file, which must exist to be monitored
+    monitor(wake_path)
+
+    reloader = ConfigReloader(config_path, controller.wake)
+    reloader.reload()
+    enable_prefetch()
 
     while 1:
-        mode = 0
-        ev = platform.input_wait()
+        controller.run_pending()
+        reloader.poll()
+        ev = platform.input_wait(reloader.activation_events, len(activation_keys))
 
         if not ev:
-            reload_config(config_path)
+            reloader.changed()
             continue
 
-        config_input_whitelist(list(activation_keys), len(activation_keys))
-
-        # ... TODO
+        config_input_whitelist_profile("daemon")
+        matched = config_input_classify(ev.contents)
+        key = next((key for key in ACTIVATION_MODES if key in matched), None)
+        if key is None:
+            continue
 
-        mode_loop(platform, mode, 0, 1)
+        mode, oneshot = ACTIVATION_MODES[key]
+        mode_loop(get_pointer_screen(), platform, mode, oneshot, 1)
@@ -306,6 +306,26 @@ DEFAULT_CONFIG = {
         "description": "Border radius.",
         "option_type": 2,
     },
+    "hint_weighting": {
+        "val": "0",
+        "description": "If set to non-zero, hints near the pointer and near recently selected positions (see --record) get shorter labels in hint mode. Larger values favour them more strongly, around 50 is a good start.",
+        "option_type": 2,
+    },
+    "smart_hint_providers": {
+        "val": "xtree atspi",
+        "description": "Space separated list of the sources smart hint mode queries for the clickable elements of the active window: xtree (child windows, needs python-xlib), atspi (accessibility tree, needs pyatspi) and vision (detected from a screen capture, needs numpy). Unavailable sources are skipped.",
+        "option_type": 1,
+    },
+    "smart_hint_timeout": {
+        "val": "150",
+        "description": "The number of milliseconds smart hint mode waits for element sources before falling back to their cached results, or to fullscreen hints.",
+        "option_type": 2,
+    },
+    "smart_hint_prefetch": {
+        "val": "250",
+        "description": "Once smart hint mode has been used, the daemon discovers the elements of each newly focused window before the next activation, handling focus changes at most this often (in milliseconds; without python-xlib, it polls at this interval). 0 disables prefetching.",
+        "option_type": 2,
+    },
     "hint_exit": {
         "val": "esc",
         "description": "The exit key used for hint mode.",
@@ -321,6 +341,11 @@ DEFAULT_CONFIG = {
         "description": "undo all selection steps in one of the hint based modes.",
         "option_type": 3,
     },
+    "hint_search": {
+        "val": "/",
+        "description": "Toggles typing the name of an element instead of its label in smart hint mode. The hints narrow to the best matches as you type.",
+        "option_type": 3,
+    },
     "hint2_chars": {
         "val": "hjkl;asdfgqwertyuiopzxcvb",
         "description": "The character set used for the second hint selection, should consist of at least hint2_grid_size^2 characters.",
@@ -0,0 +1,90 @@
+import marshal
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from warpy.histfile import write_cache_file
+
+# Bump when the layout of the element cache changes
+ELEMENT_CACHE_VERSION = 1
+MAX_CACHED_LAYOUTS = 64
+
+# (provider name, window class, window width, window height)
+LayoutKey = tuple[str, str, int, int]
+
+
+class ElementCache:
+    """
+    Element layouts of application windows kept across daemon runs, keyed by
+    provider, window class and window size, with element positions relative
+    to the window. The least recently used layouts are dropped beyond
+    max_entries. The file is read on first use and rewritten whenever a
+    layout changes.
+    """
+
+    def __init__(self, path: str, max_entries: int = MAX_CACHED_LAYOUTS):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: Optional[OrderedDict] = None
+        self.lock = threading.Lock()
+
+    def _load(self) -> None:
+        if self.entries is not None:
+            return
+
+        self.entries = OrderedDict()
+        try:
+            with open(self.path, "rb") as fh:
+                version, rows = marshal.loads(fh.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+
+        if version != ELEMENT_CACHE_VERSION:
+            return
+
+        for key, elements in rows:
+            self.entries[key] = elements
+
+    def _save(self) -> None:
+        rows = list(self.entries.items())
+        write_cache_file(
+            self.path, marshal.dumps((ELEMENT_CACHE_VERSION, rows)), "element"
+        )
+
+    def get(self, key: LayoutKey) -> Optional[list]:
+        """(x, y, w, h, name) of the elements of a layout, relative to its window."""
+        with self.lock:
+            self._load()
+            elements = self.entries.get(key)
+            if elements is None:
+                return None
+
+            self.entries.move_to_end(key)
+
+        # A layout that no longer fits its window is stale (or corrupt)
+        try:
+            valid = all(len(e) == 5 and _inside(key, e) for e in elements)
+        except TypeError:
+            valid = False
+        return elements if valid else None
+
+    def put(self, key: LayoutKey, elements: list) -> None:
+        """Remember the elements of a layout whose centre is inside the window."""
+        elements = [tuple(e) for e in elements if _inside(key, e)]
+        with self.lock:
+            self._load()
+            if self.entries.get(key) == elements:
+                self.entries.move_to_end(key)
+                return
+
+            self.entries[key] = elements
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+            self._save()
+
+
+def _inside(key: LayoutKey, element) -> bool:
+    x, y, w, h = element[:4]
+    return 0 <= x + w // 2 < key[2] and 0 <= y + h // 2 < key[3]
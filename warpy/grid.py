@@ -1,10 +1,9 @@
 import ctypes
 
 from warpy.config import (
-    config_get,
-    config_get_int,
-    config_input_match,
-    config_input_whitelist,
+    config_input_classify,
+    config_input_whitelist_profile,
+    config_snapshot,
 )
 from warpy.mouse import mouse_process_key, mouse_reset
 
@@ -17,7 +16,7 @@ class Grid:
         self.scr = scr
 
     def draw_grid(
-        self, color: str, sz: int, nc: int, nr: int, x: int, y: int, w: int, h: int
+        self, color: bytes, sz: int, nc: int, nr: int, x: int, y: int, w: int, h: int
     ) -> None:
         ygap = (h - ((nr + 1) * sz)) // nr
         xgap = (w - ((nc + 1) * sz)) // nc
@@ -27,25 +26,26 @@ class Grid:
 
         for i in range(nr + 1):
             self.platform.screen_draw_box(
-                self.scr, x, y + (ygap + sz) * i, w, sz, color.encode("utf-8")
+                self.scr, x, y + (ygap + sz) * i, w, sz, color
             )
 
         for i in range(nc + 1):
             self.platform.screen_draw_box(
-                self.scr, x + (xgap + sz) * i, y, sz, h, color.encode("utf-8")
+                self.scr, x + (xgap + sz) * i, y, sz, h, color
             )
 
     def redraw(self, mx: int, my: int, force: bool = False) -> None:
         x = mx - self.grid_width // 2
         y = my - self.grid_height // 2
 
-        nc = config_get_int("grid_nc")
-        nr = config_get_int("grid_nr")
-        cursz = config_get_int("cursor_size")
-        gsz = config_get_int("grid_size")
-        gbsz = config_get_int("grid_border_size")
-        gbcol = config_get("grid_border_color")
-        gcol = config_get("grid_color")
+        cfg = config_snapshot()
+        nc = cfg.grid_nc
+        nr = cfg.grid_nr
+        cursz = cfg.cursor_size
+        gsz = cfg.grid_size
+        gbsz = cfg.grid_border_size
+        gbcol = cfg.grid_border_color
+        gcol = cfg.grid_color
 
         gh = self.grid_height
         gw = self.grid_width
@@ -78,7 +78,7 @@ class Grid:
             y + gh // 2 - cursz // 2,
             cursz,
             cursz,
-            config_get("cursor_color").encode("utf-8"),
+            cfg.cursor_color,
         )
 
         self.platform.commit()
@@ -88,8 +88,9 @@ class Grid:
         my: int = 0
         ev = None
 
-        nc = config_get_int("grid_nc")
-        nr = config_get_int("grid_nr")
+        cfg = config_snapshot()
+        nc = cfg.grid_nc
+        nr = cfg.grid_nr
 
         self.platform.input_grab_keyboard()
         self.platform.mouse_hide()
@@ -109,26 +110,7 @@ class Grid:
         self.platform.mouse_move(self.scr, mx, my)
         self.redraw(mx, my, True)
 
-        keys = [
-            "grid_up",
-            "grid_down",
-            "grid_right",
-            "grid_left",
-            "grid_cut_up",
-            "grid_cut_down",
-            "grid_cut_right",
-            "grid_cut_left",
-            "grid_keys",
-            "buttons",
-            "oneshot_buttons",
-            "grid",
-            "hint",
-            "exit",
-            "drag",
-            "grid_exit",
-        ]
-
-        config_input_whitelist(keys, len(keys))
+        config_input_whitelist_profile("grid")
 
         while True:
             ev = self.platform.input_next_event(10)
@@ -153,7 +135,9 @@ class Grid:
             if ev and not ev.pressed:
                 continue
 
-            if (idx := config_input_match(ev, "grid_keys")) and idx <= nc * nr:
+            matched = config_input_classify(ev)
+
+            if (idx := matched.get("grid_keys", 0)) and idx <= nc * nr:
                 my = (my - self.grid_height // 2) + (self.grid_height // nr) * (
                     (idx - 1) // nc
                 )
@@ -164,26 +148,26 @@ class Grid:
                 self.grid_width //= nc
                 mx += self.grid_width // 2
                 my += self.grid_height // 2
-            if config_input_match(ev, "grid_cut_up"):
+            if "grid_cut_up" in matched:
                 my -= self.grid_height // 4
                 self.grid_height //= 2
-            elif config_input_match(ev, "grid_cut_down"):
+            elif "grid_cut_down" in matched:
                 my += self.grid_height // 4
                 self.grid_height //= 2
-            elif config_input_match(ev, "grid_cut_left"):
+            elif "grid_cut_left" in matched:
                 mx -= self.grid_width // 4
                 self.grid_width //= 2
-            elif config_input_match(ev, "grid_cut_right"):
+            elif "grid_cut_right" in matched:
                 mx += self.grid_width // 4
                 self.grid_width //= 2
             elif (
-                config_input_match(ev, "oneshot_buttons")
-                or config_input_match(ev, "buttons")
-                or config_input_match(ev, "grid")
-                or config_input_match(ev, "hint")
-                or config_input_match(ev, "exit")
-                or config_input_match(ev, "drag")
-                or config_input_match(ev, "grid_exit")
+                "oneshot_buttons" in matched
+                or "buttons" in matched
+                or "grid" in matched
+                or "hint" in matched
+                or "exit" in matched
+                or "drag" in matched
+                or "grid_exit" in matched
             ):
                 break
 
@@ -191,7 +175,7 @@ class Grid:
                 self.platform.mouse_move(self.scr, mx, my)
                 self.redraw(mx, my, False)
 
-        config_input_whitelist(None, 0)
+        config_input_whitelist_profile(None)
         self.platform.screen_clear(self.scr)
         self.platform.mouse_show()
 
@@ -1,60 +1,496 @@
 import ctypes
-
-from warpy.config import config_get, config_get_int, config_input_match, config_input_whitelist
-from warpy.histfile import histfile_read
+import heapq
+import os
+import struct
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import lru_cache, partial
+from itertools import islice, product
+from typing import Callable, Optional
+
+from warpy.config import (
+    config_input_classify,
+    config_input_whitelist_profile,
+    config_snapshot,
+)
+from warpy.histfile import get_data_path, histfile_read
+from warpy.hintspec import HintSpecReader
 from warpy.history import hist_add
 from warpy.input import input_event_tostr
+from warpy.lib import lib
 from warpy.platform import platform
-from warpy.schemas import Hint
+from warpy.schemas import Hint, Screen
+from warpy.search import HintSearch
+from warpy.spatial import SpatialIndex
 
-MAX_HINTS = 2048
 MAX_BOXES = 64
+MAX_LABEL = 15  # Hint.label is a 16 byte C string
+
+# schemas.Hint as packed bytes, for building large hint arrays in one copy
+HINT_RECORD = struct.Struct(f"iiii{MAX_LABEL}sx")
+assert HINT_RECORD.size == ctypes.sizeof(Hint)
+MAX_OVERLAYS = 8
+
+# While hints are still streaming in, poll for keys this often (ms), and
+# merge the arrivals into the index at least this often (s) or as soon as
+# they outnumber the indexed hints
+STREAM_POLL = 10
+STREAM_REFRESH = 0.05
+
+# Usage weighting (hint_weighting): a recorded selection adds HIST_DECAY**age
+# to the weight of its cell (age 0 being the latest), the pointer adds
+# POINTER_WEIGHT / (1 + d) to the cells within POINTER_REACH of its own
+HIST_DECAY = 0.95
+POINTER_WEIGHT = 1.0
+POINTER_REACH = 1
+
+# Element targets whose hint would cover more than this share of an already
+# placed hint are dropped
+CULL_OVERLAP = 0.5
+
+# Sorts after any character a label can contain; s + LABEL_END bounds the
+# range of labels starting with s
+LABEL_END = "\U0010ffff"
+
+
+class HintLabels(Sequence):
+    """
+    n prefix-free labels over chars, shortest first.
+
+    Every label has depth or depth - 1 characters, with as many short ones as
+    will fit, which minimises the keystrokes needed on average. Labels are
+    computed on access, so those that are never used are never built.
+    """
+
+    def __init__(self, chars: str, n: int):
+        k = len(chars)
+        if n > k and k < 2:
+            raise ValueError(f"{n} hints need at least 2 hint characters")
+
+        depth, nodes = 1, 1
+        while nodes * k < n:
+            depth += 1
+            nodes *= k
+
+        if depth > MAX_LABEL:
+            raise ValueError(
+                f"{n} hints need labels longer than {MAX_LABEL} characters"
+            )
+
+        self.chars = chars
+        self.n = n
+        self.depth = depth
+
+        # The first `short` of the nodes at depth - 1 are labels themselves,
+        # the remaining ones are expanded into up to k labels each
+        if depth == 1:
+            self.short = 0
+        else:
+            self.short = nodes - -(-(n - nodes) // (k - 1))
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.n))]
+
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError("hint label index out of range")
+
+        if i < self.short:
+            return self._node(i)
+
+        k = len(self.chars)
+        i -= self.short
+        return self._node(self.short + i // k) + self.chars[i % k]
+
+    def __iter__(self):
+        # Node v at depth - 1 is the v-th product of chars, in order
+        nodes = map("".join, product(self.chars, repeat=self.depth - 1))
+        if self.depth == 1:
+            yield from self.chars[: self.n]
+            return
+
+        yield from islice(nodes, self.short)
+        left = self.n - self.short
+        for node in nodes:
+            for c in self.chars[:left]:
+                yield node + c
+            left -= len(self.chars)
+            if left <= 0:
+                return
+
+    def _node(self, v: int) -> str:
+        """The label of node v at depth - 1."""
+        k = len(self.chars)
+        digits = []
+        for _ in range(self.depth - 1):
+            v, d = divmod(v, k)
+            digits.append(self.chars[d])
+        return "".join(reversed(digits))
+
+
+def weighted_labels(chars: str, weights: Sequence[float]) -> list[str]:
+    """
+    Prefix-free labels over chars minimising the weighted label length
+    (a k-ary Huffman code), heavier targets getting shorter labels and the
+    earlier characters of chars.
+    """
+    k = len(chars)
+    n = len(weights)
+    if n > k and k < 2:
+        raise ValueError(f"{n} hints need at least 2 hint characters")
+
+    if n <= k:
+        order = sorted(range(n), key=lambda i: -weights[i])
+        labels = [""] * n
+        for c, i in zip(chars, order):
+            labels[i] = c
+        return labels
+
+    # Pad with empty leaves so every merge takes exactly k nodes
+    heap = [(w, i, i) for i, w in enumerate(weights)]
+    heap += [(0, n + i, None) for i in range(-(n - 1) % (k - 1))]
+    heapq.heapify(heap)
+
+    counter = len(heap)
+    while len(heap) > 1:
+        children = [heapq.heappop(heap) for _ in range(k)]
+        weight = sum(c[0] for c in children)
+        heapq.heappush(heap, (weight, counter, children))
+        counter += 1
+
+    labels = [""] * n
+    stack = [(heap[0][2], "")]
+    while stack:
+        node, prefix = stack.pop()
+        if isinstance(node, int):
+            labels[node] = prefix
+            continue
+
+        node = sorted(node, key=lambda c: -c[0])
+        for c, child in zip(chars, node):
+            if child[2] is not None:
+                stack.append((child[2], prefix + c))
+
+    if max(map(len, labels)) > MAX_LABEL:
+        return list(HintLabels(chars, n))
+    return labels
+
+
+def usage_weights(
+    layout: Sequence["HintModel"],
+    n: int,
+    points: Sequence[tuple[int, int]],
+    pointer: Optional[tuple[int, int]],
+    strength: int,
+) -> list[float]:
+    """
+    Weights of the cells of an n x n fullscreen layout, given the recorded
+    selections (oldest first) and the pointer position.
+    """
+    cols = [layout[i * n].x + layout[i * n].w // 2 for i in range(n)]
+    rows = [layout[j].y + layout[j].h // 2 for j in range(n)]
+    weights = [1.0] * len(layout)
+
+    def nearest(centers, v):
+        i = bisect_left(centers, v)
+        if i == len(centers) or (i and v - centers[i - 1] < centers[i] - v):
+            i -= 1
+        return i
+
+    for age, (x, y) in enumerate(reversed(points)):
+        weights[nearest(cols, x) * n + nearest(rows, y)] += strength * HIST_DECAY**age
+
+    if pointer is not None:
+        pi, pj = nearest(cols, pointer[0]), nearest(rows, pointer[1])
+        for i in range(max(pi - POINTER_REACH, 0), min(pi + POINTER_REACH + 1, n)):
+            for j in range(max(pj - POINTER_REACH, 0), min(pj + POINTER_REACH + 1, n)):
+                d = max(abs(i - pi), abs(j - pj))
+                weights[i * n + j] += strength * POINTER_WEIGHT / (1 + d)
+
+    return weights
 
 
 class HintModel:
+    __slots__ = ("x", "y", "w", "h", "label", "name")
+
+    def __init__(
+        self,
+        x: int = 0,
+        y: int = 0,
+        w: int = 0,
+        h: int = 0,
+        label: str = "",
+        name: str = "",
+    ):
+        self.x: int = x
+        self.y: int = y
+        self.w: int = w
+        self.h: int = h
+        self.label: str = label
+        self.name: str = name  # of the element, for searching
+
+
+@lru_cache(maxsize=8)
+def fullscreen_layout(sw: int, sh: int, chars: str, w: int, h: int) -> tuple:
+    """
+    The fullscreen hint grid for a screen, shared by every activation with the
+    same geometry and settings. The returned hints must not be modified.
+    """
+    n = len(chars)
+
+    colgap = sw // n - w
+    rowgap = sh // n - h
+
+    x_offset = (sw - n * w - (n - 1) * colgap) // 2
+    y_offset = (sh - n * h - (n - 1) * rowgap) // 2
+
+    xs = [x_offset + i * (colgap + w) for i in range(n)]
+    ys = [y_offset + j * (rowgap + h) for j in range(n)]
+    labels = iter(HintLabels(chars, n * n))
+
+    return tuple(HintModel(x, y, w, h, next(labels)) for x in xs for y in ys)
+
+
+def element_targets(
+    rects: Sequence[tuple[int, int, int, int]],
+    w: int,
+    h: int,
+    pointer: Optional[tuple[int, int]] = None,
+    names: Optional[Sequence[str]] = None,
+) -> list[HintModel]:
+    """
+    Unlabelled hints of size w x h centred on clickable element rectangles,
+    nearest to the pointer first. Hints keep the names of their elements, if
+    given.
+    """
+    centres = [(x + rw // 2, y + rh // 2) for x, y, rw, rh in rects]
+    if pointer is not None:
+        px, py = pointer
+        order = sorted(
+            range(len(rects)),
+            key=lambda i: (centres[i][0] - px) ** 2 + (centres[i][1] - py) ** 2,
+        )
+    else:
+        order = range(len(rects))
+
+    return [
+        HintModel(
+            centres[i][0] - w // 2,
+            centres[i][1] - h // 2,
+            w,
+            h,
+            name=names[i] if names else "",
+        )
+        for i in order
+    ]
+
+
+def place_hints(targets: Sequence[HintModel], chars: str) -> list[HintModel]:
+    """
+    Labelled copies of targets, shortest labels first in the order given.
+    Targets whose hint would mostly cover an already placed one are dropped
+    (the placed hint stands in for them).
+    """
+    if not targets:
+        return []
+
+    # Placed hints overlap by at most CULL_OVERLAP, so only a handful share
+    # a cell and each target is checked in constant time
+    placed = SpatialIndex(max(targets[0].w, targets[0].h))
+    for t in targets:
+        box = (t.x, t.y, t.w, t.h)
+        if not placed.covered(box, CULL_OVERLAP * t.w * t.h):
+            placed.insert(box, t)
+
+    labels = HintLabels(chars, len(placed))
+    return [
+        HintModel(t.x, t.y, t.w, t.h, label, t.name)
+        for t, label in zip(placed.items, labels)
+    ]
+
+
+def element_hints(
+    rects: Sequence[tuple[int, int, int, int]],
+    chars: str,
+    w: int,
+    h: int,
+    pointer: Optional[tuple[int, int]] = None,
+    names: Optional[Sequence[str]] = None,
+) -> list[HintModel]:
+    """The placed hints of element_targets, as smart hint mode first shows them."""
+    return place_hints(element_targets(rects, w, h, pointer, names), chars)
+
+
+@lru_cache(maxsize=8)
+def sift_layout(sh: int, gap: int, size: int, chars: str, grid_sz: int) -> tuple:
+    """(dx, dy, size, label) of the second pass grid, relative to the pointer."""
+    gap = (gap * sh) // 1000
+    size = (size * sh) // 1000
+    origin = ((size + (gap - 1)) * grid_sz) // 2
+
+    return tuple(
+        (
+            (size + gap) * col - origin,
+            (size + gap) * row - origin,
+            size,
+            chars[row * grid_sz + col],
+        )
+        for col in range(grid_sz)
+        for row in range(grid_sz)
+        if row * grid_sz + col < len(chars)
+    )
+
+
+class HintIndex:
+    """A session's hints sorted by label, with their Hint structs laid out to match."""
+
+    def __init__(self, hints=()):
+        hints = sorted(hints, key=lambda h: h.label)
+        buffer = (Hint * len(hints)).from_buffer_copy(
+            b"".join(
+                HINT_RECORD.pack(h.x, h.y, h.w, h.h, h.label.encode("utf-8"))
+                for h in hints
+            )
+        )
+        self._set(hints, [h.label for h in hints], buffer)
+
+    def _set(self, hints: list[HintModel], labels: list[str], buffer) -> None:
+        self.hints = hints
+        self.labels = labels
+        self.buffer = buffer
+
+        # The subsets a first keystroke can select, so it needs no bisection
+        self.subsets: dict[str, tuple[int, int]] = {"": (0, len(hints))}
+        lo = bisect_right(labels, "")
+        while lo < len(labels):
+            c = labels[lo][0]
+            hi = bisect_left(labels, c + LABEL_END, lo)
+            self.subsets[c] = (lo, hi)
+            lo = hi
+
+    def merged(self, hints) -> "HintIndex":
+        """
+        A new index with hints added. Only the new hints are sorted and
+        packed: the indexed ones are carried over in slices between the
+        points the new ones are inserted at, and their structs copied in bulk.
+        """
+        batch = HintIndex(hints)
+        n, k = len(self.hints), len(batch.hints)
+        size = ctypes.sizeof(Hint)
+        buffer = (Hint * (n + k))()
+        dst, old, new = map(ctypes.addressof, (buffer, self.buffer, batch.buffer))
+
+        hints: list[HintModel] = []
+        labels: list[str] = []
+        start = 0
+        for j, label in enumerate(batch.labels):
+            pos = bisect_right(self.labels, label, start)
+            hints += self.hints[start:pos]
+            labels += self.labels[start:pos]
+            hints.append(batch.hints[j])
+            labels.append(label)
+
+            ctypes.memmove(
+                dst + (start + j) * size, old + start * size, (pos - start) * size
+            )
+            ctypes.memmove(dst + (pos + j) * size, new + j * size, size)
+            start = pos
+
+        hints += self.hints[start:]
+        labels += self.labels[start:]
+        ctypes.memmove(dst + (start + k) * size, old + start * size, (n - start) * size)
+
+        index = HintIndex.__new__(HintIndex)
+        index._set(hints, labels, buffer)
+        return index
+
+    def bounds(self, s: str) -> tuple[int, int]:
+        """Bounds of the hints whose label starts with s."""
+        subset = self.subsets.get(s) if len(s) < 2 else None
+        if subset:
+            return subset
+
+        lo = bisect_left(self.labels, s)
+        return lo, bisect_left(self.labels, s + LABEL_END, lo)
+
+    def draw(self, scr, lo: int, hi: int) -> None:
+        start = ctypes.addressof(self.buffer) + lo * ctypes.sizeof(Hint)
+        platform.hint_draw(scr, ctypes.cast(start, ctypes.POINTER(Hint)), hi - lo)
+
+
+class HintDisplay:
+    """
+    The hint frame last committed to the screen. The platform can only clear
+    and redraw a screen's hints, so the saving is in not touching it at all
+    when a keystroke leaves the visible set unchanged.
+    """
+
     def __init__(self):
-        self.x: int = 0
-        self.y: int = 0
-        self.w: int = 0
-        self.h: int = 0
-        self.label: str = ""
-
-    def to_struct(self) -> Hint:
-        """Convert Python Hint to C-compatible struct"""
-        struct = Hint()
-        struct.x = self.x
-        struct.y = self.y
-        struct.w = self.w
-        struct.h = self.h
-        struct.label = self.label.encode('utf-8')
-        return struct
+        self.frame = None
+
+    def invalidate(self) -> None:
+        self.frame = None
+
+    def show(self, scr, index: HintIndex, lo: int, hi: int) -> bool:
+        """Make hints [lo, hi) of index the visible frame, committing if it changed."""
+        frame = (ctypes.addressof(scr.contents), index, lo, hi)
+        if frame == self.frame:
+            return False
+
+        platform.screen_clear(scr)
+        if hi > lo:
+            index.draw(scr, lo, hi)
+        platform.commit()
+
+        self.frame = frame
+        return True
+
 
 class HintManager:
     def __init__(self):
-        self.hints: list[HintModel] = []
+        self.index = HintIndex(())
+        self.display = HintDisplay()
+        self.hints: list[HintModel] = []  # sorted by label for the session
         self.matched: list[HintModel] = []
+        # Fullscreen indexes by screen size and layout settings, most recently
+        # used last
+        self.overlays: OrderedDict = OrderedDict()
         self.nr_hints: int = 0
         self.nr_matched: int = 0
         self.last_selected_hint: str = ""
-        self.MAX_HINTS: int = 2048
 
-    def filter(self, scr, s: str) -> None:
-        self.nr_matched = 0
-        self.matched = []
+    def set_hints(self, hints) -> None:
+        """Index the hints of a selection session by label."""
+        self.use_index(HintIndex(hints))
 
-        for i in range(self.nr_hints):
-            if self.hints[i].label.startswith(s):
-                if self.nr_matched < self.MAX_HINTS:
-                    self.matched.append(self.hints[i])
-                    self.nr_matched += 1
+    def use_index(self, index: HintIndex) -> None:
+        self.index = index
+        self.hints = index.hints
+        self.nr_hints = len(index.hints)
 
-        platform.screen_clear(scr)
-        hint_array = (Hint * self.nr_matched)()
+    def match_range(self, s: str) -> tuple[int, int]:
+        """Bounds of the hints whose label starts with s."""
+        return self.index.bounds(s)
 
-        for i in range(self.nr_matched):
-            hint_array[i] = self.matched[i].to_struct()
-        platform.hint_draw(scr, hint_array, self.nr_matched)
-        platform.commit()
+    def narrow(self, s: str) -> tuple[int, int]:
+        # Labels sharing a prefix are contiguous, so narrowing (and undoing)
+        # costs a bisection plus the size of the match
+        lo, hi = self.match_range(s)
+        self.matched = self.hints[lo:hi]
+        self.nr_matched = hi - lo
+        return lo, hi
+
+    def filter(self, scr, s: str) -> None:
+        lo, hi = self.narrow(s)
+        self.display.show(scr, self.index, lo, hi)
 
     def get_hint_size(self, scr, w: ctypes.c_int, h: ctypes.c_int) -> tuple[int, int]:
         platform.screen_get_dimensions(scr, ctypes.byref(w), ctypes.byref(h))
@@ -65,68 +501,138 @@ class HintManager:
         if sw_val < sh_val:
             sw_val, sh_val = sh_val, sw_val
 
-        ww = (sw_val * config_get_int("hint_size")) // 1000
-        hh = (sh_val * config_get_int("hint_size")) // 1000
+        hint_size = config_snapshot().hint_size
+        ww = (sw_val * hint_size) // 1000
+        hh = (sh_val * hint_size) // 1000
 
         return ww, hh
 
-    def generate_fullscreen_hints(self, scr) -> list[HintModel]:
+    def fullscreen_index(self, scr, pointer=None) -> HintIndex:
+        """
+        The indexed fullscreen hints of scr, built on first use. With
+        hint_weighting set, labels also depend on the recorded selections
+        and the cell of the pointer.
+        """
         sw = ctypes.c_int()
         sh = ctypes.c_int()
         w, h = self.get_hint_size(scr, sw, sh)
 
         platform.screen_get_dimensions(scr, ctypes.byref(sw), ctypes.byref(sh))
-        sw_val, sh_val = sw.value, sh.value
-
-        chars = config_get("hint_chars")
-        nr = len(chars)
-        nc = len(chars)
-
-        colgap = sw_val // nc - w
-        rowgap = sh_val // nr - h
-
-        x_offset = (sw_val - nc * w - (nc - 1) * colgap) // 2
-        y_offset = (sh_val - nr * h - (nr - 1) * rowgap) // 2
-
-        x, y = x_offset, y_offset
-        n = 0
-        generated_hints = []
-
-        for i in range(nc):
-            for j in range(nr):
-                hint = HintModel()
-                hint.x = x
-                hint.y = y
-                hint.w = w
-                hint.h = h
-                hint.label = chars[i] + chars[j]
-
-                generated_hints.append(hint)
-                n += 1
-
-                y += rowgap + h
-
-            y = y_offset
-            x += colgap + w
-
-        return generated_hints
-
-    def hint_selection(self, scr, _hints: list[HintModel], _nr_hints: int) -> int:
-        self.hints = _hints
-        self.nr_hints = _nr_hints
-
+        cfg = config_snapshot()
+        key = (sw.value, sh.value, cfg.hint_chars, w, h)
+        layout = fullscreen_layout(*key)
+
+        # Weights shift with every selection and pointer move, but mostly
+        # leave the labels they are assigned the same
+        if cfg.hint_weighting:
+            weights = usage_weights(
+                layout, len(cfg.hint_chars), usage_points(), pointer, cfg.hint_weighting
+            )
+            labels = weighted_labels(cfg.hint_chars, weights)
+            key += (tuple(labels),)
+
+        index = self.overlays.get(key)
+        if index is None:
+            if cfg.hint_weighting:
+                layout = [
+                    HintModel(hint.x, hint.y, hint.w, hint.h, label)
+                    for hint, label in zip(layout, labels)
+                ]
+
+            index = self.overlays[key] = HintIndex(layout)
+            if len(self.overlays) > MAX_OVERLAYS:
+                self.overlays.popitem(last=False)
+        else:
+            self.overlays.move_to_end(key)
+
+        return index
+
+    def extend(self, hints: list[HintModel]) -> None:
+        """Add hints that arrived during a session."""
+        self.use_index(self.index.merged(hints))
+
+    def settle(self, scr, buf: str, complete: bool) -> bool:
+        """Narrow to buf, returning True if that ends the session."""
+        lo, hi = self.narrow(buf)
+
+        # Until every hint is in, a unique or empty match may still grow, and
+        # only a keystroke that ends the session goes undrawn
+        if not complete or self.nr_matched > 1:
+            self.display.show(scr, self.index, lo, hi)
+            return False
+
+        if self.nr_matched == 1:
+            h = self.matched[0]
+
+            platform.screen_clear(scr)
+
+            nx = h.x + h.w // 2
+            ny = h.y + h.h // 2
+
+            # Wiggle the cursor a single pixel to accommodate
+            # text selection widgets which don't like spontaneous
+            # cursor warping.
+            platform.mouse_move(scr, nx + 1, ny + 1)
+            platform.mouse_move(scr, nx, ny)
+
+            self.last_selected_hint = buf
+
+        return True
+
+    def hint_selection(
+        self, scr, _hints, _nr_hints: int, stream=None, targets=None
+    ) -> int:
+        """
+        Select a hint by typing its label. Hints can keep arriving from
+        stream (see HintSpecReader) while the session runs. When the hints
+        have names, hint_search toggles typing a search query instead, which
+        narrows them down and places and labels the matches best first.
+
+        targets are the unlabelled hints searched, when the hints shown are
+        only some of them (see place_hints).
+        """
+        if isinstance(_hints, HintIndex):
+            self.use_index(_hints)
+        else:
+            self.set_hints(_hints[:_nr_hints])
+
+        self.display.invalidate()
         self.filter(scr, "")
 
         rc = 0
         buf = ""
+        complete = stream is None
+        pending: list[HintModel] = []
+        refreshed = time.monotonic()
+
+        targets = self.hints if targets is None else targets
+        searchable = complete and any(h.name for h in targets)
+        search: Optional[HintSearch] = None
+        query: Optional[str] = None
+
         platform.input_grab_keyboard()
         platform.mouse_hide()
 
-        keys = ["hint_exit", "hint_undo_all", "hint_undo"]
-        config_input_whitelist(keys, len(keys))
+        config_input_whitelist_profile("hint")
 
         while True:
-            ev = platform.input_next_event(0)
+            if not complete:
+                # Read done first: once it is set, take() has everything
+                complete = stream.done
+                pending += stream.take()
+
+                now = time.monotonic()
+                due = len(pending) >= self.nr_hints or now - refreshed >= STREAM_REFRESH
+                if complete or (pending and due):
+                    self.extend(pending)
+                    pending = []
+                    refreshed = now
+
+                    # Arrivals only end a session the user has started typing in
+                    if self.settle(scr, buf, complete and bool(buf)):
+                        break
+
+            ev = platform.input_next_event(0 if complete else STREAM_POLL)
 
             if not ev:
                 continue
@@ -135,12 +641,48 @@ class HintManager:
             else:
                 ev = ev.contents
 
-            if config_input_match(ev, "hint_exit"):
+            matched = config_input_classify(ev)
+
+            if "hint_exit" in matched:
                 rc = -1
                 break
-            elif config_input_match(ev, "hint_undo_all"):
+            elif "hint_search" in matched and searchable:
+                if search is None:
+                    search = HintSearch(targets)
+
+                # Leaving search keeps the narrowed hints to pick from by label.
+                # Either way nothing is selected yet, even a single hint.
+                query = "" if query is None else None
                 buf = ""
-            elif config_input_match(ev, "hint_undo"):
+                self.filter(scr, buf)
+                continue
+            elif query is not None:
+                if "hint_undo_all" in matched:
+                    query = ""
+                elif "hint_undo" in matched:
+                    query = query[:-1]
+                else:
+                    name = input_event_tostr(ev)
+                    name = " " if name == "space" else name
+
+                    if not name or len(name) > 1:
+                        continue
+
+                    query += name
+
+                # Only the best matches are placed, at most as many as get
+                # labels of up to two keys; the query narrows down to the rest
+                chars = config_snapshot().hint_chars
+                found = search.search(query, len(chars) ** 2)
+                self.use_index(HintIndex(place_hints(found, chars)))
+
+                # A query matching a single element selects it
+                if self.settle(scr, "", self.nr_hints == 1):
+                    break
+                continue
+            elif "hint_undo_all" in matched:
+                buf = ""
+            elif "hint_undo" in matched:
                 if buf:
                     buf = buf[:-1]
             else:
@@ -151,25 +693,7 @@ class HintManager:
 
                 buf += name[0]
 
-            self.filter(scr, buf)
-
-            if self.nr_matched == 1:
-                h = self.matched[0]
-
-                platform.screen_clear(scr)
-
-                nx = h.x + h.w // 2
-                ny = h.y + h.h // 2
-
-                # Wiggle the cursor a single pixel to accommodate
-                # text selection widgets which don't like spontaneous
-                # cursor warping.
-                platform.mouse_move(scr, nx + 1, ny + 1)
-                platform.mouse_move(scr, nx, ny)
-
-                self.last_selected_hint = buf
-                break
-            elif self.nr_matched == 0:
+            if self.settle(scr, buf, complete):
                 break
 
         platform.input_ungrab_keyboard()
@@ -180,91 +704,106 @@ class HintManager:
         return rc
 
     def sift(self) -> int:
-        gap = config_get_int("hint2_gap_size")
-        hint_sz = config_get_int("hint2_size")
-
-        chars = config_get("hint2_chars")
-        chars_len = len(chars)
-
-        grid_sz = config_get_int("hint2_grid_size")
+        cfg = config_snapshot()
 
         x = ctypes.c_int()
         y = ctypes.c_int()
         sh = ctypes.c_int()
         sw = ctypes.c_int()
 
-        n = 0
-        hints = [HintModel() for _ in range(self.MAX_HINTS)]
-
-        scr = platform.mouse_get_position(ctypes.byref(x), ctypes.byref(y))
+        scr = ctypes.POINTER(Screen)()
+        platform.mouse_get_position(ctypes.byref(scr), ctypes.byref(x), ctypes.byref(y))
         platform.screen_get_dimensions(scr, ctypes.byref(sw), ctypes.byref(sh))
 
         x_val, y_val = x.value, y.value
-        sw_val, sh_val = sw.value, sh.value
+        layout = sift_layout(
+            sh.value,
+            cfg.hint2_gap_size,
+            cfg.hint2_size,
+            cfg.hint2_chars,
+            cfg.hint2_grid_size,
+        )
+        hints = [
+            HintModel(x_val + dx, y_val + dy, size, size, label)
+            for dx, dy, size, label in layout
+        ]
+
+        return self.hint_selection(scr, hints, len(hints))
 
-        gap = (gap * sh_val) // 1000
-        hint_sz = (hint_sz * sh_val) // 1000
+_hint_manager = HintManager()
 
-        x_val -= ((hint_sz + (gap - 1)) * grid_sz) // 2
-        y_val -= ((hint_sz + (gap - 1)) * grid_sz) // 2
+def init_hints():
+    cfg = config_snapshot()
+    platform.init_hint(
+        cfg.hint_bgcolor,
+        cfg.hint_fgcolor,
+        cfg.hint_border_radius,
+        cfg.hint_font,
+    )
 
-        for col in range(grid_sz):
-            for row in range(grid_sz):
-                idx = (row * grid_sz) + col
 
-                if idx < chars_len:
-                    hints[n].x = x_val + (hint_sz + gap) * col
-                    hints[n].y = y_val + (hint_sz + gap) * row
-                    hints[n].w = hint_sz
-                    hints[n].h = hint_sz
-                    hints[n].label = chars[idx]
+_usage: tuple = (None, [])
 
-                    n += 1
 
-        return self.hint_selection(scr, hints[:n], n)
+def usage_points() -> list[tuple[int, int]]:
+    """Recorded selections, oldest first, rereading the histfile only on change."""
+    global _usage
 
-_hint_manager = HintManager()
+    try:
+        version = os.stat(get_data_path("history")).st_mtime_ns
+    except OSError:
+        version = None
 
-def init_hints():
-    platform.init_hint(
-        config_get("hint_bgcolor").encode("utf-8"),
-        config_get("hint_fgcolor").encode("utf-8"),
-        config_get_int("hint_border_radius"),
-        config_get("hint_font").encode("utf-8"),
-    )
+    if version is None or version != _usage[0]:
+        ents, n = histfile_read()
+        _usage = (version, [(e.x, e.y) for e in ents[:n]])
+
+    return _usage[1]
 
 
-def hintspec_mode(scr):
+def prerender_hints():
+    """
+    Build the fullscreen hint index of every screen ahead of the first
+    activation, dropping those of the previous config.
+    """
+    _hint_manager.overlays.clear()
+    fullscreen_layout.cache_clear()
+
+    for i in range(lib.get_nr_screens()):
+        _hint_manager.fullscreen_index(lib.get_screen(i))
+
+
+def hintspec_mode(scr, read: Optional[Callable[[int], bytes]] = None):
+    """
+    Select among the hints given as "<label> <x> <y>" lines, NDJSON or packed
+    binary records (see warpy.hintspec), read with read (see HintSpecReader)
+    or from stdin. The input is read in the background, so the session starts
+    with the first hints that arrive.
+    """
     sw = ctypes.c_int()
     sh = ctypes.c_int()
 
-    hints = [HintModel() for _ in range(_hint_manager.MAX_HINTS)]
-    n = 0
-
     platform.screen_get_dimensions(scr, ctypes.byref(sw), ctypes.byref(sh))
 
     w, h = _hint_manager.get_hint_size(scr, sw, sh)
 
-    try:
-        while True:
-            line = input()
-            parts = line.split()
-            if len(parts) < 3:
-                break
+    def to_hints(specs):
+        return [
+            HintModel(x - w // 2, y - h // 2, w, h, label[:MAX_LABEL])
+            for label, x, y in specs
+        ]
+
+    if read is None:
+        read = partial(os.read, sys.stdin.buffer.fileno())
 
-            hints[n].label = parts[0][:15]  # Limiting to 15 chars as in the C code
-            hints[n].x = int(parts[1])
-            hints[n].y = int(parts[2])
-            hints[n].w = w
-            hints[n].h = h
-            hints[n].x -= w // 2
-            hints[n].y -= h // 2
+    reader = HintSpecReader(read, to_hints)
+    reader.start()
 
-            n += 1
-    except EOFError:
-        pass
+    rc = _hint_manager.hint_selection(scr, [], 0, stream=reader)
+    if reader.error:
+        print(f"ERROR: hintspec: {reader.error}", file=sys.stderr)
 
-    return _hint_manager.hint_selection(scr, hints[:n], n)
+    return rc
 
 
 def full_hint_mode(scr, second_pass: int):
@@ -274,10 +813,9 @@ def full_hint_mode(scr, second_pass: int):
     platform.mouse_get_position(ctypes.byref(scr), ctypes.byref(mx), ctypes.byref(my))
     hist_add(mx.value, my.value)
 
-    hints = _hint_manager.generate_fullscreen_hints(scr)
-    _hint_manager.nr_hints = len(hints)
+    index = _hint_manager.fullscreen_index(scr, (mx.value, my.value))
 
-    if _hint_manager.hint_selection(scr, hints, _hint_manager.nr_hints):
+    if _hint_manager.hint_selection(scr, index, len(index.hints)):
         return -1
 
     if second_pass:
@@ -287,8 +825,6 @@ def full_hint_mode(scr, second_pass: int):
 
 
 def history_hint_mode(scr):
-    hints = [HintModel() for _ in range(_hint_manager.MAX_HINTS)]
-    ents = None
     sw = ctypes.c_int()
     sh = ctypes.c_int()
 
@@ -298,12 +834,11 @@ def history_hint_mode(scr):
     ents, n = histfile_read()
 
     w, h = _hint_manager.get_hint_size(scr, sw, sh)
+    labels = HintLabels(config_snapshot().hint_chars, n)
 
-    for i in range(n):
-        hints[i].w = w
-        hints[i].h = h
-        hints[i].x = ents[i].x - w // 2
-        hints[i].y = ents[i].y - h // 2
-        hints[i].label = chr(ord('a') + i)
+    hints = [
+        HintModel(ents[i].x - w // 2, ents[i].y - h // 2, w, h, labels[i])
+        for i in range(n)
+    ]
 
-    return _hint_manager.hint_selection(scr, hints[:n], n)
+    return _hint_manager.hint_selection(scr, hints, n)
@@ -0,0 +1,178 @@
+import json
+import struct
+import threading
+from typing import Callable, Optional
+
+# hintspec input is one of:
+#
+#   text:    "<label> <x> <y>" lines, ending at EOF or the first short line
+#   ndjson:  {"label": ..., "x": ..., "y": ...} objects, one per line
+#   binary:  BINARY_MAGIC followed by RECORD headers (x, y, label length),
+#            each followed by its utf-8 label
+#
+# The format is picked from the first bytes of the input.
+FORMAT_TEXT = "text"
+FORMAT_NDJSON = "ndjson"
+FORMAT_BINARY = "binary"
+
+BINARY_MAGIC = b"WHNT"
+RECORD = struct.Struct("<iiB")
+
+CHUNK_SIZE = 1 << 16
+
+
+class HintSpecParser:
+    """Incremental hintspec parser, fed raw bytes as they arrive."""
+
+    def __init__(self):
+        self.format: Optional[str] = None
+        self.finished = False
+        self.buf = b""
+
+    def feed(self, data: bytes) -> list:
+        """(label, x, y) of every target completed by data."""
+        if self.finished:
+            return []
+
+        self.buf += data
+        if self.format is None and not self._detect():
+            return []
+
+        return self._parse(final=False)
+
+    def close(self) -> list:
+        """The targets left at EOF."""
+        if self.finished:
+            return []
+
+        if self.format is None:
+            self.format = FORMAT_TEXT
+
+        specs = self._parse(final=True)
+        if self.buf:
+            raise ValueError(f"truncated {self.format} record at end of input")
+
+        self.finished = True
+        return specs
+
+    def _detect(self) -> bool:
+        if self.buf.startswith(BINARY_MAGIC):
+            self.format = FORMAT_BINARY
+            self.buf = self.buf[len(BINARY_MAGIC) :]
+            return True
+
+        if len(self.buf) < len(BINARY_MAGIC) and BINARY_MAGIC.startswith(self.buf):
+            return False
+
+        head = self.buf.lstrip()
+        if not head:
+            return False
+
+        self.format = FORMAT_NDJSON if head.startswith(b"{") else FORMAT_TEXT
+        return True
+
+    def _parse(self, final: bool) -> list:
+        if self.format == FORMAT_BINARY:
+            return self._parse_binary()
+
+        # A newline byte never occurs inside a multibyte utf-8 sequence, so
+        # complete lines can be split off before decoding
+        lines = self.buf.split(b"\n")
+        self.buf = b"" if final else lines.pop()
+
+        if self.format == FORMAT_NDJSON:
+            return self._parse_ndjson(lines)
+        return self._parse_text(lines)
+
+    def _parse_text(self, lines: list) -> list:
+        specs = []
+        for line in lines:
+            parts = line.split()
+            if len(parts) < 3:
+                self.finished = True
+                self.buf = b""
+                break
+
+            specs.append((parts[0].decode(), int(parts[1]), int(parts[2])))
+
+        return specs
+
+    def _parse_ndjson(self, lines: list) -> list:
+        specs = []
+        for line in lines:
+            if not line.strip():
+                continue
+
+            try:
+                obj = json.loads(line)
+                specs.append((str(obj["label"]), int(obj["x"]), int(obj["y"])))
+            except (KeyError, TypeError, json.JSONDecodeError) as e:
+                raise ValueError(f"invalid ndjson hint {line[:80]!r}: {e}") from None
+
+        return specs
+
+    def _parse_binary(self) -> list:
+        specs = []
+        buf = self.buf
+        off = 0
+
+        while len(buf) - off >= RECORD.size:
+            x, y, n = RECORD.unpack_from(buf, off)
+            end = off + RECORD.size + n
+            if end > len(buf):
+                break
+
+            specs.append((buf[off + RECORD.size : end].decode(), x, y))
+            off = end
+
+        self.buf = buf[off:]
+        return specs
+
+
+def parse_hintspec(data: bytes) -> list:
+    """(label, x, y) of every target in a complete hintspec input."""
+    parser = HintSpecParser()
+    return parser.feed(data) + parser.close()
+
+
+class HintSpecReader(threading.Thread):
+    """
+    Reads hintspec input in bulk on a background thread, with read(n)
+    returning up to n bytes and b"" at EOF (e.g. os.read on a descriptor).
+    Parsed targets, passed through convert, are collected with take().
+    """
+
+    def __init__(
+        self,
+        read: Callable[[int], bytes],
+        convert: Optional[Callable[[list], list]] = None,
+    ):
+        super().__init__(daemon=True)
+        self.read = read
+        self.convert = convert
+        self.parser = HintSpecParser()
+        self.lock = threading.Lock()
+        self.pending: list = []
+        self.done = False
+        self.error: Optional[Exception] = None
+
+    def run(self):
+        try:
+            while not self.parser.finished:
+                data = self.read(CHUNK_SIZE)
+                specs = self.parser.feed(data) if data else self.parser.close()
+
+                if specs:
+                    items = self.convert(specs) if self.convert else specs
+                    with self.lock:
+                        self.pending.extend(items)
+        except (OSError, ValueError) as e:
+            self.error = e
+        finally:
+            self.done = True
+
+    def take(self) -> list:
+        """Targets read since the last call."""
+        with self.lock:
+            pending, self.pending = self.pending, []
+        return pending
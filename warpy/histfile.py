@@ -1,3 +1,4 @@
+import logging
 import os
 import struct
 import sys
@@ -20,6 +21,21 @@ def get_data_path(file="history"):
     return os.path.join(path, file)
 
 
+def write_cache_file(path: str, data: bytes, what: str) -> None:
+    """
+    Replace the cache file at path with data in one step, so readers never
+    see it half written. A cache is only an optimisation, so failing to
+    write it is only logged.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.debug(f"Could not write {what} cache {path}: {e}")
+
+
 def get_config_path(file="config"):
     """Get path to config file, creating directories if needed."""
     if os.getenv("XDG_CONFIG_HOME"):
@@ -1,4 +1,5 @@
 import ctypes
+from typing import Dict, List, Optional, Tuple
 
 from warpy.platform import (
     PLATFORM_MOD_ALT,
@@ -12,6 +13,108 @@ from warpy.schemas import InputEvent
 cached_mods = {}
 
 
+class Keymap:
+    """
+    Python copy of the platform's keycode <-> key name tables.
+
+    Both directions are built from a single sweep over every code and shift
+    level, so steady-state lookups never cross into the native layer. Names
+    the sweep did not produce (aliases understood by the platform) fall back
+    to one native lookup each and are then remembered too.
+    """
+
+    def __init__(self):
+        self.names: List[Optional[str]] = []  # index: code * 2 + shifted
+        self.codes: Dict[str, Tuple[int, int]] = {}
+        self.loaded = False
+
+    def load(self) -> None:
+        """Sweep all 256 codes at both shift levels."""
+        self.names = [None] * 512
+        self.codes = {}
+
+        for code in range(256):
+            for shifted in (0, 1):
+                name = platform.input_lookup_name(code, shifted)
+                if name:
+                    self.names[code * 2 + shifted] = name.decode()
+
+        # Prefer unshifted keys, then the lowest code, like the X lookup does
+        for shifted in (0, 1):
+            for code in range(256):
+                name = self.names[code * 2 + shifted]
+                if name:
+                    self.codes.setdefault(name, (code, shifted))
+
+        self.loaded = True
+
+    def invalidate(self) -> None:
+        """Drop the tables; they are rebuilt on the next lookup."""
+        self.loaded = False
+
+    def check(self, probes: List[Tuple[str, int, int]]) -> bool:
+        """
+        Whether every (name, code, shifted) probe still holds. Without loaded
+        tables this asks the platform directly rather than sweeping the
+        whole keymap, which is cheaper for a handful of names.
+        """
+        for name, code, shifted in probes:
+            if self.loaded:
+                current = self.lookup_code(name)
+            else:
+                level = ctypes.c_int(0)
+                code_now = platform.input_lookup_code(
+                    name.encode("utf-8"), ctypes.byref(level)
+                )
+                current = (code_now, 1 if level.value else 0)
+
+            if current != (code, shifted):
+                return False
+
+        return True
+
+    def lookup_code(self, name: str) -> Tuple[int, int]:
+        """Return (code, shifted) for a key name, code 0 if unknown."""
+        if not self.loaded:
+            self.load()
+
+        if name not in self.codes:
+            shifted = ctypes.c_int(0)
+            code = platform.input_lookup_code(
+                name.encode("utf-8"), ctypes.byref(shifted)
+            )
+            self.codes[name] = (code, 1 if shifted.value else 0)
+
+        return self.codes[name]
+
+    def lookup_name(self, code: int, shifted: int) -> Optional[str]:
+        """Return the name of a code at a shift level, None if unmapped."""
+        if not self.loaded:
+            self.load()
+
+        return self.names[(code & 0xFF) * 2 + (1 if shifted else 0)]
+
+
+_keymap = Keymap()
+
+
+def input_lookup_code(name: str) -> Tuple[int, int]:
+    return _keymap.lookup_code(name)
+
+
+def input_lookup_name(code: int, shifted: int) -> Optional[str]:
+    return _keymap.lookup_name(code, shifted)
+
+
+def input_keymap_invalidate() -> None:
+    """Call when the keyboard mapping changes."""
+    _keymap.invalidate()
+
+
+def input_keymap_check(probes: List[Tuple[str, int, int]]) -> bool:
+    return _keymap.check(probes)
+
+
 def input_parse_string(ev: InputEvent, s: str):
     if not s or len(s) == 0:
         return 0
@@ -36,11 +139,9 @@ def input_parse_string(ev: InputEvent, s: str):
         s = s[2:]
 
     if s:
-        shifted = ctypes.c_int(0)
-
-        code = platform.input_lookup_code(s.encode("utf-8"), ctypes.byref(shifted))
+        code, shifted = _keymap.lookup_code(s)
         ev.code = code
-        if shifted.value:
+        if shifted:
             ev.mods |= PLATFORM_MOD_SHIFT
 
         if not ev.code:
@@ -51,11 +152,12 @@ def input_parse_string(ev: InputEvent, s: str):
 
 def input_event_tostr(ev: InputEvent):
     s = []
-    name = platform.input_lookup_name(ev.code, 1 if ev.mods & PLATFORM_MOD_SHIFT else 0)
 
     if not ev:
         return "NULL"
 
+    name = _keymap.lookup_name(ev.code, 1 if ev.mods & PLATFORM_MOD_SHIFT else 0)
+
     if ev.mods & PLATFORM_MOD_CONTROL:
         s.append("C-")
     if ev.mods & PLATFORM_MOD_ALT:
@@ -63,20 +165,25 @@ def input_event_tostr(ev: InputEvent):
     if ev.mods & PLATFORM_MOD_META:
         s.append("M-")
 
-    s.append(name.decode() if name else "UNDEFINED")
+    s.append(name if name else "UNDEFINED")
 
     return "".join(s)
 
 
+def input_event_mods(ev: InputEvent) -> int:
+    """Modifiers to match ev with; releases reuse the mods of the press."""
+    if ev.pressed:
+        cached_mods[ev.code] = ev.mods
+        return ev.mods
+
+    return cached_mods.get(ev.code, 0)
+
+
 def input_eq(ev: InputEvent | None, string: str) -> int:
     if not ev:
         return 0
 
-    if ev.pressed:
-        mods = ev.mods
-        cached_mods[ev.code] = ev.mods
-    else:
-        mods = cached_mods.get(ev.code, 0)
+    mods = input_event_mods(ev)
 
     ev1 = InputEvent(0, False, 0)
 
@@ -1,18 +1,48 @@
 import ctypes
 
-from warpy.schemas import InputEvent, Screen
+from warpy.schemas import InputEvent, Platform, Screen
 
-lib = ctypes.CDLL("/home/tuanna/Documents/warpd/warpd/lib/linux_X.so")
+LIB_PATH = "/home/tuanna/Documents/warpd/warpd/lib/linux_X.so"
 
-get_time_us = lib.get_time_us
-get_time_us.argtypes = []
-get_time_us.restype = ctypes.c_uint64
 
-lib.get_nr_screens.restype = ctypes.c_size_t
-n_screens = lib.get_nr_screens()
+class NativeLibrary:
+    """
+    The warpd shared object, loaded on first use rather than at import time
+    so that code paths which never reach the platform (--help,
+    --list-options, ...) don't pay for loading it.
+    """
 
-lib.get_screen.argtypes = [ctypes.c_int]
-lib.get_screen.restype = ctypes.POINTER(Screen)
+    def __init__(self, path: str):
+        self._path = path
+        self._cdll = None
 
-lib.input_eq.argtypes = [ctypes.POINTER(InputEvent), ctypes.c_char_p]
-lib.input_eq.restype = ctypes.c_int
+    def __getattr__(self, name):
+        if self._cdll is None:
+            self._cdll = _load(self._path)
+        return getattr(self._cdll, name)
+
+
+def _load(path: str) -> ctypes.CDLL:
+    cdll = ctypes.CDLL(path)
+
+    cdll.x_init.argtypes = [ctypes.POINTER(Platform)]
+    cdll.x_init.restype = None
+
+    cdll.get_time_us.argtypes = []
+    cdll.get_time_us.restype = ctypes.c_uint64
+
+    cdll.get_nr_screens.restype = ctypes.c_size_t
+
+    cdll.get_screen.argtypes = [ctypes.c_int]
+    cdll.get_screen.restype = ctypes.POINTER(Screen)
+
+    cdll.input_eq.argtypes = [ctypes.POINTER(InputEvent), ctypes.c_char_p]
+    cdll.input_eq.restype = ctypes.c_int
+    return cdll
+
+
+lib = NativeLibrary(LIB_PATH)
+
+
+def get_time_us() -> int:
+    return lib.get_time_us()
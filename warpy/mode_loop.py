@@ -3,13 +3,18 @@ from ctypes import byref, c_int
 from typing import Optional
 
 from warpy import schemas
-from warpy.config import config_input_match, config_input_whitelist
+from warpy.config import (
+    config_input_classify,
+    config_input_match,
+    config_input_whitelist_profile,
+)
 from warpy.grid import grid_mode
 from warpy.hint import full_hint_mode, hintspec_mode, history_hint_mode
 from warpy.histfile import histfile_add
 from warpy.normal import normal_mode
 from warpy.schemas import InputEvent
 from warpy.screen import screen_selection_mode
+from warpy.smart_hint import smart_hint_mode
 
 
 def mode_loop(scr, platform, initial_mode: int, oneshot: int, record_history: int):
@@ -21,7 +26,7 @@ def mode_loop(scr, platform, initial_mode: int, oneshot: int, record_history: in
         btn = 0
         print("NEW LOOP")
 
-        config_input_whitelist([], 0)
+        config_input_whitelist_profile(None)
         match mode:
             case schemas.MODE_HISTORY:
                 if history_hint_mode(scr) < 0:
@@ -32,20 +37,21 @@ def mode_loop(scr, platform, initial_mode: int, oneshot: int, record_history: in
                 hintspec_mode(scr)
             case schemas.MODE_NORMAL:
                 ev = normal_mode(scr, ev, oneshot)
+                matched = config_input_classify(ev)
 
-                if config_input_match(ev, "history"):
+                if "history" in matched:
                     mode = schemas.MODE_HISTORY
-                elif config_input_match(ev, "hint"):
+                elif "hint" in matched:
                     mode = schemas.MODE_HINT
-                elif config_input_match(ev, "hint2"):
+                elif "hint2" in matched:
                     mode = schemas.MODE_HINT2
-                elif config_input_match(ev, "grid"):
+                elif "grid" in matched:
                     mode = schemas.MODE_GRID
-                elif config_input_match(ev, "screen"):
+                elif "screen" in matched:
                     mode = schemas.MODE_SCREEN_SELECTION
-                elif rc := config_input_match(ev, "oneshot_buttons") or not ev:
+                elif rc := matched.get("oneshot_buttons", 0) or not ev:
                     return rc
-                elif config_input_match(ev, "exit") or not ev:
+                elif "exit" in matched or not ev:
                     return 0
             case schemas.MODE_HINT | schemas.MODE_HINT2:
                 if full_hint_mode(scr, mode == schemas.MODE_HINT2) < 2:
@@ -62,7 +68,10 @@ def mode_loop(scr, platform, initial_mode: int, oneshot: int, record_history: in
                 mode = schemas.MODE_NORMAL
                 ev = None
             case schemas.MODE_SMART_HINT:
-                ...
+                if smart_hint_mode(scr) < 0:
+                    return rc
+                ev = None
+                mode = schemas.MODE_NORMAL
 
         if oneshot and (
             initial_mode != schemas.MODE_NORMAL
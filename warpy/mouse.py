@@ -2,7 +2,8 @@ import ctypes
 from typing import Optional
 
 from warpy import lib
-from warpy.config import config_get_int, config_input_match
+from warpy.config import config_input_match, config_snapshot
+from warpy.input import input_lookup_name
 from warpy.platform import platform
 from warpy.schemas import InputEvent, Screen
 
@@ -40,12 +41,12 @@ class MouseController:
 
     def tonum(self, code: int) -> int:
         """Convert input code to number if it's a digit"""
-        name = platform.input_lookup_name(ctypes.c_uint8(code), ctypes.c_int(0))
+        name = input_lookup_name(code, 0)
         if not name:
             return -1
 
         try:
-            first_char = str(name)[0]
+            first_char = name[0]
             if first_char < "0" or first_char > "9":
                 return -1
             return ord(first_char) - ord("0")
@@ -204,13 +205,15 @@ class MouseController:
         # Get screen dimensions to calculate cursor size
         self.inc = 15
 
+        cfg = config_snapshot()
+
         # pixels/ms
-        self.cursor_size = (config_get_int("cursor_size") * self.sh) // 1080
-        self.v0 = config_get_int("speed") / 1000.0
-        self.vf = config_get_int("max_speed") / 1000.0
-        self.vd = config_get_int("decelerator_speed") / 1000.0
-        self.a0 = config_get_int("acceleration") / 1000000.0
-        self.a1 = config_get_int("accelerator_acceleration") / 1000000.0
+        self.cursor_size = (cfg.cursor_size * self.sh) // 1080
+        self.v0 = cfg.speed / 1000.0
+        self.vf = cfg.max_speed / 1000.0
+        self.vd = cfg.decelerator_speed / 1000.0
+        self.a0 = cfg.acceleration / 1000000.0
+        self.a1 = cfg.accelerator_acceleration / 1000000.0
         self.a = self.a0
 
 
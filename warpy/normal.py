@@ -5,10 +5,10 @@ from typing import Optional
 
 from warpy import lib, platform
 from warpy.config import (
-    config_get,
-    config_get_int,
+    config_input_classify,
     config_input_match,
-    config_input_whitelist,
+    config_input_whitelist_profile,
+    config_snapshot,
 )
 from warpy.histfile import histfile_add
 from warpy.history import hist_add, hist_get, hist_next, hist_prev
@@ -53,12 +53,13 @@ def redraw(scr, x: ctypes.c_int, y: ctypes.c_int, hide_cursor):
 
     platform.screen_get_dimensions(scr, ctypes.byref(sw), ctypes.byref(sh))
 
+    cfg = config_snapshot()
     gap = 10
-    indicator_size = int(config_get_int("indicator_size") * sh.value / 1080)
-    indicator_color = config_get("indicator_color")
-    curcol = config_get("cursor_color")
-    indicator = config_get("indicator")
-    cursz = config_get_int("cursor_size")
+    indicator_size = int(cfg.indicator_size * sh.value / 1080)
+    indicator_color = cfg.indicator_color
+    curcol = cfg.cursor_color
+    indicator = cfg.indicator
+    cursz = cfg.cursor_size
 
     platform.screen_clear(scr)
 
@@ -69,7 +70,7 @@ def redraw(scr, x: ctypes.c_int, y: ctypes.c_int, hide_cursor):
             ctypes.c_int(y.value - cursz // 2),
             ctypes.c_int(cursz),
             ctypes.c_int(cursz),
-            curcol.encode("utf-8"),
+            curcol,
         )
 
     indicator_positions = {
@@ -90,7 +91,7 @@ def redraw(scr, x: ctypes.c_int, y: ctypes.c_int, hide_cursor):
             ctypes.c_int(iy),
             ctypes.c_int(indicator_size),
             ctypes.c_int(indicator_size),
-            indicator_color.encode("utf-8"),
+            indicator_color,
         )
         platform.commit()
     logging.debug(f'\x1b[36m🔍Current pos: x, y = \x1b[32m{x.value, y.value}\x1b[0m')
@@ -102,13 +103,11 @@ def move(scr, x: ctypes.c_int, y: ctypes.c_int, hide_cursor):
 
 
 def normal_mode(scr, start_ev: Optional[InputEvent], oneshot: int) -> Optional[InputEvent]:
-    cursz = config_get_int("cursor_size")
-    system_cursor = config_get_int("normal_system_cursor")
-    blink_interval = config_get("normal_blink_interval")
+    cfg = config_snapshot()
+    cursz = cfg.cursor_size
+    system_cursor = cfg.normal_system_cursor
 
     ev = InputEvent(0, False, 0)
-    on_time = ctypes.c_int()
-    off_time = ctypes.c_int()
     sh = ctypes.c_int()
     sw = ctypes.c_int()
     mx = ctypes.c_int()
@@ -116,40 +115,7 @@ def normal_mode(scr, start_ev: Optional[InputEvent], oneshot: int) -> Optional[I
     dragging = False
     show_cursor = not system_cursor
 
-    blink_values = list(map(int, blink_interval.split()))
-    if len(blink_values) == 1:
-        on_time, off_time = blink_values[0], blink_values[0]
-    else:
-        on_time, off_time = blink_values
-
-    keys = [
-        "accelerator",
-        "bottom",
-        "buttons",
-        "copy_and_exit",
-        "decelerator",
-        "down",
-        "drag",
-        "end",
-        "exit",
-        "grid",
-        "hint",
-        "hint2",
-        "hist_back",
-        "hist_forward",
-        "history",
-        "left",
-        "middle",
-        "oneshot_buttons",
-        "print",
-        "right",
-        "screen",
-        "scroll_down",
-        "scroll_up",
-        "start",
-        "top",
-        "up",
-    ]
+    on_time, off_time = cfg.normal_blink_interval
 
     platform.input_grab_keyboard()
 
@@ -162,10 +128,11 @@ def normal_mode(scr, start_ev: Optional[InputEvent], oneshot: int) -> Optional[I
     mouse_reset(scr)
     redraw(scr, mx, my, not show_cursor)
 
+    config_input_whitelist_profile("normal")
+
     time = 0
     last_blink_update = 0
     while 1:
-        config_input_whitelist(keys, len(keys))
         if start_ev is None:
             ev = platform.input_next_event(ctypes.c_int(10))
 
@@ -201,7 +168,10 @@ def normal_mode(scr, start_ev: Optional[InputEvent], oneshot: int) -> Optional[I
 
         if not ev:
             continue
-        elif config_input_match(ev, "scroll_down"):
+
+        matched = config_input_classify(ev)
+
+        if "scroll_down" in matched:
             redraw(scr, mx, my, 1)
 
             if ev.pressed:
@@ -209,7 +179,7 @@ def normal_mode(scr, start_ev: Optional[InputEvent], oneshot: int) -> Optional[I
                 scroll_accelerate(SCROLL_DOWN)
             else:
                 scroll_decelerate()
-        elif config_input_match(ev, "scroll_up"):
+        elif "scroll_up" in matched:
             redraw(scr, mx, my, 1)
 
             if ev.pressed:
@@ -217,12 +187,12 @@ def normal_mode(scr, start_ev: Optional[InputEvent], oneshot: int) -> Optional[I
                 scroll_accelerate(SCROLL_UP)
             else:
                 scroll_decelerate()
-        elif config_input_match(ev, "accelerator"):
+        elif "accelerator" in matched:
             if ev.pressed:
                 mouse_fast()
             else:
                 mouse_normal()
-        elif config_input_match(ev, "decelerator"):
+        elif "decelerator" in matched:
             if ev.pressed:
                 mouse_slow()
             else:
@@ -231,17 +201,17 @@ def normal_mode(scr, start_ev: Optional[InputEvent], oneshot: int) -> Optional[I
             next(scr, mx, my)
             continue
 
-        if config_input_match(ev, "top"):
+        if "top" in matched:
             move(scr, mx, ctypes.c_int(cursz // 2), not show_cursor)
-        elif config_input_match(ev, "bottom"):
+        elif "bottom" in matched:
             move(scr, mx, ctypes.c_int(sh.value - cursz // 2), not show_cursor)
-        elif config_input_match(ev, "middle"):
+        elif "middle" in matched:
             move(scr, mx, ctypes.c_int(sh.value // 2), not show_cursor)
-        elif config_input_match(ev, "start"):
+        elif "start" in matched:
             move(scr, ctypes.c_int(1), my, not show_cursor)
-        elif config_input_match(ev, "end"):
+        elif "end" in matched:
             move(scr, ctypes.c_int(sw.value - cursz), my, not show_cursor)
-        elif config_input_match(ev, "hist_back"):
+        elif "hist_back" in matched:
             hist_add(mx.value, my.value)
             hist_prev()
             get, x, y = hist_get()
@@ -249,37 +219,37 @@ def normal_mode(scr, start_ev: Optional[InputEvent], oneshot: int) -> Optional[I
             my = ctypes.c_int(y)
 
             move(scr, mx, my, not show_cursor)
-        elif config_input_match(ev, "hist_forward"):
+        elif "hist_forward" in matched:
             hist_next()
             get, x, y = hist_get()
             mx = ctypes.c_int(x)
             my = ctypes.c_int(y)
 
             move(scr, mx, my, not show_cursor)
-        elif config_input_match(ev, "drag"):
+        elif "drag" in matched:
             dragging = not dragging
             if dragging:
-                platform.mouse_down(config_get_int("drag_button"))
+                platform.mouse_down(cfg.drag_button)
             else:
-                platform.mouse_up(config_get_int("drag_button"))
-        elif config_input_match(ev, "copy_and_exit"):
-            platform.mouse_up(config_get_int("drag_button"))
+                platform.mouse_up(cfg.drag_button)
+        elif "copy_and_exit" in matched:
+            platform.mouse_up(cfg.drag_button)
             platform.copy_selection()
             ev = None
             return exit(scr, ev)
         elif (
-            config_input_match(ev, "exit")
-            or config_input_match(ev, "grid")
-            or config_input_match(ev, "screen")
-            or config_input_match(ev, "history")
-            or config_input_match(ev, "hint2")
-            or config_input_match(ev, "hint")
+            "exit" in matched
+            or "grid" in matched
+            or "screen" in matched
+            or "history" in matched
+            or "hint2" in matched
+            or "hint" in matched
         ):
             return exit(scr, ev)
-        elif config_input_match(ev, "print"):
+        elif "print" in matched:
             print("%d %d %s\n", mx, my, lib.input_event_tostr(ev))
         else:
-            if btn:=config_input_match(ev, "buttons"):
+            if btn := matched.get("buttons", 0):
                 if oneshot:
                     print("%d %d\n", mx, my)
                     sys.exit(btn)
@@ -287,11 +257,11 @@ def normal_mode(scr, start_ev: Optional[InputEvent], oneshot: int) -> Optional[I
                 hist_add(mx.value, my.value)
                 histfile_add(mx.value, my.value)
                 platform.mouse_click(btn)
-            elif btn:=config_input_match(ev, "oneshot_buttons"):
+            elif btn := matched.get("oneshot_buttons", 0):
                 hist_add(mx.value, my.value)
                 platform.mouse_click(btn)
 
-                timeout = config_get_int("oneshot_timeout")
+                timeout = cfg.oneshot_timeout
 
                 while 1:
                     ev = platform.input_next_event(timeout)
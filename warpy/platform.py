@@ -10,15 +10,24 @@ PLATFORM_MOD_META = 4
 PLATFORM_MOD_ALT = 8
 
 
-x_init = lib.x_init
-x_init.argtypes = [ctypes.POINTER(Platform)]
-x_init.restype = None
-
 platform = Platform()
 platform.input_next_event.restype = ctypes.POINTER(InputEvent)
 
 
-def platform_run(main):
+def platform_run(main, threads: bool = False):
     global platform
-    x_init(ctypes.byref(platform))
+    if threads:
+        # For the vision smart hint provider, which captures the screen from
+        # a worker thread (over its own connection) while the main thread
+        # uses the platform's. Must precede every other Xlib call.
+        ctypes.CDLL("libX11.so.6").XInitThreads()
+    lib.x_init(ctypes.byref(platform))
     exit(main(platform))
+
+
+def get_pointer_screen():
+    """The screen under the pointer."""
+    # Filled in by mouse_get_position; screen 0 is only its starting value
+    scr = lib.get_screen(0)
+    platform.mouse_get_position(ctypes.byref(scr), None, None)
+    return scr
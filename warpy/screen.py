@@ -2,15 +2,11 @@ import ctypes
 
 from warpy import lib, platform
 from warpy.input import input_event_tostr
-from warpy.schemas import Hint, Screen
+from warpy.schemas import Hint
 
 screen_chars = "jkl;asdfg"
 
 
-lib.get_screen.argtypes = [ctypes.c_int]
-lib.get_screen.restype = ctypes.POINTER(Screen)
-
-
 def screen_selection_mode():
     # Draw hints on screens
     n_screens = lib.get_nr_screens()
@@ -3,6 +3,7 @@ import sys
 import time
 
 from warpy import platform
+from warpy.config import config_snapshot
 
 SCROLL_DOWN = 1
 SCROLL_RIGHT = 2
@@ -25,11 +26,11 @@ class ScrollManager:
         # Determine factor based on platform
         self.factor = 1 if sys.platform == "darwin" else 50
 
-        # Load configuration
-        self.vt = self._get_config_float("scroll_max_speed")  # terminal velocity
-        self.v0 = self._get_config_float("scroll_speed")  # initial velocity
-        self.da0 = self._get_config_float("scroll_deceleration")  # deceleration
-        self.a0 = self._get_config_float("scroll_acceleration")  # acceleration
+        # Physics constants, loaded from the config by init()
+        self.vt = 0.0  # terminal velocity
+        self.v0 = 0.0  # initial velocity
+        self.da0 = 0.0  # deceleration
+        self.a0 = 0.0  # acceleration
         self.fling_velocity = 2000.0 / self.factor
 
         # State variables
@@ -40,16 +41,16 @@ class ScrollManager:
         self.direction = 0  # scroll direction
         self.traveled = 0  # scroll units emitted
 
+    def init(self) -> None:
+        """Load the scroll physics constants from the config."""
+        self.vt = self._get_config_float("scroll_max_speed")
+        self.v0 = self._get_config_float("scroll_speed")
+        self.da0 = self._get_config_float("scroll_deceleration")
+        self.a0 = self._get_config_float("scroll_acceleration")
+
     def _get_config_float(self, key: str) -> float:
         """Get configuration value as float adjusted by factor."""
-        # This would be replaced with actual config mechanism
-        config_values = {
-            "scroll_max_speed": 1000,
-            "scroll_speed": 100,
-            "scroll_deceleration": -500,
-            "scroll_acceleration": 500,
-        }
-        return float(config_values.get(key, 0)) / self.factor
+        return float(getattr(config_snapshot(), key)) / self.factor
 
     def _get_time_ms(self) -> int:
         """Get current time in milliseconds."""
@@ -128,6 +129,11 @@ _scroll_manager = ScrollManager(platform)
 
 
 # Original API functions as thin wrappers
+def init_scroll() -> None:
+    """Load scroll physics from the config."""
+    _scroll_manager.init()
+
+
 def scroll_tick() -> None:
     """Process scroll physics and emit scroll events."""
     _scroll_manager.tick()
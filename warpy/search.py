@@ -0,0 +1,120 @@
+import heapq
+import math
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Optional, Sequence
+
+# A name containing fewer than this share of a query's trigrams is not a
+# fuzzy match
+FUZZY_MIN_SHARE = 0.6
+
+
+def ngrams(s: str, n: int) -> set[str]:
+    return {s[i : i + n] for i in range(len(s) - n + 1)}
+
+
+def rank(
+    names: Sequence[str], query: str, ids, limit: Optional[int] = None
+) -> list[int]:
+    """
+    The (first limit) ids whose name contains query: names starting with it
+    first, then those with a word starting with it, earlier and shorter
+    names first.
+    """
+    # Packed into one int per match, which sorts far faster than tuples
+    keys = []
+    for i in ids:
+        name = names[i]
+        pos = name.find(query)
+        if pos < 0:
+            continue
+
+        if pos == 0:
+            kind = 0
+        elif not name[pos - 1].isalnum():
+            kind = 1
+        else:
+            kind = 2
+        keys.append((((kind << 16 | pos) << 16 | len(name)) << 32) | i)
+
+    keys = sorted(keys) if limit is None else heapq.nsmallest(limit, keys)
+    return [key & 0xFFFFFFFF for key in keys]
+
+
+def fuzzy(
+    names: Sequence[str], text: str, starts: Sequence[int], query: str, limit=None
+) -> list[int]:
+    """
+    Ids of the names containing most of the trigrams of query, best first.
+    text is the names joined by newlines, and starts the offset of each.
+    """
+    grams = ngrams(query, 3)
+    if not grams:
+        return []
+
+    # A match contains all but `spare` of the trigrams, so at least one of
+    # any spare + 1 of them: only names with one of the rarest are counted
+    need = math.ceil(FUZZY_MIN_SHARE * len(grams))
+    spare = len(grams) - need
+    rare = sorted(grams, key=text.count)[: spare + 1]
+
+    candidates = set()
+    for gram in rare:
+        pos = text.find(gram)
+        while pos >= 0:
+            candidates.add(bisect_right(starts, pos) - 1)
+            pos = text.find(gram, pos + 1)
+
+    ranked = []
+    for i in candidates:
+        name = names[i]
+        count = sum(gram in name for gram in grams)
+        if count >= need:
+            ranked.append((-count, len(name), i))
+
+    ranked.sort()
+    return [r[-1] for r in ranked[:limit]]
+
+
+class HintSearch:
+    """
+    Incremental search over the names of a session's hints. A query that
+    extends the previous one only looks at the previous matches.
+
+    Names are scanned with substring tests, which run at C speed: for the
+    few thousand elements of a window that is well within a frame, and an
+    index would cost more to build than it saves. Fuzzy matching only
+    counts trigrams in the names that contain one of the query's rarest.
+    """
+
+    def __init__(self, hints: Sequence):
+        self.hints = list(hints)
+        self.names = [h.name.lower() for h in self.hints]
+        self.text = "\n".join(self.names)
+        self.starts = list(accumulate((len(n) + 1 for n in self.names), initial=0))
+        self.last_query: Optional[str] = None
+        self.last_matches: Optional[list[int]] = None
+
+    def search(self, query: str, limit: Optional[int] = None) -> list:
+        """The (first limit) hints matching query, best first."""
+        query = query.lower()
+        if not query:
+            self.last_query = self.last_matches = None
+            return self.hints[:limit]
+
+        names = self.names
+        if self.last_matches is not None and query.startswith(self.last_query):
+            matches = [i for i in self.last_matches if query in names[i]]
+        else:
+            matches = [i for i, name in enumerate(names) if query in name]
+
+        # Every match is kept for narrowing, whatever the limit
+        ids = rank(names, query, matches, limit)
+        if ids:
+            self.last_query, self.last_matches = query, matches
+        else:
+            # Fuzzy matches don't narrow monotonically, so don't build on them
+            self.last_query = self.last_matches = None
+            ids = fuzzy(names, self.text, self.starts, query, limit)
+
+        return [self.hints[i] for i in ids]
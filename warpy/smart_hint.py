@@ -0,0 +1,723 @@
+import ctypes
+import logging
+import select
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from warpy.config import config_snapshot
+from warpy.element_cache import ElementCache
+from warpy.histfile import get_data_path
+from warpy.hint import _hint_manager, element_targets, full_hint_mode, place_hints
+from warpy.platform import platform
+
+MAX_CACHED_WINDOWS = 32
+MAX_ELEMENTS = 4096
+MAX_DEPTH = 16
+# Seconds between the focus watcher's checks for being stopped while no X
+# events arrive
+STOP_CHECK = 0.2
+
+Geometry = tuple[int, int, int, int]  # x, y, w, h in root coordinates
+
+
+class Element(NamedTuple):
+    """A clickable element in root window coordinates."""
+
+    x: int
+    y: int
+    w: int
+    h: int
+    name: str = ""
+
+
+class ElementProvider(ABC):
+    """
+    Source of the clickable elements of a window. Providers are called from
+    worker threads and serialise their own scans. Looking up the active
+    window and its geometry should not wait for a scan in progress, as smart
+    hint mode does that before it can show anything.
+    """
+
+    name = ""
+
+    def available(self) -> bool:
+        return True
+
+    def active_window(self) -> Optional[int]:
+        """Id of the focused top level window, if this provider can tell."""
+        return None
+
+    def window_geometry(self, window: Optional[int]) -> Optional[Geometry]:
+        """Position and size of window, if this provider can tell."""
+        return None
+
+    def window_class(self, window: Optional[int]) -> Optional[str]:
+        """The application class of window, if this provider can tell."""
+        return None
+
+    @abstractmethod
+    def elements(self, window: Optional[int]) -> Optional[List[Element]]:
+        """The elements of window, None if this provider cannot scan it."""
+
+
+PROVIDERS: Dict[str, type] = {}
+
+
+def register_provider(cls):
+    """Make a provider selectable by name in smart_hint_providers."""
+    PROVIDERS[cls.name] = cls
+    return cls
+
+
+@register_provider
+class XTreeProvider(ElementProvider):
+    """Mapped child windows of the active window, via python-xlib."""
+
+    name = "xtree"
+
+    def __init__(self):
+        self.display = None
+        self.lock = threading.Lock()
+        # Window lookups get a connection of their own, so they never wait
+        # for a scan of a large tree
+        self.meta_display = None
+        self.meta_lock = threading.Lock()
+
+    def available(self) -> bool:
+        try:
+            import Xlib.display  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _display(self):
+        if self.display is None:
+            from Xlib import display
+
+            self.display = display.Display()
+        return self.display
+
+    def _meta_display(self):
+        if self.meta_display is None:
+            from Xlib import display
+
+            self.meta_display = display.Display()
+        return self.meta_display
+
+    def active_window(self) -> Optional[int]:
+        from Xlib import X
+
+        with self.meta_lock:
+            d = self._meta_display()
+            prop = d.screen().root.get_full_property(
+                d.intern_atom("_NET_ACTIVE_WINDOW"), X.AnyPropertyType
+            )
+        return prop.value[0] if prop and len(prop.value) else None
+
+    def window_geometry(self, window: Optional[int]) -> Optional[Geometry]:
+        if not window:
+            return None
+
+        with self.meta_lock:
+            d = self._meta_display()
+            win = d.create_resource_object("window", window)
+            g = win.get_geometry()
+            pos = d.screen().root.translate_coords(win, 0, 0)
+        return pos.x, pos.y, g.width, g.height
+
+    def window_class(self, window: Optional[int]) -> Optional[str]:
+        if not window:
+            return None
+
+        with self.meta_lock:
+            win = self._meta_display().create_resource_object("window", window)
+            wm_class = win.get_wm_class()
+        return wm_class[1] if wm_class else None
+
+    def elements(self, window: Optional[int]) -> Optional[List[Element]]:
+        from Xlib import X
+
+        if not window:
+            return None
+
+        with self.lock:
+            d = self._display()
+            root = d.screen().root
+            elements = []
+            stack = [(d.create_resource_object("window", window), 0)]
+
+            while stack and len(elements) < MAX_ELEMENTS:
+                win, depth = stack.pop()
+                for child in win.query_tree().children:
+                    attrs = child.get_attributes()
+                    if attrs.map_state != X.IsViewable:
+                        continue
+                    if attrs.win_class != X.InputOutput:
+                        continue
+
+                    g = child.get_geometry()
+                    pos = root.translate_coords(child, 0, 0)
+                    name = child.get_wm_name() or ""
+                    elements.append(Element(pos.x, pos.y, g.width, g.height, name))
+
+                    if depth < MAX_DEPTH:
+                        stack.append((child, depth + 1))
+
+        return elements
+
+
+@register_provider
+class AccessibilityProvider(ElementProvider):
+    """Actionable objects of the active frame in the AT-SPI tree, via pyatspi."""
+
+    name = "atspi"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def available(self) -> bool:
+        try:
+            import pyatspi  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _active_frame(self):
+        import pyatspi
+
+        for app in pyatspi.Registry.getDesktop(0):
+            for frame in app or ():
+                if frame and frame.getState().contains(pyatspi.STATE_ACTIVE):
+                    return frame
+        return None
+
+    def elements(self, window: Optional[int]) -> Optional[List[Element]]:
+        with self.lock:
+            return self._scan()
+
+    def _scan(self) -> List[Element]:
+        import pyatspi
+
+        frame = self._active_frame()
+        if frame is None:
+            return []
+
+        elements = []
+        stack = [(frame, 0)]
+        while stack and len(elements) < MAX_ELEMENTS:
+            obj, depth = stack.pop()
+            state = obj.getState()
+            if not state.contains(pyatspi.STATE_SHOWING):
+                continue
+
+            interfaces = obj.get_interfaces()
+            if "Action" in interfaces and "Component" in interfaces:
+                if obj.queryAction().nActions > 0:
+                    x, y, w, h = obj.queryComponent().getExtents(pyatspi.DESKTOP_COORDS)
+                    if w > 0 and h > 0:
+                        elements.append(Element(x, y, w, h, obj.name or ""))
+
+            if depth < MAX_DEPTH:
+                stack.extend((child, depth + 1) for child in obj if child)
+
+        return elements
+
+
+@register_provider
+class VisionProvider(ElementProvider):
+    """
+    Likely click targets found in a capture of the screens (see
+    warpy.vision), for toolkits without accessibility support. Needs numpy
+    and an X server with MIT-SHM.
+    """
+
+    name = "vision"
+
+    def __init__(self):
+        self.captures: dict = {}  # screen index -> ShmCapture
+        self.lock = threading.Lock()
+
+    def available(self) -> bool:
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def elements(self, window: Optional[int]) -> Optional[List[Element]]:
+        from warpy.capture import ShmCapture
+        from warpy.lib import lib
+        from warpy.vision import detect_hints
+
+        elements = []
+        with self.lock:
+            for i in range(lib.get_nr_screens()):
+                scr = lib.get_screen(i)
+                if i not in self.captures:
+                    self.captures[i] = ShmCapture(scr)
+
+                frame = self.captures[i].capture()
+                for h in detect_hints(frame, scr.contents.x, scr.contents.y):
+                    elements.append(Element(h.x, h.y, h.w, h.h))
+
+        return elements
+
+
+class SmartHintPipeline:
+    """
+    Runs the providers concurrently for the active window. Whatever has not
+    finished within the budget is left running and its results land in the
+    cache for the next activation. The cache is keyed by window and window
+    geometry, so a moved or resized window is scanned afresh.
+
+    With a store, results are also kept across runs per application (see
+    ElementCache), and a window seen for the first time can be served the
+    layout last seen in another window of the same class and size.
+    """
+
+    def __init__(
+        self, providers: Iterable[ElementProvider], store: Optional[ElementCache] = None
+    ):
+        self.providers = [p for p in providers if p.available()]
+        self.store = store
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(len(self.providers), 1), thread_name_prefix="smart-hint"
+        )
+        # (provider, window, geometry) -> elements, and the scans under way
+        self.cache: OrderedDict = OrderedDict()
+        self.pending: dict = {}
+        # window -> class, looked up before the window is first scanned
+        self.classes: OrderedDict = OrderedDict()
+        # Reentrant: a future that is already done runs its callback in submit
+        self.lock = threading.RLock()
+        self.focused: Optional[tuple] = None  # (window, geometry) last prefetched
+
+    def active_window(self) -> Optional[int]:
+        for provider in self.providers:
+            try:
+                window = provider.active_window()
+            except Exception as e:
+                logging.debug(f"{provider.name}: active window: {e}")
+                continue
+            if window is not None:
+                return window
+        return None
+
+    def window_geometry(self, window: Optional[int]) -> Optional[Geometry]:
+        for provider in self.providers:
+            try:
+                geometry = provider.window_geometry(window)
+            except Exception as e:
+                logging.debug(f"{provider.name}: window geometry: {e}")
+                continue
+            if geometry is not None:
+                return tuple(geometry)
+        return None
+
+    def window_class(self, window: Optional[int]) -> Optional[str]:
+        for provider in self.providers:
+            try:
+                wm_class = provider.window_class(window)
+            except Exception as e:
+                logging.debug(f"{provider.name}: window class: {e}")
+                continue
+            if wm_class:
+                return wm_class
+        return None
+
+    def focus(self) -> tuple:
+        """(window, geometry) of the active window."""
+        window = self.active_window()
+        return window, self.window_geometry(window) if window is not None else None
+
+    def _store(self, key, future) -> None:
+        with self.lock:
+            self.pending.pop(key, None)
+            try:
+                elements = future.result()
+            except Exception as e:
+                logging.debug(f"{key[0].name}: {e}")
+                return
+            if elements is None:
+                return
+
+            self.cache[key] = elements
+            self.cache.move_to_end(key)
+            while len(self.cache) > MAX_CACHED_WINDOWS * max(len(self.providers), 1):
+                self.cache.popitem(last=False)
+
+        provider, window, geometry = key
+        layout = self._layout_key(provider, window, geometry)
+        if layout:
+            gx, gy = geometry[:2]
+            self.store.put(
+                layout, [(e.x - gx, e.y - gy, e.w, e.h, e.name) for e in elements]
+            )
+
+    def _layout_key(self, provider, window, geometry) -> Optional[tuple]:
+        if self.store is None or window is None or geometry is None:
+            return None
+
+        # Never asks the providers, which may be busy scanning
+        with self.lock:
+            wm_class = self.classes.get(window)
+        return (provider.name, wm_class, geometry[2], geometry[3]) if wm_class else None
+
+    def _learn_class(self, window: Optional[int]) -> None:
+        """Look up the class of window for _layout_key, before it is scanned."""
+        if self.store is None or window is None:
+            return
+
+        with self.lock:
+            if window in self.classes:
+                self.classes.move_to_end(window)
+                return
+
+        # Providers serialise their calls, so this is done before submitting
+        # the scans that would otherwise hold it up
+        wm_class = self.window_class(window)
+        if wm_class is None:
+            return
+
+        with self.lock:
+            self.classes[window] = wm_class
+            while len(self.classes) > MAX_CACHED_WINDOWS:
+                self.classes.popitem(last=False)
+
+    def submit(
+        self, window: Optional[int], geometry: Optional[Geometry] = None
+    ) -> list:
+        """Start every provider on window unless one is already running on it."""
+        self._learn_class(window)
+
+        futures = []
+        with self.lock:
+            for provider in self.providers:
+                key = (provider, window, geometry)
+                future = self.pending.get(key)
+                if future is None:
+                    future = self.executor.submit(provider.elements, window)
+                    self.pending[key] = future
+                    future.add_done_callback(lambda f, key=key: self._store(key, f))
+                futures.append(future)
+        return futures
+
+    def cached(
+        self, window: Optional[int], geometry: Optional[Geometry] = None
+    ) -> Optional[List[Element]]:
+        """The last known elements of window, None if there are none."""
+        found = False
+        elements = []
+        with self.lock:
+            for provider in self.providers:
+                cached = self.cache.get((provider, window, geometry))
+                if cached is not None:
+                    found = True
+                    elements += cached
+
+        return elements if found else None
+
+    def recall(
+        self, window: Optional[int], geometry: Optional[Geometry]
+    ) -> Optional[List[Element]]:
+        """The elements last stored for the class and size of window, if any."""
+        found = False
+        elements = []
+        for provider in self.providers:
+            layout = self._layout_key(provider, window, geometry)
+            stored = self.store.get(layout) if layout else None
+            if stored is not None:
+                found = True
+                gx, gy = geometry[:2]
+                elements += [
+                    Element(x + gx, y + gy, w, h, name) for x, y, w, h, name in stored
+                ]
+
+        return elements if found else None
+
+    def collect(
+        self, window: Optional[int], geometry: Optional[Geometry], budget: float
+    ) -> Optional[List[Element]]:
+        """
+        The elements of window. Known (e.g. prefetched) elements are returned
+        at once while a fresh scan refreshes them in the background, otherwise
+        this waits at most budget seconds for one. Falls back to the cached
+        results of providers that did not finish, and returns None when
+        nothing is known about the window.
+
+        Without a window, nothing can tell one scan from the next, so the
+        providers are waited for and their results are neither cached nor
+        recalled.
+        """
+        if window is None:
+            return self.scan(budget)
+
+        futures = self.submit(window, geometry)
+
+        elements = self.cached(window, geometry)
+        if elements is None:
+            elements = self.recall(window, geometry)
+        if elements is not None:
+            return elements
+
+        return self._finished(futures, budget)
+
+    def scan(self, budget: float) -> Optional[List[Element]]:
+        """The elements the providers find within budget seconds, uncached."""
+        futures = [self.executor.submit(p.elements, None) for p in self.providers]
+        return self._finished(futures, budget)
+
+    def _finished(self, futures: list, budget: float) -> Optional[List[Element]]:
+        """
+        The elements of the scans done within budget seconds, None if none
+        of them could tell. Read from the futures, which complete before
+        their results are cached.
+        """
+        done, _ = wait(futures, timeout=budget)
+
+        found = False
+        elements = []
+        for future in futures:
+            if future not in done or future.exception() is not None:
+                continue
+            if future.result() is not None:
+                found = True
+                elements += future.result()
+
+        return elements if found else None
+
+    def prefetch(self) -> None:
+        """Start scanning the active window if it changed since the last call."""
+        focused = self.focus()
+        if focused == self.focused:
+            return
+
+        self.focused = focused
+        if focused[0] is not None:
+            self.submit(*focused)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pipeline: Optional[SmartHintPipeline] = None
+_pipeline_names: Optional[str] = None
+# The focus watcher looks the pipeline up from its own thread
+_pipeline_lock = threading.Lock()
+
+
+def use_providers(
+    providers: Iterable[ElementProvider], store: Optional[ElementCache] = None
+) -> SmartHintPipeline:
+    """Replace the configured providers, e.g. with test doubles."""
+    with _pipeline_lock:
+        return _use_providers(providers, store)
+
+
+def _use_providers(
+    providers: Iterable[ElementProvider], store: Optional[ElementCache] = None
+) -> SmartHintPipeline:
+    global _pipeline, _pipeline_names
+
+    if _pipeline:
+        _pipeline.close()
+    _pipeline = SmartHintPipeline(providers, store)
+    _pipeline_names = None
+    return _pipeline
+
+
+def smart_hint_pipeline() -> SmartHintPipeline:
+    """The pipeline for the providers named in smart_hint_providers."""
+    global _pipeline, _pipeline_names
+
+    # A pipeline set up with use_providers is kept until replaced
+    names = config_snapshot().smart_hint_providers
+    with _pipeline_lock:
+        stale = _pipeline_names is not None and names != _pipeline_names
+        if _pipeline is None or stale:
+            # The names were checked when the config was parsed
+            providers = [PROVIDERS[name]() for name in names.split()]
+            _use_providers(providers, ElementCache(get_data_path("smart_hint.cache")))
+            _pipeline_names = names
+
+        return _pipeline
+
+
+class FocusWatcher(threading.Thread):
+    """
+    Prefetches the elements of each newly focused (or moved) window, so
+    smart hint mode can draw them as soon as it is activated.
+
+    With python-xlib, it sleeps until the root window's _NET_ACTIVE_WINDOW
+    or the active window's geometry changes, and then handles at most one
+    burst of changes every smart_hint_prefetch milliseconds. Without it, it
+    polls at that interval. It stops within STOP_CHECK seconds of stop() or
+    of smart_hint_prefetch being set to 0.
+    """
+
+    def __init__(self):
+        super().__init__(name="warpd-focus", daemon=True)
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            self.listen()
+        except Exception as e:
+            # No python-xlib, or no display for it
+            logging.debug(f"focus watcher: {e}, polling instead")
+            self.poll()
+        finally:
+            _watcher_stopped(self)
+
+    def running(self) -> bool:
+        return not self.stopped.is_set() and config_snapshot().smart_hint_prefetch > 0
+
+    def prefetch(self) -> bool:
+        """Prefetch the active window, False once prefetching is turned off."""
+        if not self.running():
+            return False
+
+        try:
+            smart_hint_pipeline().prefetch()
+        except Exception as e:
+            logging.debug(f"smart hint prefetch: {e}")
+        return True
+
+    def interval(self) -> float:
+        return max(config_snapshot().smart_hint_prefetch, 0) / 1000
+
+    def listen(self) -> None:
+        from Xlib import display
+
+        d = display.Display()
+        try:
+            self._listen(d)
+        finally:
+            d.close()
+
+    def _listen(self, d) -> None:
+        from Xlib import X, error
+
+        root = d.screen().root
+        active = d.intern_atom("_NET_ACTIVE_WINDOW")
+        root.change_attributes(event_mask=X.PropertyChangeMask)
+        d.flush()
+
+        window = None
+        while self.prefetch():
+            # Follow moves and resizes of the active window too
+            focused = smart_hint_pipeline().focused
+            if focused and focused[0] and focused[0] != window:
+                window = focused[0]
+                d.create_resource_object("window", window).change_attributes(
+                    event_mask=X.StructureNotifyMask,
+                    onerror=error.CatchError(error.BadWindow),
+                )
+                d.flush()
+
+            while True:
+                # Waits on the socket rather than in next_event(), which
+                # would only notice stop() once some event arrived
+                while not d.pending_events():
+                    if not self.running():
+                        return
+                    select.select([d], [], [], STOP_CHECK)
+
+                ev = d.next_event()
+                if ev.type == X.PropertyNotify and ev.atom == active:
+                    break
+                if ev.type == X.ConfigureNotify and ev.window.id == window:
+                    break
+
+            # Let the burst (e.g. a window being dragged) settle, then
+            # drop what is left of it
+            if self.stopped.wait(self.interval()):
+                return
+            while d.pending_events():
+                d.next_event()
+
+    def poll(self) -> None:
+        while self.prefetch():
+            if self.stopped.wait(self.interval()):
+                return
+
+    def stop(self):
+        self.stopped.set()
+
+
+_watcher: Optional[FocusWatcher] = None
+_watcher_lock = threading.Lock()
+_prefetch_enabled = False
+
+
+def enable_prefetch() -> None:
+    """
+    Prefetch elements in the background once smart hint mode is first used.
+    Only worthwhile in the daemon, whose later activations benefit.
+    """
+    global _prefetch_enabled
+    _prefetch_enabled = True
+
+
+def start_focus_watcher() -> Optional[FocusWatcher]:
+    """Start the FocusWatcher unless it is running or prefetching is off."""
+    global _watcher
+
+    if config_snapshot().smart_hint_prefetch <= 0:
+        return None
+
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = FocusWatcher()
+            _watcher.start()
+        return _watcher
+
+
+def _watcher_stopped(watcher: FocusWatcher) -> None:
+    global _watcher
+
+    with _watcher_lock:
+        if _watcher is watcher:
+            _watcher = None
+
+
+def smart_hint_mode(scr) -> int:
+    """Hint the clickable elements of the active window, or the whole screen."""
+    cfg = config_snapshot()
+    pipeline = smart_hint_pipeline()
+    if _prefetch_enabled:
+        start_focus_watcher()
+
+    elements = pipeline.collect(*pipeline.focus(), cfg.smart_hint_timeout / 1000)
+
+    if not elements:
+        return full_hint_mode(scr, 0)
+
+    mx = ctypes.c_int()
+    my = ctypes.c_int()
+    sw = ctypes.c_int()
+    sh = ctypes.c_int()
+
+    platform.mouse_get_position(ctypes.byref(scr), ctypes.byref(mx), ctypes.byref(my))
+    w, h = _hint_manager.get_hint_size(scr, sw, sh)
+
+    # Elements are in root coordinates, hints in those of the screen
+    ox, oy = scr.contents.x, scr.contents.y
+    elements = [
+        e
+        for e in elements
+        if 0 <= e.x + e.w // 2 - ox < sw.value and 0 <= e.y + e.h // 2 - oy < sh.value
+    ]
+    if not elements:
+        return full_hint_mode(scr, 0)
+
+    rects = [(e.x - ox, e.y - oy, e.w, e.h) for e in elements]
+    names = [e.name for e in elements]
+    targets = element_targets(rects, w, h, (mx.value, my.value), names)
+    hints = place_hints(targets, cfg.hint_chars)
+
+    # Search looks through every element, including those culled here
+    return _hint_manager.hint_selection(scr, hints, len(hints), targets=targets)
@@ -0,0 +1,148 @@
+from collections import defaultdict
+from typing import Any, Optional
+
+Rect = tuple[int, int, int, int]  # x, y, w, h
+
+
+class SpatialIndex:
+    """
+    Grid-bucket index over (x, y, w, h) rectangles. Each rectangle is listed
+    in every cell it touches, so queries only visit the cells around them.
+    The cell size should be close to the typical rectangle size.
+    """
+
+    def __init__(self, cell: int = 64):
+        self.cell = max(cell, 1)
+        self.rects: list[Rect] = []
+        self.items: list[Any] = []
+        self.buckets: defaultdict = defaultdict(list)
+        self._bounds: Optional[tuple[int, int, int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def _cells(self, x: int, y: int, w: int, h: int):
+        c = self.cell
+        return (
+            range(x // c, (x + max(w, 1) - 1) // c + 1),
+            range(y // c, (y + max(h, 1) - 1) // c + 1),
+        )
+
+    def insert(self, rect: Rect, item: Any = None) -> int:
+        """Add rect (with an optional payload), returning its id."""
+        i = len(self.rects)
+        self.rects.append(rect)
+        self.items.append(item)
+
+        cols, rows = self._cells(*rect)
+        buckets = self.buckets
+        for cx in cols:
+            for cy in rows:
+                buckets[(cx, cy)].append(i)
+
+        self._bounds = None
+        return i
+
+    def bounds(self) -> Optional[tuple[int, int, int, int]]:
+        """(x0, y0, x1, y1) of the occupied cells, None when empty."""
+        # Worked out on demand, as culling inserts far more than it queries
+        if self._bounds is None and self.buckets:
+            xs = [cx for cx, _ in self.buckets]
+            ys = [cy for _, cy in self.buckets]
+            self._bounds = min(xs), min(ys), max(xs), max(ys)
+        return self._bounds
+
+    def overlap_areas(self, rect: Rect) -> list[tuple[int, int]]:
+        """(id, shared area) of the rectangles intersecting rect."""
+        found = set()
+        cols, rows = self._cells(*rect)
+        for cx in cols:
+            for cy in rows:
+                found.update(self.buckets.get((cx, cy), ()))
+
+        areas = []
+        for i in sorted(found):
+            area = intersection(self.rects[i], rect)
+            if area:
+                areas.append((i, area))
+        return areas
+
+    def covered(self, rect: Rect, limit: int) -> bool:
+        """Whether rect shares more than limit area with any one rectangle."""
+        x, y, w, h = rect
+        c = self.cell
+        x1, y1 = x + w, y + h
+        get = self.buckets.get
+        rects = self.rects
+
+        # Unlike overlap_areas this stops at the first hit, and a rectangle
+        # seen in several cells needs no deduplicating
+        for cx in range(x // c, (x1 - 1) // c + 1):
+            for cy in range(y // c, (y1 - 1) // c + 1):
+                for i in get((cx, cy), ()):
+                    rx, ry, rw, rh = rects[i]
+                    iw = min(rx + rw, x1) - max(rx, x)
+                    ih = min(ry + rh, y1) - max(ry, y)
+                    if iw > 0 and ih > 0 and iw * ih > limit:
+                        return True
+        return False
+
+    def region(self, x: int, y: int, w: int, h: int) -> list[int]:
+        """Ids of the rectangles intersecting the given one."""
+        return [i for i, _ in self.overlap_areas((x, y, w, h))]
+
+    def overlaps(self, i: int) -> list[int]:
+        """Ids of the other rectangles intersecting rectangle i."""
+        return [j for j in self.region(*self.rects[i]) if j != i]
+
+    def nearest(self, x: int, y: int) -> Optional[int]:
+        """Id of the rectangle closest to (x, y), 0 being inside it."""
+        bounds = self.bounds()
+        if bounds is None:
+            return None
+
+        c = self.cell
+        px, py = x // c, y // c
+        x0, y0, x1, y1 = bounds
+        reach = max(px - x0, x1 - px, py - y0, y1 - py)
+
+        best, best_d = None, None
+        for r in range(reach + 1):
+            for cell in _ring(px, py, r):
+                for i in self.buckets.get(cell, ()):
+                    d = distance2(self.rects[i], x, y)
+                    if best_d is None or d < best_d or (d == best_d and i < best):
+                        best, best_d = i, d
+
+            # Rectangles first seen further out are at least r cells away
+            if best_d is not None and best_d <= (r * c) ** 2:
+                break
+
+        return best
+
+
+def _ring(cx: int, cy: int, r: int):
+    if r == 0:
+        yield cx, cy
+        return
+
+    for x in range(cx - r, cx + r + 1):
+        yield x, cy - r
+        yield x, cy + r
+    for y in range(cy - r + 1, cy + r):
+        yield cx - r, y
+        yield cx + r, y
+
+
+def intersection(a: Rect, b: Rect) -> int:
+    """Area shared by two rectangles."""
+    w = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    h = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    return w * h if w > 0 and h > 0 else 0
+
+
+def distance2(rect: Rect, x: int, y: int) -> int:
+    """Squared distance from (x, y) to rect."""
+    dx = max(rect[0] - x, 0, x - (rect[0] + rect[2]))
+    dy = max(rect[1] - y, 0, y - (rect[1] + rect[3]))
+    return dx * dx + dy * dy
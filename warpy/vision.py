@@ -0,0 +1,214 @@
+import numpy as np
+
+from warpy.schemas import Hint
+
+# Clickable-region detection from a captured screen (see capture.ShmCapture),
+# with NumPy alone:
+#
+#   1. an edge map of luminance steps, pooled into CELL x CELL cells, less
+#      the long straight lines of separators and frames
+#   2. connected components of the edge cells, found from their row runs
+#   3. dropping components too small or too large to be click targets,
+#      merging those (e.g. a button's border and its label) that touch, and
+#      fitting the boxes to the edges they contain
+
+CELL = 4  # edge_cells relies on this being 4
+
+# Step between neighbouring pixels, in summed B + G + R (0-765), that counts
+# as an edge. Gradients and compression noise stay well below it.
+EDGE_THRESHOLD = 30
+
+# Targets are at least MIN_SIDE pixels on each side and at most the given
+# share of the screen's width and height (anything larger is a panel or
+# window frame, whose contents are found separately)
+MIN_SIDE = 8
+MAX_WIDTH_SHARE = 0.5
+MAX_HEIGHT_SHARE = 0.25
+
+# Straight runs of edge cells at least this long (pixels) are lines, not
+# parts of targets
+LINE_LENGTH = 320
+
+# Boxes closer than this (pixels) are merged, which joins the words of a
+# label: box edges fall on cell boundaries, so this bridges one empty cell
+MERGE_GAP = 8
+
+
+def edge_map(frame: np.ndarray) -> np.ndarray:
+    """
+    Pixels of a (h, w, >=3) BGR(X) frame differing from their left or upper
+    neighbour, cropped to whole cells.
+    """
+    h = frame.shape[0] - frame.shape[0] % CELL
+    w = frame.shape[1] - frame.shape[1] % CELL
+    px = frame[:h, :w]
+
+    gray = np.add(px[..., 0], px[..., 1], dtype=np.int16)
+    gray += px[..., 2]
+
+    # |d| > t is d + t > 2t unsigned, which saves a pass for abs()
+    t = EDGE_THRESHOLD
+    edges = np.zeros((h, w), dtype=bool)
+    d = gray[:, 1:] - gray[:, :-1]
+    d += t
+    edges[:, 1:] = d.view(np.uint16) > 2 * t
+    d = gray[1:] - gray[:-1]
+    d += t
+    edges[1:] |= d.view(np.uint16) > 2 * t
+    return edges
+
+
+def edge_cells(edges: np.ndarray) -> np.ndarray:
+    """The cells of an edge map containing edges, without long lines."""
+    h, w = edges.shape
+
+    # Each word of a uint32 view holds the 4 (CELL) booleans of a cell's row
+    words = edges.view(np.uint32).reshape(h // CELL, CELL, w // CELL)
+    cells = (words[:, 0] | words[:, 1] | words[:, 2] | words[:, 3]) != 0
+
+    n = LINE_LENGTH // CELL
+    lines = _long_runs(cells, n) | _long_runs(cells.T, n).T
+    return cells & ~lines
+
+
+def _runs(cells: np.ndarray):
+    """(row, start, end) of the row runs of set cells, in row-major order."""
+    gh, gw = cells.shape
+    padded = np.zeros((gh, gw + 2), dtype=np.int8)
+    padded[:, 1:-1] = cells
+    step = np.diff(padded, axis=1)
+
+    rows, starts = np.nonzero(step == 1)
+    ends = np.nonzero(step == -1)[1]
+    return rows, starts, ends, step[:, :gw] == 1
+
+
+def _long_runs(cells: np.ndarray, n: int) -> np.ndarray:
+    """The cells in row runs of at least n."""
+    rows, starts, ends, _ = _runs(cells)
+    long = ends - starts >= n
+
+    marks = np.zeros((cells.shape[0], cells.shape[1] + 1), dtype=np.int32)
+    np.add.at(marks, (rows[long], starts[long]), 1)
+    np.add.at(marks, (rows[long], ends[long]), -1)
+    return np.cumsum(marks, axis=1)[:, :-1] > 0
+
+
+def _components(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    The component of each of n nodes linked by the pairs (a[i], b[i]),
+    named by its smallest node.
+    """
+    parent = np.arange(n)
+    while True:
+        ra, rb = parent[a], parent[b]
+        lo, hi = np.minimum(ra, rb), np.maximum(ra, rb)
+        linked = lo != hi
+        if not linked.any():
+            return parent
+
+        # Hook roots onto smaller ones, then flatten the trees
+        np.minimum.at(parent, hi[linked], lo[linked])
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+def _bounds(groups: np.ndarray, x0, y0, x1, y1) -> np.ndarray:
+    """(x0, y0, x1, y1) bounding boxes of the boxes sharing a group."""
+    ids, inverse = np.unique(groups, return_inverse=True)
+    out = np.empty((len(ids), 4), dtype=np.int64)
+    out[:, :2] = np.iinfo(np.int64).max
+    out[:, 2:] = np.iinfo(np.int64).min
+    np.minimum.at(out[:, 0], inverse, x0)
+    np.minimum.at(out[:, 1], inverse, y0)
+    np.maximum.at(out[:, 2], inverse, x1)
+    np.maximum.at(out[:, 3], inverse, y1)
+    return out
+
+
+def cell_components(cells: np.ndarray) -> np.ndarray:
+    """(x0, y0, x1, y1) bounds, in cells, of the 4-connected components."""
+    gh, gw = cells.shape
+    rows, starts, ends, first_cells = _runs(cells)
+    if not len(starts):
+        return np.empty((0, 4), dtype=np.int64)
+
+    # The number of the run each cell is in
+    run = np.cumsum(first_cells.ravel()).reshape(gh, gw) - 1
+
+    # Runs in adjacent rows are linked once per column span they share
+    shared = cells[1:] & cells[:-1]
+    first = shared.copy()
+    first[:, 1:] &= ~shared[:, :-1]
+    below = run[1:][first]
+    above = run[:-1][first]
+
+    groups = _components(len(starts), below, above)
+    return _bounds(groups, starts, rows, ends, rows + 1)
+
+
+def merge_boxes(boxes: np.ndarray, gap: int) -> np.ndarray:
+    """Merge (x0, y0, x1, y1) boxes less than gap apart until none are."""
+    while len(boxes) > 1:
+        x0, y0, x1, y1 = (boxes[:, i] for i in range(4))
+        near = (
+            (x0[:, None] < x1[None, :] + gap)
+            & (x0[None, :] < x1[:, None] + gap)
+            & (y0[:, None] < y1[None, :] + gap)
+            & (y0[None, :] < y1[:, None] + gap)
+        )
+        a, b = np.nonzero(np.triu(near, 1))
+        if not len(a):
+            break
+
+        groups = _components(len(boxes), a, b)
+        boxes = _bounds(groups, x0, y0, x1, y1)
+
+    return boxes
+
+
+def fit_boxes(edges: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """Shrink (x0, y0, x1, y1) boxes to the edge pixels inside them."""
+    fitted = boxes.copy()
+    for i, (x0, y0, x1, y1) in enumerate(boxes):
+        sub = edges[y0:y1, x0:x1]
+        cols = np.flatnonzero(sub.any(axis=0))
+        rows = np.flatnonzero(sub.any(axis=1))
+        if len(cols):
+            fitted[i] = (x0 + cols[0], y0 + rows[0], x0 + cols[-1], y0 + rows[-1])
+    return fitted
+
+
+def detect_boxes(frame: np.ndarray) -> np.ndarray:
+    """(x, y, w, h) of the likely click targets in a captured frame."""
+    h, w = frame.shape[:2]
+    edges = edge_map(frame)
+    boxes = cell_components(edge_cells(edges)) * CELL
+
+    bw = boxes[:, 2] - boxes[:, 0]
+    bh = boxes[:, 3] - boxes[:, 1]
+    boxes = boxes[(bw <= MAX_WIDTH_SHARE * w) & (bh <= MAX_HEIGHT_SHARE * h)]
+
+    # An edge pixel marks a step from its left or upper neighbour, so the
+    # last one of a target is just past it: fitted boxes end exclusive
+    boxes = fit_boxes(edges, merge_boxes(boxes, MERGE_GAP))
+
+    bw = boxes[:, 2] - boxes[:, 0]
+    bh = boxes[:, 3] - boxes[:, 1]
+    keep = (bw >= MIN_SIDE) & (bh >= MIN_SIDE)
+    keep &= (bw <= MAX_WIDTH_SHARE * w) & (bh <= MAX_HEIGHT_SHARE * h)
+    boxes = boxes[keep]
+
+    boxes[:, 2:] -= boxes[:, :2]
+    return boxes
+
+
+def detect_hints(frame: np.ndarray, x: int = 0, y: int = 0) -> list[Hint]:
+    """detect_boxes as (unlabelled) hints, for a frame captured at (x, y)."""
+    return [
+        Hint(int(bx) + x, int(by) + y, int(bw), int(bh))
+        for bx, by, bw, bh in detect_boxes(frame)
+    ]